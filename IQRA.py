@@ -4,9 +4,27 @@ import random
 from pygame import gfxdraw
 import arabic_reshaper
 from bidi.algorithm import get_display
+import numpy as np
 import os # Added for path manipulation
-
-pygame.init()
+import datetime
+import io
+import threading
+import json
+import mmap
+import queue
+import socket
+import struct
+import sys
+import time
+import zipfile
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from functools import lru_cache, wraps
+from itertools import islice
+
+PROCESS_START = time.perf_counter() # For time-to-first-frame reporting
 
 # Determine the script's directory for relative paths
 try:
@@ -18,8 +36,7 @@ except NameError:
 
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("DMSA Quranic Letter Wheel")
+WINDOW_CAPTION = "DMSA Quranic Letter Wheel"
 
 NAVY = (28, 49, 94)
 WHITE = (255, 255, 255)
@@ -31,6 +48,7 @@ YELLOW = (255, 223, 0) # For the star
 
 CHOOSE_LETTER_SYMBOL = "★"
 CHOOSE_LETTER_STATE_VALUE = "CHOOSE_LETTER" # Special value for selected_letter
+WINNING_SCORE = 5 # Letters a player needs to win a game
 
 ARABIC_LETTERS = [
     'ا', 'ب', 'ت', 'ث', 'ج', 'ح', 'خ', 'د', 'ذ', 'ر', 'ز', 'س', 'ش',
@@ -40,21 +58,40 @@ ARABIC_LETTERS = [
 
 # --- Asset Loading ---
 DEFAULT_FONT_FILE_NAME = "Janna LT Bold.ttf"
+# Archives shipped with the repo that contain a font, read in memory without extracting
+FONT_ARCHIVES = {DEFAULT_FONT_FILE_NAME: "janna-lt-bold.zip"}
 LOGO_FILE_NAME = "dmsa_logo.png"
-SPIN_SOUND_FILE_NAME = "wheel_spin.wav" # Centralize sound file name
 
-def load_font(font_file_name, size):
-    """Loads a font, falling back to default system font if not found."""
+def load_font_data(font_file_name):
+    """Reads a font file into memory, returning None if not found so callers fall back to the default font.
+
+    A loose file next to the script wins; otherwise the font is decompressed straight out of its bundled archive.
+    """
     path = os.path.join(script_dir, font_file_name)
     if os.path.exists(path):
         try:
-            return pygame.font.Font(path, size)
-        except pygame.error as e:
-            print(f"Error loading font '{font_file_name}' at '{path}': {e}. Using default system font.")
-    else:
-        print(f"Font '{font_file_name}' not found at '{path}'. Using default system font.")
-    # Fallback to Pygame's default font
-    return pygame.font.Font(None, size)
+            with open(path, "rb") as font_file:
+                return font_file.read()
+        except OSError as e:
+            print(f"Error loading font '{font_file_name}' at '{path}': {e}.")
+
+    archive_file_name = FONT_ARCHIVES.get(font_file_name)
+    if archive_file_name:
+        archive_path = os.path.join(script_dir, archive_file_name)
+        if os.path.exists(archive_path):
+            try:
+                with zipfile.ZipFile(archive_path) as archive:
+                    for member in archive.namelist():
+                        if os.path.basename(member) == font_file_name:
+                            return archive.read(member)
+                print(f"Font '{font_file_name}' not found inside '{archive_path}'.")
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"Error reading font archive '{archive_path}': {e}.")
+        else:
+            print(f"Font archive '{archive_file_name}' not found at '{archive_path}'.")
+
+    print(f"Font '{font_file_name}' not available. Using default system font.")
+    return None
 
 def load_image(image_file_name, scale_to=None):
     """Loads an image, returning None if not found or on error."""
@@ -71,22 +108,6 @@ def load_image(image_file_name, scale_to=None):
         print(f"Image '{image_file_name}' not found at '{path}'.")
     return None
 
-def load_sound(sound_file_name):
-    """Loads a sound, returning None if not found, on error, or if mixer is unavailable."""
-    if not pygame.mixer or not pygame.mixer.get_init(): # Check if mixer is initialized
-        print("Pygame mixer not initialized or unavailable. Cannot load sounds.")
-        return None
-    path = os.path.join(script_dir, sound_file_name)
-    if os.path.exists(path):
-        try:
-            sound = pygame.mixer.Sound(path)
-            return sound
-        except pygame.error as e:
-            print(f"Error loading sound '{sound_file_name}' at '{path}': {e}")
-    else:
-        print(f"Sound file '{sound_file_name}' not found at '{path}'.")
-    return None
-
 # Define font sizes
 TEXT_INPUT_FONT_SIZE = 36
 BUTTON_FONT_SIZE = 36
@@ -95,41 +116,1831 @@ GAME_SMALL_FONT_SIZE = 24
 TITLE_FONT_SIZE = 64
 INSTRUCTION_FONT_SIZE = 36
 
-# Load global font objects
-FONT_TEXT_INPUT = load_font(DEFAULT_FONT_FILE_NAME, TEXT_INPUT_FONT_SIZE)
-FONT_BUTTON = load_font(DEFAULT_FONT_FILE_NAME, BUTTON_FONT_SIZE)
-FONT_GAME_MAIN = load_font(DEFAULT_FONT_FILE_NAME, GAME_MAIN_FONT_SIZE)
-FONT_GAME_SMALL = load_font(DEFAULT_FONT_FILE_NAME, GAME_SMALL_FONT_SIZE)
-FONT_TITLE = load_font(DEFAULT_FONT_FILE_NAME, TITLE_FONT_SIZE)
-FONT_INSTRUCTION = load_font(DEFAULT_FONT_FILE_NAME, INSTRUCTION_FONT_SIZE)
+class AssetManager:
+    """Loads fonts and images on first use, shares file reads between font sizes and times every load."""
+    def __init__(self):
+        self.font_data = {} # font file name -> bytes, or None when missing
+        self.fonts = {} # (font file name, size) -> Font
+        self.images = {} # (image file name, scale_to) -> Surface or None
+        self.load_times = OrderedDict() # asset label -> seconds spent loading it
+        self.lock = threading.RLock() # The warm-up thread and the main loop may ask for the same asset
+        self.warm_thread = None
+
+    def timed_load(self, label, loader, *args):
+        start = time.perf_counter()
+        asset = loader(*args)
+        self.load_times[label] = time.perf_counter() - start
+        return asset
+
+    def font(self, size, font_file_name=DEFAULT_FONT_FILE_NAME):
+        key = (font_file_name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            with self.lock:
+                font = self.fonts.get(key)
+                if font is None:
+                    font = self.timed_load(f"font {font_file_name} @ {size}px", self.create_font, font_file_name, size)
+                    self.fonts[key] = font
+        return font
+
+    def create_font(self, font_file_name, size):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        if font_file_name not in self.font_data:
+            self.font_data[font_file_name] = self.timed_load(f"read {font_file_name}", load_font_data, font_file_name)
+        data = self.font_data[font_file_name]
+        if data is not None:
+            try:
+                # Every size wraps the same bytes; BytesIO only copies on write
+                return pygame.font.Font(io.BytesIO(data), size)
+            except pygame.error as e:
+                print(f"Error loading font '{font_file_name}': {e}. Using default system font.")
+        # Fallback to Pygame's default font
+        return pygame.font.Font(None, size)
+
+    def image(self, image_file_name, scale_to=None):
+        key = (image_file_name, scale_to)
+        if key not in self.images:
+            with self.lock:
+                if key not in self.images:
+                    self.images[key] = self.timed_load(f"image {image_file_name}", load_image, image_file_name, scale_to)
+        return self.images[key]
+
+    def warm_async(self, font_sizes=(), images=()):
+        """Loads the given assets on a background thread so first use later does not stall a frame."""
+        def warm():
+            for size in font_sizes:
+                self.font(size)
+            for image_file_name, scale_to in images:
+                self.image(image_file_name, scale_to)
+        self.warm_thread = threading.Thread(target=warm, name="asset-warmup", daemon=True)
+        self.warm_thread.start()
+
+    def report(self):
+        lines = [f"  {label}: {seconds * 1000:.1f} ms" for label, seconds in self.load_times.items()]
+        total = sum(self.load_times.values()) * 1000
+        return "\n".join([f"Asset load times ({total:.1f} ms total):"] + lines)
+
+ASSETS = AssetManager()
+
+# Loaded in the background once the home screen is up
+WARM_FONT_SIZES = (BUTTON_FONT_SIZE, TITLE_FONT_SIZE, GAME_MAIN_FONT_SIZE, GAME_SMALL_FONT_SIZE,
+                   TEXT_INPUT_FONT_SIZE, INSTRUCTION_FONT_SIZE)
+LOGO_SIZE = (150, 150)
+WARM_IMAGES = ((LOGO_FILE_NAME, LOGO_SIZE),)
 # --- End Asset Loading ---
 
-# Load a font that supports Arabic and the path to it now remember to and "r" in front of the path.
-# This line is now effectively replaced by the asset loading functions and globals above.
-# We'll remove direct uses of 'font_path' next.
-# font_path = os.path.join(script_dir, DEFAULT_FONT_FILE_NAME) # This line is no longer needed
+# --- Text Rendering Cache ---
+GLYPH_CACHE_MAX_ENTRIES = 512 # Enough for every wheel letter, button label and instruction line
+
+@lru_cache(maxsize=1024)
+def shape_text(text):
+    """Reshapes and reorders Arabic text for display. Output is memoized since it never changes."""
+    return get_display(arabic_reshaper.reshape(text))
+
+class GlyphCache:
+    """LRU cache of rendered text surfaces keyed by (text, font, color, antialias)."""
+    def __init__(self, max_entries=GLYPH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font, color, antialias=True):
+        key = (text, font, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False) # Evict the least recently used surface
+        return surface
+
+    def render_shaped(self, text, font, color, antialias=True):
+        """Shapes Arabic text before rendering it through the cache."""
+        return self.render(shape_text(text), font, color, antialias)
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+GLYPH_CACHE = GlyphCache()
+# --- End Text Rendering Cache ---
+
+# --- Wheel Sprite ---
+WHEEL_RADIUS = 200
+WHEEL_ANGLE_RESOLUTION = 0.5 # Degrees per cached resting frame
+WHEEL_CACHE_MAX_BYTES = 4 * 1024 * 1024 # Resting frames only, about six of them
+WHEEL_ARC_POINTS = 8 # Rim vertices per segment, enough for a smooth edge at this radius
+WHEEL_LABEL_RADIUS = 0.8 # Letter centres, as a fraction of the radius
+WHEEL_HUB_RADIUS = 10
+WHEEL_SEGMENT_COLORS = ((232, 237, 246), (250, 243, 228)) # Alternating pale navy and pale gold
+WHEEL_STAR_SEGMENT_COLOR = NAVY # The star segment is dark so it stands out
+WHEEL_STAR_RADIUS = 14 # Outer radius of the star, drawn as a polygon because the font has no glyph for it
+WHEEL_STAR_INNER_RATIO = 0.45
+WHEEL_POINTER_INSET = 14 # How far the pointer's tip reaches over the rim
+WHEEL_POINTER_LENGTH = 30
+WHEEL_POINTER_WIDTH = 28
+
+def wheel_segment_mesh(count, arc_points=WHEEL_ARC_POINTS):
+    """Unit-radius vertices for a wheel of count segments, computed once for every angle.
+
+    Returns (segments, dividers, labels): segments has shape (count, arc_points + 1, 2) with the hub as
+    vertex 0 followed by the rim arc, dividers holds the rim end of each boundary line and labels the centre
+    of each letter. Segment i is centred on letter i at i * 360 / count degrees, clockwise on screen.
+    """
+    centres = np.radians(np.arange(count) * (360 / count))
+    half_width = math.pi / count
+    rim_angles = centres[:, None] + np.linspace(-half_width, half_width, arc_points)[None, :]
+    segments = np.zeros((count, arc_points + 1, 2))
+    segments[:, 1:, 0] = np.cos(rim_angles)
+    segments[:, 1:, 1] = np.sin(rim_angles)
+    dividers = np.stack((np.cos(centres - half_width), np.sin(centres - half_width)), axis=1)
+    labels = WHEEL_LABEL_RADIUS * np.stack((np.cos(centres), np.sin(centres)), axis=1)
+    return segments, dividers, labels
+
+def star_polygon(radius, points=5, inner_ratio=WHEEL_STAR_INNER_RATIO):
+    """Vertices of an upright star centred on the origin."""
+    corners = np.arange(points * 2)
+    angles = np.radians(corners * (180 / points) - 90)
+    radii = np.where(corners % 2, radius * inner_ratio, radius)
+    return np.stack((radii * np.cos(angles), radii * np.sin(angles)), axis=1)
+
+def wheel_pointer_polygon(center, radius=WHEEL_RADIUS):
+    """The fixed pointer at POINTER_ANGLE, a triangle whose tip reaches just over the rim."""
+    direction = np.array((math.cos(math.radians(POINTER_ANGLE)), math.sin(math.radians(POINTER_ANGLE))))
+    across = np.array((-direction[1], direction[0])) * WHEEL_POINTER_WIDTH / 2
+    tip = np.array(center) + direction * (radius - WHEEL_POINTER_INSET)
+    base = tip + direction * WHEEL_POINTER_LENGTH
+    return [tip.tolist(), (base + across).tolist(), (base - across).tolist()]
+
+class WheelSprite:
+    """Wheel frames drawn from a precomputed segment mesh.
+
+    A resting wheel is served from an LRU cache of exact frames bucketed by angle. A moving wheel lands on
+    a new bucket almost every frame, so it is drawn by rotating one cached face and blitting the letters
+    upright on top instead.
+    """
+    def __init__(self, radius=WHEEL_RADIUS, resolution=WHEEL_ANGLE_RESOLUTION, max_bytes=WHEEL_CACHE_MAX_BYTES):
+        self.radius = radius
+        self.resolution = resolution
+        self.num_buckets = max(1, int(round(360 / resolution)))
+        self.max_bytes = max_bytes
+        self.size = radius * 2 + 8 # Leave room for the outline width
+        self.count = len(ARABIC_LETTERS)
+        segments, dividers, labels = wheel_segment_mesh(self.count)
+        # All vertices live in one array so each frame rotates them with a single matrix product
+        self.vertices = np.concatenate((segments.reshape(-1, 2), dividers, labels))
+        self.segment_vertex_count = segments.shape[0] * segments.shape[1]
+        self.star = star_polygon(WHEEL_STAR_RADIUS)
+        self.glyphs = None # Rendered lazily on first use so fonts are only needed once drawing starts
+        self.face = None # The letterless wheel at angle 0, rotated while the wheel moves
+        self.turned = None # (angle, centre, rotated face, its crop, label points) of the last moving draw
+        self.frames = OrderedDict()
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.rotations = 0
+
+    def build_glyphs(self):
+        glyphs = []
+        for letter in ARABIC_LETTERS:
+            if letter == CHOOSE_LETTER_SYMBOL:
+                glyphs.append(None) # Drawn as a polygon
+            else:
+                glyphs.append(GLYPH_CACHE.render_shaped(letter, ASSETS.font(GAME_SMALL_FONT_SIZE), NAVY))
+        return glyphs
+
+    def mesh_points(self, angle, centre):
+        """The mesh turned clockwise by angle degrees around centre, as (segments, dividers, labels) lists."""
+        cos_angle, sin_angle = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        rotation = np.array(((cos_angle, sin_angle), (-sin_angle, cos_angle))) # Transposed, for row vectors
+        points = self.vertices @ rotation * self.radius + centre
+        segment_end = self.segment_vertex_count
+        segments = points[:segment_end].reshape(self.count, -1, 2).tolist()
+        dividers = points[segment_end:segment_end + self.count].tolist()
+        labels = points[segment_end + self.count:].tolist()
+        return segments, dividers, labels
+
+    def draw_labels(self, surface, labels):
+        """Blits the letters upright at their label points."""
+        if self.glyphs is None:
+            self.glyphs = self.build_glyphs()
+        for glyph, label in zip(self.glyphs, labels):
+            if glyph is not None:
+                surface.blit(glyph, glyph.get_rect(center=label))
+            else:
+                star = (self.star + label).tolist()
+                gfxdraw.filled_polygon(surface, star, YELLOW)
+                gfxdraw.aapolygon(surface, star, YELLOW)
+
+    def draw_segments(self, surface, segments, star=True):
+        """Fills the segments. With star=False the dark star segment is left light like the rest."""
+        for i, polygon in enumerate(segments):
+            if star and ARABIC_LETTERS[i] == CHOOSE_LETTER_SYMBOL:
+                color = WHEEL_STAR_SEGMENT_COLOR
+            else:
+                color = WHEEL_SEGMENT_COLORS[i % len(WHEEL_SEGMENT_COLORS)]
+            # No antialiased outline needed: the dividers and the rim outline cover every edge
+            gfxdraw.filled_polygon(surface, polygon, color)
+
+    def draw_outlines(self, surface, centre, dividers):
+        """Draws the dividers, the rim and the hub, all antialiased."""
+        x, y = int(centre[0]), int(centre[1])
+        for rim in dividers:
+            pygame.draw.aaline(surface, NAVY, centre, rim)
+        pygame.draw.circle(surface, NAVY, centre, self.radius + 1, 3)
+        gfxdraw.aacircle(surface, x, y, self.radius + 2, NAVY)
+        gfxdraw.aacircle(surface, x, y, WHEEL_HUB_RADIUS, NAVY)
+        gfxdraw.filled_circle(surface, x, y, WHEEL_HUB_RADIUS, NAVY)
+
+    def render(self, angle):
+        """Draws the wheel turned clockwise by angle degrees, with its letters kept upright."""
+        # Opaque, because the wheel always sits on the white background and opaque blits are the cheapest
+        frame = pygame.Surface((self.size, self.size))
+        frame.fill(WHITE)
+        centre = self.size / 2
+        segments, dividers, labels = self.mesh_points(angle, centre)
+        self.draw_segments(frame, segments)
+        self.draw_outlines(frame, (centre, centre), dividers)
+        self.draw_labels(frame, labels)
+        return frame
+
+    def frame(self, angle):
+        """Returns the exact wheel frame for the nearest angle bucket."""
+        bucket = int(round((angle % 360) / self.resolution)) % self.num_buckets
+        frame = self.frames.get(bucket)
+        if frame is not None:
+            self.hits += 1
+            self.frames.move_to_end(bucket)
+            return frame
+
+        self.misses += 1
+        frame = self.render(bucket * self.resolution)
+
+        frame_bytes = frame.get_width() * frame.get_height() * frame.get_bytesize()
+        self.frames[bucket] = frame
+        self.cache_bytes += frame_bytes
+        while self.cache_bytes > self.max_bytes and len(self.frames) > 1:
+            _, evicted = self.frames.popitem(last=False)
+            self.cache_bytes -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+        return frame
+
+    def draw(self, surface, center, angle, moving=False):
+        """Draws the wheel centred on center, rotating the cached face instead of redrawing it while moving.
+
+        Only the filled segments are rotated. The outlines and letters are drawn at the exact angle on top, so the
+        edges stay antialiased. A frame is rotated once and reused for every dirty region it is drawn into.
+        """
+        top_left = (center[0] - self.size // 2, center[1] - self.size // 2)
+        if outside_clip(surface, (top_left, (self.size, self.size))):
+            return
+        if not moving:
+            surface.blit(self.frame(angle), top_left)
+            return
+
+        if self.turned is None or self.turned[:2] != (angle, center):
+            self.rotations += 1
+            if self.face is None:
+                # One pixel wider, so the wheel's centre is the pixel transform.rotate turns about and it doesn't wobble
+                self.face = pygame.Surface((self.size + 1, self.size + 1))
+                self.face.fill(WHITE)
+                # Rotated dark-on-light edges would show their steps, so the star segment is filled separately
+                self.draw_segments(self.face, self.mesh_points(0, self.size / 2)[0], star=False)
+            # Nearest-neighbour rotation is cheaper than filling the polygons; the padding it adds is white
+            rotated = pygame.transform.rotate(self.face, -angle)
+            area = pygame.Rect(0, 0, self.size, self.size)
+            area.center = rotated.get_rect().center
+            segments, dividers, labels = self.mesh_points(angle, np.array(center))
+            star_segment = segments[ARABIC_LETTERS.index(CHOOSE_LETTER_SYMBOL)]
+            self.turned = (angle, center, rotated, area, star_segment, dividers, labels)
+        else:
+            self.hits += 1 # Another dirty region of the same frame
+        _, _, rotated, area, star_segment, dividers, labels = self.turned
+        surface.blit(rotated, top_left, area)
+        gfxdraw.filled_polygon(surface, star_segment, WHEEL_STAR_SEGMENT_COLOR)
+        self.draw_outlines(surface, center, dividers)
+        self.draw_labels(surface, labels)
+
+    def hit_rate(self):
+        """Share of draws that did not redraw the mesh."""
+        draws = self.hits + self.misses + self.rotations
+        return (self.hits + self.rotations) / draws if draws else 0.0
+
+    def clear(self):
+        self.glyphs = None
+        self.face = None
+        self.turned = None
+        self.frames.clear()
+        self.cache_bytes = 0
+# --- End Wheel Sprite ---
+
+# --- Dirty Rectangle Rendering ---
+DIRTY_RECT_MERGE_LIMIT = 8 # Past this many regions one bounding rect is cheaper than many clipped passes
+
+class DirtyRectTracker:
+    """Collects the screen regions that changed since the last frame so only those are redrawn and pushed."""
+    def __init__(self):
+        self.rects = []
+        self.full_redraw = True # The first frame always covers the whole screen
+        self.frames = 0
+        self.full_frames = 0
+        self.pixels_pushed = 0
+        self.frame_time_total = 0.0
+
+    def mark(self, rect):
+        self.rects.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        self.full_redraw = True
+
+    def has_pending(self):
+        return self.full_redraw or bool(self.rects)
+
+    def collect(self, screen_rect):
+        """Returns the merged dirty regions clipped to the screen and resets the tracker."""
+        if self.full_redraw:
+            rects = [pygame.Rect(screen_rect)]
+            self.full_frames += 1
+        else:
+            rects = []
+            for rect in self.rects:
+                rect = rect.clip(screen_rect)
+                if rect.width == 0 or rect.height == 0:
+                    continue
+                # Fold overlapping regions together so no pixel is drawn twice. A union can grow into
+                # regions it did not touch before, so keep absorbing until nothing overlaps it
+                index = rect.collidelist(rects)
+                while index != -1:
+                    rect = rect.union(rects.pop(index))
+                    index = rect.collidelist(rects)
+                rects.append(rect)
+            if len(rects) > DIRTY_RECT_MERGE_LIMIT:
+                rects = [rects[0].unionall(rects[1:])]
+        self.rects = []
+        self.full_redraw = False
+        return rects
+
+    def record_frame(self, rects, frame_time):
+        self.frames += 1
+        self.frame_time_total += frame_time
+        self.pixels_pushed += sum(rect.width * rect.height for rect in rects)
+
+    def summary(self):
+        if not self.frames:
+            return "No frames rendered."
+        average_ms = self.frame_time_total / self.frames * 1000
+        full_frame_pixels = SCREEN_WIDTH * SCREEN_HEIGHT * self.frames
+        return (f"{self.frames} frames ({self.full_frames} full), {average_ms:.2f} ms average frame time, "
+                f"{self.pixels_pushed} pixels pushed ({self.pixels_pushed / full_frame_pixels:.1%} of full-frame flips)")
+
+RENDER_TRACKER = DirtyRectTracker()
+
+def outside_clip(surface, rect):
+    """True when nothing drawn in rect would survive the surface's clip, so the draw can be skipped.
+
+    Game.draw reruns the scene once per dirty region; this keeps the costly parts to the regions they touch.
+    """
+    return not surface.get_clip().colliderect(rect)
+# --- End Dirty Rectangle Rendering ---
+
+# --- Spin Physics ---
+PHYSICS_HZ = 60 # The wheel was tuned at one physics step per frame of a 60 fps loop
+PHYSICS_DT = 1 / PHYSICS_HZ
+MAX_PHYSICS_STEPS_PER_UPDATE = 15 # Drop time after a long stall instead of fast-forwarding through it
+SPIN_SPEED_MIN = 10 # Degrees per physics step
+SPIN_SPEED_MAX = 20
+SPIN_FRICTION = 0.99 # Speed multiplier per physics step
+SPIN_STOP_SPEED = 0.1 # The wheel stops once its speed drops below this
+SEGMENT_ANGLE = 360 / len(ARABIC_LETTERS)
+POINTER_ANGLE = 270 # Screen direction of the fixed pointer, in degrees clockwise from 3 o'clock: straight up
+
+def spin_speed_after(initial_speed, steps):
+    return initial_speed * SPIN_FRICTION ** steps
+
+def spin_distance(initial_speed, steps):
+    """Degrees turned after the given number of physics steps (closed form of the geometric decay)."""
+    return initial_speed * (1 - SPIN_FRICTION ** steps) / (1 - SPIN_FRICTION)
+
+def spin_step_count(initial_speed):
+    """Number of physics steps a spin lasts, i.e. the first step after which its speed is below SPIN_STOP_SPEED."""
+    if initial_speed <= 0:
+        return 1
+    steps = max(1, math.floor(math.log(SPIN_STOP_SPEED / initial_speed) / math.log(SPIN_FRICTION)) + 1)
+    # Nudge past floating-point rounding at the boundary so this agrees with spin_speed_after
+    while spin_speed_after(initial_speed, steps) >= SPIN_STOP_SPEED:
+        steps += 1
+    while steps > 1 and spin_speed_after(initial_speed, steps - 1) < SPIN_STOP_SPEED:
+        steps -= 1
+    return steps
+
+def pointer_edge_count(angle):
+    """Segment edges that have passed the pointer once the wheel has turned clockwise by angle degrees.
+
+    WheelSprite draws segment i from (i - 0.5) to (i + 0.5) * SEGMENT_ANGLE + angle, so this changes exactly
+    when the segment under the pointer does.
+    """
+    return math.floor((angle - POINTER_ANGLE + SEGMENT_ANGLE / 2) / SEGMENT_ANGLE)
+
+def letter_at_angle(angle):
+    """The letter under the fixed pointer once the wheel has turned clockwise by angle degrees."""
+    return ARABIC_LETTERS[-pointer_edge_count(angle) % len(ARABIC_LETTERS)]
+
+def spin_speed_for_seed(seed):
+    """Launch speed of a spin; each spin has its own seed, so a logged seed reproduces it exactly."""
+    return random.Random(seed).uniform(SPIN_SPEED_MIN, SPIN_SPEED_MAX)
+
+def start_angle_for_seed(seed):
+    """Where a new game's wheel starts, so its first spin is as fair as the rest."""
+    return random.Random(seed).uniform(0, 360)
+# --- End Spin Physics ---
+
+# --- Spin Audio ---
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+AUDIO_BUFFER_SIZE = 256 # Samples per mixer buffer, about 6 ms at 44.1 kHz; the default 512+ adds audible lag
+TICK_CHANNEL = 0 # Reserved for ticks, so other sounds never steal it mid-spin
+TICK_DURATION = 0.015 # Seconds
+TICK_FREQUENCY = 2400 # Hz, a short wooden click
+TICK_DECAY_RATE = 400 # Exponential decay per second of the click envelope
+TICK_VOLUME = 0.5
+
+def synthesize_tick(frequency=TICK_FREQUENCY, duration=TICK_DURATION):
+    """Builds a short decaying click as a Sound in whatever sample format the mixer opened with."""
+    sample_rate, sample_size, channels = pygame.mixer.get_init()
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    wave = TICK_VOLUME * np.sin(2 * np.pi * frequency * t) * np.exp(-TICK_DECAY_RATE * t)
+    if abs(sample_size) == 32: # Float samples
+        samples = wave.astype(np.float32)
+    else:
+        bits = abs(sample_size)
+        samples = np.round(wave * (2 ** (bits - 1) - 1))
+        if sample_size > 0: # Unsigned formats are centred on half their range
+            samples += 2 ** (bits - 1)
+        samples = samples.astype(f"{'i' if sample_size < 0 else 'u'}{bits // 8}")
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return pygame.sndarray.make_sound(samples)
+
+class SpinTicker:
+    """Plays a tick each time a spin carries the pointer across a segment boundary.
+
+    The tick is synthesized once by start() and replayed on a reserved channel, so a tick costs no allocation
+    and no file ships with the game. step() is called from the physics step, so the ticks slow down exactly
+    as the wheel does.
+    """
+    def __init__(self):
+        self.tick = None
+        self.channel = None
+        self.ticks_played = 0
+
+    def start(self):
+        if not pygame.mixer.get_init():
+            print("Pygame mixer not initialized or unavailable. Spin ticks are disabled.")
+            return
+        try:
+            self.tick = synthesize_tick()
+        except (pygame.error, ValueError) as e:
+            print(f"Error synthesizing the spin tick: {e}")
+            return
+        pygame.mixer.set_reserved(TICK_CHANNEL + 1)
+        self.channel = pygame.mixer.Channel(TICK_CHANNEL)
+
+    def step(self, previous_angle, angle):
+        # A boundary is crossed whenever a drawn segment edge passes the pointer, as in letter_at_angle
+        if self.channel and pointer_edge_count(angle) != pointer_edge_count(previous_angle):
+            self.channel.play(self.tick) # Cuts off the previous tick if the wheel is turning fast
+            self.ticks_played += 1
+
+SPIN_TICKER = SpinTicker()
+# --- End Spin Audio ---
+
+# --- Celebration Particles ---
+PARTICLE_POOL_SIZE = 4096 # Preallocated slots; a new burst reuses the oldest ones when the pool is full
+PARTICLE_SIZE = 3 # Side of a fresh particle in pixels; it shrinks to nothing over its lifetime
+PARTICLE_GRAVITY = 700 # Pixels per second squared
+PARTICLE_DRAG = 1.5 # Fraction of velocity lost per second
+PARTICLE_COLORS = (GOLD, YELLOW, GREEN, RED, NAVY)
+CORRECT_BURST_COUNT = 250
+CORRECT_BURST_SPEED = (250, 650) # Pixels per second
+CORRECT_BURST_LIFETIME = (0.6, 1.2) # Seconds
+WIN_BURST_ORIGINS = ((0.2, 0.35), (0.5, 0.25), (0.8, 0.35), (0.35, 0.6), (0.65, 0.6)) # Fractions of the screen
+WIN_BURST_COUNT = 700 # Per origin
+WIN_BURST_SPEED = (100, 550)
+WIN_BURST_LIFETIME = (1.2, 2.4)
+
+class ParticlePool:
+    """Celebration particles stored as a structure of arrays, one preallocated NumPy array per attribute.
+
+    Bursts write into a ring of slots, update() advances every particle with a few in-place array operations,
+    and draw() writes all of them straight into the surface's pixels. No Python object is created per
+    particle, so thousands of them add no garbage collection pauses.
+    """
+    def __init__(self, capacity=PARTICLE_POOL_SIZE):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.step = np.zeros(capacity) # Scratch space for velocity * dt
+        self.age = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity)
+        self.color = np.zeros(capacity, dtype=np.intp) # Index into PARTICLE_COLORS
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.on_screen = np.zeros(capacity, dtype=bool)
+        self.head = 0 # Next slot a burst writes to
+        self.live = 0 # Number of live particles
+        self.bounds = pygame.Rect(0, 0, 0, 0) # Screen area the live particles cover
+        self.rng = np.random.default_rng() # Separate from the random module, so spins stay reproducible
+
+    def burst(self, origin, count, speed, lifetime, angles=(0, 360)):
+        """Emits count particles from origin in directions between angles, in degrees clockwise from east."""
+        count = min(count, self.capacity)
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        directions = np.radians(self.rng.uniform(angles[0], angles[1], count))
+        speeds = self.rng.uniform(speed[0], speed[1], count)
+        self.x[slots], self.y[slots] = origin
+        self.vx[slots] = speeds * np.cos(directions)
+        self.vy[slots] = speeds * np.sin(directions)
+        self.age[slots] = 0
+        self.lifetime[slots] = self.rng.uniform(lifetime[0], lifetime[1], count)
+        self.color[slots] = self.rng.integers(len(PARTICLE_COLORS), size=count)
+        self.alive[slots] = True
+        self.refresh()
+
+    def update(self, dt):
+        if not self.live:
+            return
+        self.age += dt
+        self.vy += PARTICLE_GRAVITY * dt
+        drag = max(0.0, 1 - PARTICLE_DRAG * dt)
+        self.vx *= drag
+        self.vy *= drag
+        self.x += np.multiply(self.vx, dt, out=self.step)
+        self.y += np.multiply(self.vy, dt, out=self.step)
+        np.less(self.age, self.lifetime, out=self.alive)
+        np.less(self.y, SCREEN_HEIGHT, out=self.on_screen) # Nothing comes back up once it falls off the bottom
+        self.alive &= self.on_screen
+        self.refresh()
+
+    def refresh(self):
+        self.live = int(np.count_nonzero(self.alive))
+        if self.live:
+            xs, ys = self.x[self.alive], self.y[self.alive]
+            left, top = math.floor(xs.min()), math.floor(ys.min())
+            self.bounds = pygame.Rect(left, top, math.ceil(xs.max()) - left + PARTICLE_SIZE,
+                                      math.ceil(ys.max()) - top + PARTICLE_SIZE)
+        else:
+            self.bounds = pygame.Rect(0, 0, 0, 0)
+
+    def clear(self):
+        self.alive[:] = False
+        self.refresh()
+
+    def draw(self, surface):
+        """Plots every live particle inside the surface's clip rect as a square that shrinks as it ages."""
+        clip = surface.get_clip()
+        if not self.live or not clip.colliderect(self.bounds):
+            return
+        alive = self.alive
+        xs, ys = self.x[alive].astype(np.intp), self.y[alive].astype(np.intp)
+        sizes = np.ceil(PARTICLE_SIZE * (1 - self.age[alive] / self.lifetime[alive]))
+        colors = np.array([surface.map_rgb(color) for color in PARTICLE_COLORS], dtype=np.uint32)[self.color[alive]]
+        # Which columns, rows and pixels of each particle's square are drawn, computed once for all of them
+        column_inside = [(xs + d >= clip.left) & (xs + d < clip.right) for d in range(PARTICLE_SIZE)]
+        row_inside = [(ys + d >= clip.top) & (ys + d < clip.bottom) for d in range(PARTICLE_SIZE)]
+        big_enough = [sizes > d for d in range(PARTICLE_SIZE)]
+
+        pixels = pygame.surfarray.pixels2d(surface) # Locks the surface until it is released below
+        try:
+            # Scattered writes through a flat view of the rows are about twice as fast as (x, y) indexing
+            pitch = pixels.strides[1] // pixels.itemsize
+            flat = np.lib.stride_tricks.as_strided(
+                pixels, shape=(pixels.shape[0] + (pixels.shape[1] - 1) * pitch,), strides=(pixels.itemsize,))
+            corners = xs + ys * pitch
+            for dy in range(PARTICLE_SIZE):
+                for dx in range(PARTICLE_SIZE):
+                    drawn = column_inside[dx] & row_inside[dy] & big_enough[max(dx, dy)]
+                    flat[corners[drawn] + (dx + dy * pitch)] = colors[drawn]
+        finally:
+            del pixels, flat
+# --- End Celebration Particles ---
+
+# --- Frame Scheduling ---
+ACTIVE_FPS = 60
+IDLE_WAIT_TIMEOUT_MS = 500 # Idle loops still wake this often for timed effects like a cursor blink
+
+class FrameScheduler:
+    """Blocks on the event queue while the game is idle and runs at a fixed rate while it animates."""
+    def __init__(self, fps=ACTIVE_FPS, idle_timeout_ms=IDLE_WAIT_TIMEOUT_MS):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.frames_run = 0
+        self.frames_skipped = 0
+        self.idle_time = 0.0
+        self.frame_dt = 0.0 # Seconds since the previous frame, for the physics accumulator
+        self.motion_events_dropped = 0
+
+    def poll(self, animating):
+        """Returns the next batch of events, sleeping until one arrives if nothing is animating."""
+        self.frames_run += 1
+        if animating:
+            self.frame_dt = self.clock.tick(self.fps) / 1000
+            with PROFILER.phase("event_pump"):
+                return self.coalesce_motion(pygame.event.get())
+
+        wait_start = time.perf_counter()
+        event = pygame.event.wait(self.idle_timeout_ms)
+        waited = time.perf_counter() - wait_start
+        self.idle_time += waited
+        self.frames_skipped += int(waited * self.fps) # Frames a fixed-rate loop would have drawn meanwhile
+        self.clock.tick() # Restart frame timing so the idle gap is not reported as one long frame
+        self.frame_dt = 0.0
+
+        events = [] if event.type == pygame.NOEVENT else [event]
+        with PROFILER.phase("event_pump"):
+            events.extend(pygame.event.get())
+            return self.coalesce_motion(events)
+
+    def coalesce_motion(self, events):
+        """Keeps only the last MOUSEMOTION of a batch; touch screens can queue hundreds of them per frame.
+
+        Clicks carry their own position, so dropping the intermediate motion loses nothing but hover updates
+        nobody would see.
+        """
+        last_motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                last_motion = event
+        if last_motion is None:
+            return events
+        kept = [event for event in events if event.type != pygame.MOUSEMOTION or event is last_motion]
+        self.motion_events_dropped += len(events) - len(kept)
+        return kept
+
+    def summary(self):
+        return (f"{self.frames_run} loop iterations, {self.frames_skipped} frames skipped, {self.idle_time:.1f} s idle, "
+                f"{self.motion_events_dropped} motion events coalesced")
+# --- End Frame Scheduling ---
+
+# --- Input Hit Testing ---
+# Only these reach the queue. Touch input still arrives as (SDL-emulated) mouse events, so the raw FINGER*
+# and MULTIGESTURE floods, button/key releases and window chatter are dropped before they cost a loop wake-up.
+ALLOWED_EVENT_TYPES = [
+    pygame.QUIT, pygame.KEYDOWN, pygame.TEXTINPUT, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL,
+    pygame.VIDEOEXPOSE, pygame.VIDEORESIZE,
+]
+WHEEL_BUTTONS = (4, 5) # pygame 2 also reports wheel steps as presses of these; they scroll, they don't click
+HIT_GRID_CELL_SIZE = 64 # About one button height, so a cell rarely holds more than two targets
+
+class HitIndex:
+    """Uniform grid over one screen's clickable rects, so a pointer position resolves with a single cell lookup."""
+    def __init__(self, entries=(), cell_size=HIT_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.rects = [] # Every indexed rect once, for callers that need the screen's elements rather than a hit
+        for rect, target in entries:
+            self.add(rect, target)
+
+    def add(self, rect, target):
+        self.rects.append(rect)
+        size = self.cell_size
+        for cell_x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                self.cells.setdefault((cell_x, cell_y), []).append((rect, target))
+
+    def hit(self, pos):
+        """Returns the target under pos, the most recently added one if rects overlap, or None."""
+        for rect, target in reversed(self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ())):
+            if rect.collidepoint(pos):
+                return target
+        return None
+# --- End Input Hit Testing ---
+
+# --- Display Scaling ---
+# The game always draws to a SCREEN_WIDTH x SCREEN_HEIGHT logical canvas; only the viewport knows the window size
+WINDOW_SIZE_ENV_VAR = "IQRA_WINDOW_SIZE" # Initial window size as WIDTHxHEIGHT, e.g. 800x480
+FULLSCREEN_ENV_VAR = "IQRA_FULLSCREEN" # Set to 1 to start fullscreen
+SCALE_FILTER_ENV_VAR = "IQRA_SCALE_FILTER" # "smooth" (bilinear, the default) or "fast" (nearest neighbour)
+FULLSCREEN_HOTKEY = pygame.K_F11
+SCALE_FILTER_HOTKEY = pygame.K_F10
+LETTERBOX_COLOR = WHITE # Bars around the canvas when the window's aspect ratio differs, matching the background
+SCALE_STEPS = 32 # Scales snap down to multiples of 1/32, so a grid of at most 32 logical pixels maps onto whole window pixels
+
+def window_size_from_env():
+    try:
+        width, height = os.environ.get(WINDOW_SIZE_ENV_VAR, "").lower().split("x")
+        return max(1, int(width)), max(1, int(height))
+    except ValueError:
+        return SCREEN_WIDTH, SCREEN_HEIGHT
+
+def align_up(length, step):
+    return -(-length // step) * step
+
+class Viewport:
+    """Letterboxes the logical canvas into the window and scales the regions that changed, or all of it when smooth-shrinking.
+
+    The scale, offset and canvas are recomputed in resize(), which runs on VIDEORESIZE and fullscreen toggles,
+    never per frame. Layout, hit indexes and glyph caches are all in logical pixels, so a resize leaves them alone.
+    """
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), fullscreen=False, smooth=True):
+        self.smooth = smooth
+        self.fullscreen = fullscreen
+        self.windowed_size = size
+        self.set_mode()
+
+    def set_mode(self):
+        if self.fullscreen:
+            self.resize(pygame.display.set_mode((0, 0), pygame.FULLSCREEN))
+        else:
+            self.resize(pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE))
+
+    def handle_resize(self, size):
+        window = pygame.display.get_surface()
+        if not self.fullscreen: # Switching to fullscreen resizes the window too; that size is not kept
+            if window.get_size() != tuple(size): # pygame 2 normally resizes the display surface by itself
+                window = pygame.display.set_mode(size, pygame.RESIZABLE)
+            self.windowed_size = tuple(size)
+        self.resize(window)
+
+    def toggle_fullscreen(self):
+        if not self.fullscreen:
+            self.windowed_size = self.window.get_size()
+        self.fullscreen = not self.fullscreen
+        self.set_mode()
+
+    def toggle_filter(self):
+        self.smooth = not self.smooth
+        RENDER_TRACKER.mark_all()
+
+    def resize(self, window):
+        self.window = window
+        width, height = window.get_size()
+        self.scale_steps = max(1, math.floor(min(width / SCREEN_WIDTH, height / SCREEN_HEIGHT) * SCALE_STEPS))
+        self.scale = self.scale_steps / SCALE_STEPS
+        # Dirty regions are widened to multiples of grid_step, whose edges land exactly on window pixels, so
+        # every region is scaled with the same sampling phase and neighbouring regions never overlap or leave gaps
+        self.grid_step = SCALE_STEPS // math.gcd(self.scale_steps, SCALE_STEPS)
+        self.grid_rect = pygame.Rect(0, 0, align_up(SCREEN_WIDTH, self.grid_step), align_up(SCREEN_HEIGHT, self.grid_step))
+        self.offset = ((width - self.to_window(SCREEN_WIDTH)) // 2, (height - self.to_window(SCREEN_HEIGHT)) // 2)
+        self.direct = self.scale_steps == SCALE_STEPS
+        if self.direct:
+            # At 1:1 the game draws straight into the window and present() has nothing to copy
+            self.canvas = window.subsurface(pygame.Rect(self.offset, (SCREEN_WIDTH, SCREEN_HEIGHT)))
+        else:
+            # Padded to the grid plus one pixel, which the bilinear expand reads past each region's far edge
+            self.source = pygame.Surface((self.grid_rect.width + 1, self.grid_rect.height + 1)).convert()
+            self.source.fill(LETTERBOX_COLOR)
+            self.canvas = self.source.subsurface((0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+        window.fill(LETTERBOX_COLOR)
+        self.full_present = True # The bars have to reach the screen as well
+        RENDER_TRACKER.mark_all()
+
+    def to_window(self, length):
+        return length * self.scale_steps // SCALE_STEPS
+
+    def to_logical(self, pos):
+        return (math.floor((pos[0] - self.offset[0]) / self.scale),
+                math.floor((pos[1] - self.offset[1]) / self.scale))
+
+    def map_event(self, event):
+        """Returns a copy of a pointer event with its position in logical canvas pixels."""
+        if self.direct and self.offset == (0, 0):
+            return event
+        return pygame.event.Event(event.type, {**event.dict, "pos": self.to_logical(event.pos)})
+
+    def present(self, rects):
+        """Copies the given logical regions to the window and returns the window regions to update."""
+        if self.direct:
+            window_rects = [rect.move(self.offset) for rect in rects]
+        elif self.smooth and self.scale < 1 and rects:
+            # SDL's fixed-point shrink filter drifts along each row and column from where it starts, so a region
+            # shrunk on its own differs from the same pixels in a full present and shows seams; shrink it all
+            window_rects = [self.present_region(self.canvas.get_rect())]
+        else:
+            window_rects = [self.present_region(rect) for rect in rects]
+        if self.full_present:
+            self.full_present = False
+            return [self.window.get_rect()]
+        return window_rects
+
+    def present_region(self, rect):
+        step = self.grid_step
+        left, top = rect.left // step * step, rect.top // step * step
+        region = pygame.Rect(left, top, align_up(rect.right, step) - left, align_up(rect.bottom, step) - top)
+        region = region.clip(self.grid_rect)
+        target = pygame.Rect(self.to_window(region.x) + self.offset[0], self.to_window(region.y) + self.offset[1],
+                             self.to_window(region.width), self.to_window(region.height))
+        if not self.smooth:
+            scaled = pygame.transform.scale(self.source.subsurface(region), target.size)
+        elif self.scale < 1:
+            scaled = pygame.transform.smoothscale(self.source.subsurface(region), target.size) # Only ever the whole canvas
+        else:
+            # Expanding samples at (source width - 1) / target width; one more source pixel makes that the scale,
+            # and an aligned region then matches a full present exactly
+            source = pygame.Rect(region.x, region.y, region.width + 1, region.height + 1)
+            scaled = pygame.transform.smoothscale(self.source.subsurface(source), target.size)
+        self.window.blit(scaled, target)
+        return target
+# --- End Display Scaling ---
+
+# --- Frame Profiling ---
+PROFILE_ENV_VAR = "IQRA_PROFILE" # Set to 1 to start with the profiler on
+PROFILE_OUTPUT_ENV_VAR = "IQRA_PROFILE_OUTPUT"
+DEFAULT_PROFILE_OUTPUT = "iqra_profile.json"
+PROFILE_HOTKEY = pygame.K_F3
+PROFILE_HISTORY_FRAMES = 300 # Rolling window shown in the graph and used for percentiles
+PROFILE_HISTOGRAM_BOUNDS_MS = (0.25, 0.5, 1, 2, 4, 8, 16.7, 33.3, 66.7) # Upper bucket edges; the last bucket is open
+PROFILE_PHASES = ("event_pump", "handle_event", "update", "draw", "draw_home_screen", "draw_classic_name_input",
+                  "draw_classic_game_play", "draw_wheel", "draw_daily_quiz", "draw_tournament_setup",
+                  "draw_tournament_standings", "draw_particles", "scale", "display_update")
+PROFILE_OVERLAY_RECT = pygame.Rect(SCREEN_WIDTH - 330, 10, 320, 150)
+PROFILE_FONT_SIZE = 16
+PROFILE_GRAPH_HEIGHT = 60
+PROFILE_GRAPH_MAX_MS = 33.3
+
+class FrameProfiler:
+    """Times each phase of the main loop, keeps rolling histograms and draws a live frame-time overlay."""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.frame_start = None
+        self.frame_phases = {} # phase -> seconds spent in it during the current frame
+        self.history = {} # phase -> recent per-frame milliseconds
+        self.histograms = {} # phase -> counts per PROFILE_HISTOGRAM_BOUNDS_MS bucket, over the whole session
+        self.frame_times = deque(maxlen=PROFILE_HISTORY_FRAMES)
+        self.frames = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+        self.frame_phases = {}
+        RENDER_TRACKER.mark(PROFILE_OVERLAY_RECT) # Draw or erase the overlay
+
+    def phase(self, name):
+        """Context manager timing a block as the named phase; free when profiling is off."""
+        if not self.enabled:
+            return nullcontext()
+        return ProfiledPhase(self, name)
+
+    def add(self, name, seconds):
+        self.frame_phases[name] = self.frame_phases.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        # The event pump ran inside the scheduler, before this frame's start was taken
+        frame_seconds = time.perf_counter() - self.frame_start + self.frame_phases.get("event_pump", 0.0)
+        self.record("frame", frame_seconds)
+        self.frame_times.append(frame_seconds * 1000)
+        for name, seconds in self.frame_phases.items():
+            self.record(name, seconds)
+        self.frame_phases = {}
+        self.frames += 1
+
+    def record(self, name, seconds):
+        milliseconds = seconds * 1000
+        history = self.history.get(name)
+        if history is None:
+            history = self.history[name] = deque(maxlen=PROFILE_HISTORY_FRAMES)
+            self.histograms[name] = [0] * (len(PROFILE_HISTOGRAM_BOUNDS_MS) + 1)
+        history.append(milliseconds)
+        bucket = 0
+        while bucket < len(PROFILE_HISTOGRAM_BOUNDS_MS) and milliseconds > PROFILE_HISTOGRAM_BOUNDS_MS[bucket]:
+            bucket += 1
+        self.histograms[name][bucket] += 1
+
+    def stats(self, name):
+        ordered = sorted(self.history.get(name, ()))
+        if not ordered:
+            return None
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+        return {"mean_ms": sum(ordered) / len(ordered), "p50_ms": percentile(50), "p90_ms": percentile(90),
+                "p99_ms": percentile(99), "max_ms": ordered[-1]}
+
+    def mark_overlay(self):
+        """Queues the overlay region so the scene under it is repainted before the graph is drawn again."""
+        if self.enabled and self.frames:
+            RENDER_TRACKER.mark(PROFILE_OVERLAY_RECT)
+
+    def draw_overlay(self, surface):
+        rect = PROFILE_OVERLAY_RECT
+        pygame.draw.rect(surface, NAVY, rect)
+        font = ASSETS.font(PROFILE_FONT_SIZE)
+        frame_budget_ms = 1000 / ACTIVE_FPS
+
+        graph_bottom = rect.bottom - 8
+        budget_y = graph_bottom - int(PROFILE_GRAPH_HEIGHT * frame_budget_ms / PROFILE_GRAPH_MAX_MS)
+        pygame.draw.line(surface, LIGHT_GRAY, (rect.x + 8, budget_y), (rect.right - 8, budget_y))
+        for i, milliseconds in enumerate(self.frame_times):
+            x = rect.x + 10 + i
+            height = min(PROFILE_GRAPH_HEIGHT, int(PROFILE_GRAPH_HEIGHT * milliseconds / PROFILE_GRAPH_MAX_MS))
+            color = GREEN if milliseconds <= frame_budget_ms else GOLD if milliseconds <= PROFILE_GRAPH_MAX_MS else RED
+            pygame.draw.line(surface, color, (x, graph_bottom), (x, graph_bottom - height))
+
+        # Numbers change every frame, so this text deliberately bypasses GLYPH_CACHE
+        lines = []
+        frame_stats = self.stats("frame")
+        if frame_stats:
+            lines.append(f"frame {frame_stats['mean_ms']:.2f} ms  p99 {frame_stats['p99_ms']:.2f} ms")
+        for names in (("event_pump", "handle_event", "update"), ("draw", "draw_wheel", "display_update")):
+            parts = [f"{name} {self.stats(name)['mean_ms']:.2f}" for name in names if name in self.history]
+            lines.append("  ".join(parts))
+        for i, line in enumerate(lines):
+            surface.blit(font.render(line, True, WHITE), (rect.x + 8, rect.y + 6 + i * (PROFILE_FONT_SIZE + 6)))
+        return rect
+
+    def dump(self, path):
+        """Writes rolling-window stats and session histograms for every phase seen to a JSON file."""
+        bucket_labels = [f"<={bound}ms" for bound in PROFILE_HISTOGRAM_BOUNDS_MS] + ["more"]
+        phases = {}
+        for name in ("frame",) + PROFILE_PHASES:
+            if name in self.histograms:
+                phases[name] = {"window": self.stats(name),
+                                "histogram": dict(zip(bucket_labels, self.histograms[name]))}
+        with open(path, "w", encoding="utf-8") as profile_file:
+            json.dump({"frames": self.frames, "phases": phases}, profile_file, indent=2)
+
+class ProfiledPhase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+def profiled(name):
+    """Decorator recording every call of a method as the named profiler phase."""
+    def decorate(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                PROFILER.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+PROFILER = FrameProfiler(enabled=os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0"))
+# --- End Frame Profiling ---
+
+# --- Quran Ayah Index ---
+# Built by build_quran_index.py from a local "surah|ayah|text" file (the Tanzil text format), then
+# memory-mapped on first lookup so the corpus adds nothing to startup time or resident memory.
+QURAN_INDEX_FILE_NAME = "quran_index.bin"
+QURAN_INDEX_MAGIC = b"IQRAYAH1"
+QURAN_INDEX_HEADER = struct.Struct("<8sIIII") # magic, record count, bucket count, records offset, text offset
+QURAN_INDEX_BUCKET = struct.Struct("<III") # first letter code point, first record, record count
+QURAN_INDEX_RECORD = struct.Struct("<HHII") # surah, ayah, text offset, text length in bytes
+
+# Letter forms folded together when bucketing an ayah by its first letter
+ARABIC_LETTER_VARIANTS = {
+    "\u0621": "ا", # hamza
+    "\u0622": "ا", # alef with madda
+    "\u0623": "ا", # alef with hamza above
+    "\u0625": "ا", # alef with hamza below
+    "\u0671": "ا", # alef wasla
+    "\u0624": "و", # waw with hamza
+    "\u0626": "ي", # yeh with hamza
+    "\u0649": "ي", # alef maksura
+    "\u0629": "ه", # teh marbuta
+}
+
+def ayah_first_letter(text):
+    """Returns the normalized first Arabic letter of an ayah, skipping diacritics, tatweel and Quranic marks."""
+    for character in text:
+        character = ARABIC_LETTER_VARIANTS.get(character, character)
+        if "\u0627" <= character <= "\u064a" and character != "\u0640": # Base letters, minus tatweel
+            return character
+    return None
+
+def build_quran_index(source_path, index_path):
+    """Buckets every ayah in a "surah|ayah|text" file by first letter and writes the binary index."""
+    buckets = {}
+    with open(source_path, encoding="utf-8") as source_file:
+        for line in source_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            surah, ayah, text = line.split("|", 2)
+            letter = ayah_first_letter(text)
+            if letter is not None:
+                buckets.setdefault(letter, []).append((int(surah), int(ayah), text.encode("utf-8")))
+
+    bucket_table = bytearray()
+    records = bytearray()
+    text_blob = bytearray()
+    record_count = 0
+    for letter in sorted(buckets):
+        ayat = sorted(buckets[letter])
+        bucket_table += QURAN_INDEX_BUCKET.pack(ord(letter), record_count, len(ayat))
+        for surah, ayah, encoded_text in ayat:
+            records += QURAN_INDEX_RECORD.pack(surah, ayah, len(text_blob), len(encoded_text))
+            text_blob += encoded_text
+        record_count += len(ayat)
+
+    records_offset = QURAN_INDEX_HEADER.size + len(bucket_table)
+    text_offset = records_offset + len(records)
+    with open(index_path, "wb") as index_file:
+        index_file.write(QURAN_INDEX_HEADER.pack(QURAN_INDEX_MAGIC, record_count, len(buckets),
+                                                 records_offset, text_offset))
+        index_file.write(bucket_table)
+        index_file.write(records)
+        index_file.write(text_blob)
+    return record_count, len(buckets)
+
+class AyahMatches:
+    """Read-only sequence of (surah, ayah, text) for one letter, decoded from the mapped index on access."""
+    def __init__(self, index, first_record, count):
+        self.index = index
+        self.first_record = first_record
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("ayah match index out of range")
+        return self.index.read_record(self.first_record + i)
+
+class QuranIndex:
+    """Memory-mapped ayah index bucketed by first letter. The file is only opened on the first lookup."""
+    def __init__(self, index_file_name=QURAN_INDEX_FILE_NAME):
+        self.path = os.path.join(script_dir, index_file_name)
+        self.data = None
+        self.buckets = None # letter -> (first record, count), or {} when the index is unavailable
+        self.records_offset = 0
+        self.text_offset = 0
+
+    def open(self):
+        self.buckets = {}
+        if not os.path.exists(self.path):
+            print(f"Quran index not found at '{self.path}'. Run build_quran_index.py to enable ayah lookup.")
+            return
+        buckets = {}
+        try:
+            with open(self.path, "rb") as index_file:
+                self.data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, record_count, bucket_count, self.records_offset, self.text_offset = \
+                QURAN_INDEX_HEADER.unpack_from(self.data)
+            if magic != QURAN_INDEX_MAGIC:
+                raise ValueError("unrecognised file format")
+            # Every offset read during play is checked here once, so a truncated or stale file can't fail mid-game
+            if not (QURAN_INDEX_HEADER.size + bucket_count * QURAN_INDEX_BUCKET.size <= self.records_offset
+                    <= self.records_offset + record_count * QURAN_INDEX_RECORD.size <= self.text_offset
+                    <= len(self.data)):
+                raise ValueError("file is truncated or its tables overlap")
+            for i in range(bucket_count):
+                code_point, first_record, count = QURAN_INDEX_BUCKET.unpack_from(
+                    self.data, QURAN_INDEX_HEADER.size + i * QURAN_INDEX_BUCKET.size)
+                if first_record + count > record_count:
+                    raise ValueError(f"bucket {i} points past the last record")
+                buckets[chr(code_point)] = (first_record, count)
+            if record_count:
+                records = np.frombuffer(self.data, dtype=np.dtype("<u4"), count=record_count * 3,
+                                        offset=self.records_offset).reshape(record_count, 3)
+                text_ends = records[:, 1].astype(np.int64) + records[:, 2] # surah and ayah share the first word
+                if text_ends.max() > len(self.data) - self.text_offset:
+                    raise ValueError("ayah text runs past the end of the file")
+        except (OSError, ValueError, OverflowError, struct.error) as e:
+            print(f"Error loading Quran index '{self.path}': {e}. Ayah lookup is disabled.")
+            self.data = None
+            return
+        self.buckets = buckets
+
+    def lookup(self, letter):
+        """Returns the ayat starting with the given letter (after normalization)."""
+        if self.buckets is None:
+            self.open()
+        first_record, count = self.buckets.get(ARABIC_LETTER_VARIANTS.get(letter, letter), (0, 0))
+        return AyahMatches(self, first_record, count)
+
+    def read_record(self, record):
+        surah, ayah, text_start, text_length = QURAN_INDEX_RECORD.unpack_from(
+            self.data, self.records_offset + record * QURAN_INDEX_RECORD.size)
+        start = self.text_offset + text_start
+        return surah, ayah, self.data[start:start + text_length].decode("utf-8")
+
+QURAN_INDEX = QuranIndex()
+REFEREE_RNG = random.Random() # Kept apart from the global RNG that decides spins
+# --- End Quran Ayah Index ---
+
+# --- Daily Quiz ---
+# The bank is JSON Lines, one {"question", "choices", "answer"} object per line, with "answer" the index of the
+# correct choice. A sidecar file of byte offsets lets any question be read with one seek, so banks of any size
+# are never loaded into memory.
+QUIZ_BANK_FILE_NAME = "daily_quiz.jsonl"
+QUIZ_INDEX_SUFFIX = ".idx"
+QUIZ_INDEX_MAGIC = b"IQRAQIX1"
+QUIZ_INDEX_HEADER = struct.Struct("<8sIQQ") # magic, question count, bank size, bank modification time (ns)
+QUIZ_INDEX_OFFSET = struct.Struct("<Q")
+QUIZ_QUESTIONS_PER_DAY = 5
+QUIZ_CHOICE_COUNT = 4 # One answer button each, so questions with more choices are left out of the index
+
+def daily_question_indices(day_number, question_count, per_day=QUIZ_QUESTIONS_PER_DAY):
+    """Picks a day's questions with a generator seeded by the day, so everyone gets the same ones on a date.
+
+    Nearby days are unrelated draws, so a question can come back on a later day before the bank is used up.
+    Sampling from a range never builds the whole permutation, so this stays cheap for any bank size.
+    """
+    return random.Random(day_number).sample(range(question_count), min(per_day, question_count))
+
+def parse_question(line):
+    """Returns the question on a bank line, or None if it is malformed or can't be answered with the buttons."""
+    try:
+        question = json.loads(line)
+    except ValueError: # Covers bad UTF-8 as well as bad JSON
+        return None
+    if not isinstance(question, dict) or not isinstance(question.get("question"), str):
+        return None
+    choices, answer = question.get("choices"), question.get("answer")
+    if (not isinstance(choices, list) or not 2 <= len(choices) <= QUIZ_CHOICE_COUNT
+            or not all(isinstance(choice, str) for choice in choices)):
+        return None
+    if not isinstance(answer, int) or isinstance(answer, bool) or not 0 <= answer < len(choices):
+        return None
+    return question
+
+class QuestionBank:
+    """JSON Lines question bank read one question at a time through a byte-offset index."""
+    def __init__(self, bank_file_name=QUIZ_BANK_FILE_NAME):
+        self.path = os.path.join(script_dir, bank_file_name)
+        self.index_path = self.path + QUIZ_INDEX_SUFFIX
+        self.bank_file = None
+        self.index_data = None # Memory-mapped index file, when one is up to date
+        self.offsets = None # In-memory offsets, when the index had to be rebuilt
+        self.count = 0
+
+    def open(self):
+        """Opens the bank and its index, rebuilding the index if it is missing or stale. Returns False if unavailable."""
+        try:
+            stat = os.stat(self.path)
+            self.bank_file = open(self.path, "rb")
+        except OSError as e:
+            print(f"Quiz question bank not available at '{self.path}': {e}")
+            return False
+        if not self.load_index(stat.st_size, stat.st_mtime_ns):
+            self.build_index(stat.st_size, stat.st_mtime_ns)
+        return True
+
+    def load_index(self, bank_size, bank_mtime):
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, "rb") as index_file:
+                index_data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, indexed_size, indexed_mtime = QUIZ_INDEX_HEADER.unpack_from(index_data)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error loading quiz index '{self.index_path}': {e}. Rebuilding it.")
+            return False
+        if magic != QUIZ_INDEX_MAGIC or indexed_size != bank_size or indexed_mtime != bank_mtime:
+            index_data.close()
+            return False
+        if len(index_data) < QUIZ_INDEX_HEADER.size + count * QUIZ_INDEX_OFFSET.size:
+            print(f"Quiz index '{self.index_path}' is truncated. Rebuilding it.")
+            index_data.close()
+            return False
+        self.index_data = index_data
+        self.count = count
+        return True
+
+    def build_index(self, bank_size, bank_mtime):
+        """Records where every valid question line starts in one streaming pass, then tries to save it for next time.
+
+        Each line is parsed once here, so questions that could never be shown or answered are left out.
+        """
+        offsets = array("Q")
+        skipped = 0
+        self.bank_file.seek(0)
+        offset = 0
+        for line in self.bank_file:
+            if line.strip():
+                if parse_question(line) is not None:
+                    offsets.append(offset)
+                else:
+                    skipped += 1
+            offset += len(line)
+        if skipped:
+            print(f"Skipped {skipped} malformed questions in '{self.path}' (each needs 2 to {QUIZ_CHOICE_COUNT} "
+                  f"choices and an answer index among them)")
+        self.offsets = offsets
+        self.count = len(offsets)
+        index_offsets = array("Q", offsets)
+        if sys.byteorder != "little":
+            index_offsets.byteswap() # The index file is little-endian, like QUIZ_INDEX_OFFSET
+        try:
+            with open(self.index_path, "wb") as index_file:
+                index_file.write(QUIZ_INDEX_HEADER.pack(QUIZ_INDEX_MAGIC, self.count, bank_size, bank_mtime))
+                index_file.write(index_offsets.tobytes())
+        except OSError as e:
+            # Read-only installs still work; they just rebuild the offsets each run
+            print(f"Could not save quiz index '{self.index_path}': {e}")
+
+    def offset(self, i):
+        if self.index_data is not None:
+            position = QUIZ_INDEX_HEADER.size + i * QUIZ_INDEX_OFFSET.size
+            return QUIZ_INDEX_OFFSET.unpack_from(self.index_data, position)[0]
+        return self.offsets[i]
+
+    def question(self, i):
+        """Returns question i, or None if its line no longer parses."""
+        self.bank_file.seek(self.offset(i))
+        question = parse_question(self.bank_file.readline())
+        if question is None:
+            print(f"Skipping malformed question {i} in '{self.path}'")
+        return question
+
+    def close(self):
+        if self.bank_file:
+            self.bank_file.close()
+        if self.index_data is not None:
+            self.index_data.close()
+        self.bank_file = self.index_data = self.offsets = None
+        self.count = 0
+
+class DailyQuiz:
+    """Progress through one day's questions."""
+    def __init__(self, bank, date):
+        self.bank = bank
+        self.date = date
+        self.indices = daily_question_indices(date.toordinal(), bank.count)
+        self.position = 0
+        self.score = 0
+        self.chosen = None # Index of the choice picked for the current question, once answered
+        self.question = self.load_question()
+
+    @property
+    def finished(self):
+        return self.position >= len(self.indices)
+
+    def answer(self, choice):
+        if self.chosen is None:
+            self.chosen = choice
+            if choice == self.question["answer"]:
+                self.score += 1
+
+    def next_question(self):
+        self.position += 1
+        self.chosen = None
+        self.question = self.load_question()
+
+    def load_question(self):
+        """Reads the current question, dropping any that fail to parse so the day just has fewer."""
+        while not self.finished:
+            question = self.bank.question(self.indices[self.position])
+            if question is not None:
+                return question
+            del self.indices[self.position]
+        return None
+
+def wrap_text(text, font, max_width):
+    """Splits text into shaped display lines no wider than max_width, breaking between words."""
+    lines = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and font.size(shape_text(candidate))[0] > max_width:
+            lines.append(shape_text(current))
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(shape_text(current))
+    return lines
+# --- End Daily Quiz ---
+
+# --- Tournament ---
+TOURNAMENT_ROSTER_FILE_NAME = "tournament_players.txt" # Optional roster, one contestant per line
+TOURNAMENT_ROUND_ROBIN = "Round Robin"
+TOURNAMENT_KNOCKOUT = "Knockout"
+STANDINGS_TOP = 180
+STANDINGS_ROW_HEIGHT = 36
+STANDINGS_VISIBLE_ROWS = 10
+STANDINGS_WIDTH = 800
+STANDINGS_SCROLL_KEYS = {
+    pygame.K_UP: -1, pygame.K_DOWN: 1,
+    pygame.K_PAGEUP: -STANDINGS_VISIBLE_ROWS, pygame.K_PAGEDOWN: STANDINGS_VISIBLE_ROWS,
+}
+
+def load_tournament_roster(roster_file_name=TOURNAMENT_ROSTER_FILE_NAME):
+    """Returns the contestant names listed in the roster file, or an empty list if there is none."""
+    roster_path = os.path.join(script_dir, roster_file_name)
+    if not os.path.exists(roster_path):
+        return []
+    try:
+        with open(roster_path, encoding="utf-8") as roster_file:
+            return [line.strip() for line in roster_file if line.strip()]
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error loading tournament roster '{roster_file_name}': {e}")
+        return []
+
+def round_robin_rounds(player_count):
+    """Yields each round's pairings by the circle method, so every player meets every other exactly once."""
+    players = list(range(player_count))
+    if player_count % 2:
+        players.append(None) # Whoever is paired with None sits the round out
+    half = len(players) // 2
+    for _ in range(len(players) - 1):
+        yield [(players[i], players[-1 - i]) for i in range(half) if players[i] is not None and players[-1 - i] is not None]
+        players.insert(1, players.pop()) # Rotate everyone but the first player
+
+class ScoreTree:
+    """Fenwick tree counting players per score, so "how many players score at most s" costs O(log max score)."""
+    def __init__(self, capacity):
+        self.per_score = [0] * capacity
+        self.tree = [0] * (capacity + 1) # 1-based: score s lives at index s + 1
+
+    def add(self, score, delta):
+        if score >= len(self.per_score):
+            self.grow(score + 1)
+        self.per_score[score] += delta
+        i = score + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def grow(self, min_capacity):
+        """Doubles the capacity until min_capacity fits, rebuilding the tree in O(capacity)."""
+        capacity = len(self.per_score)
+        while capacity < min_capacity:
+            capacity *= 2
+        self.per_score.extend([0] * (capacity - len(self.per_score)))
+        self.tree = [0] + self.per_score[:]
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def count_at_most(self, score):
+        i = min(score + 1, len(self.tree) - 1)
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def kth_score(self, k):
+        """Returns the score of the k-th lowest player (k from 0), descending the tree in O(log capacity)."""
+        index = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if index + step < len(self.tree) and self.tree[index + step] <= k:
+                index += step
+                k -= self.tree[index]
+            step >>= 1
+        return index # The answer sits at tree index + 1, which holds score index
+
+class Leaderboard:
+    """Tournament standings, kept in order as scores change instead of being re-sorted.
+
+    A ScoreTree gives any player's rank and the score at any standings position in O(log n). Players with
+    the same score sit in a bucket sorted by the tie-breakers: more letters recited first, then whoever
+    reached the score first.
+    """
+    def __init__(self, player_count):
+        self.scores = [0] * player_count
+        self.letters = [0] * player_count # Letters recited over all matches, the first tie-breaker
+        self.reached = list(range(player_count)) # When each player reached their score, the second tie-breaker
+        self.clock = player_count
+        self.tree = ScoreTree(max(player_count, 1))
+        self.tree.add(0, player_count)
+        self.buckets = {0: [self.order_key(player) for player in range(player_count)]} # score -> sorted keys
+
+    def __len__(self):
+        return len(self.scores)
+
+    def order_key(self, player):
+        return -self.letters[player], self.reached[player], player
+
+    def add_points(self, player, points=1, letters=0):
+        """Adds points and recited letters to a player; a loser gains letters but no points."""
+        old_score = self.scores[player]
+        new_score = old_score + points
+        bucket = self.buckets[old_score]
+        del bucket[bisect_left(bucket, self.order_key(player))]
+        if not bucket:
+            del self.buckets[old_score]
+        self.letters[player] += letters
+        if points:
+            self.reached[player] = self.clock
+            self.clock += 1
+            self.tree.add(old_score, -1)
+            self.tree.add(new_score, 1)
+            self.scores[player] = new_score
+        insort(self.buckets.setdefault(new_score, []), self.order_key(player))
+
+    def rank(self, player):
+        """1-based rank; tied players share the better rank (1, 2, 2, 4)."""
+        return len(self.scores) - self.tree.count_at_most(self.scores[player]) + 1
+
+    def rows(self, start, count):
+        """Yields (rank, player) for standings positions start to start + count - 1, best first."""
+        end = min(start + count, len(self.scores))
+        position = start
+        while position < end:
+            score = self.tree.kth_score(len(self.scores) - 1 - position)
+            above = len(self.scores) - self.tree.count_at_most(score)
+            for _, _, player in islice(self.buckets[score], position - above, end - above):
+                yield above + 1, player
+                position += 1
+
+class Tournament:
+    """Schedules the matches of a round robin or knockout tournament and keeps its leaderboard."""
+    def __init__(self, names, tournament_format):
+        self.names = list(names)
+        self.format = tournament_format
+        self.leaderboard = Leaderboard(len(self.names))
+        self.round = 0
+        self.pending = deque() # Matches left in the current round, as (player, player)
+        self.advancing = [] # Knockout players through to the next round
+        self.champion = None
+        if tournament_format == TOURNAMENT_ROUND_ROBIN:
+            self.rounds = round_robin_rounds(len(self.names))
+        else:
+            self.advancing = list(range(len(self.names)))
+        self.start_next_round()
+
+    @property
+    def finished(self):
+        return self.champion is not None
+
+    @property
+    def next_match(self):
+        return self.pending[0] if self.pending else None
+
+    def start_next_round(self):
+        if self.format == TOURNAMENT_ROUND_ROBIN:
+            pairings = next(self.rounds, None)
+            if pairings is None:
+                _, self.champion = next(self.leaderboard.rows(0, 1)) # Ties go to the most letters recited
+                return
+        else:
+            entrants, self.advancing = self.advancing, []
+            if len(entrants) == 1:
+                self.champion = entrants[0]
+                return
+            # Byes pad the first round to a power of two and go to the top seeds; later rounds need none
+            bye_count = (1 << (len(entrants) - 1).bit_length()) - len(entrants)
+            self.advancing = entrants[:bye_count]
+            playing = entrants[bye_count:]
+            pairings = [(playing[i], playing[-1 - i]) for i in range(len(playing) // 2)]
+        self.round += 1
+        self.pending.extend(pairings)
+
+    def record_result(self, winner, loser, winner_letters, loser_letters):
+        self.pending.popleft()
+        self.leaderboard.add_points(winner, letters=winner_letters)
+        self.leaderboard.add_points(loser, 0, loser_letters)
+        if self.format == TOURNAMENT_KNOCKOUT:
+            self.advancing.append(winner)
+        while not self.pending and not self.finished:
+            self.start_next_round()
+# --- End Tournament ---
+
+# --- Game Event Log ---
+EVENT_LOG_ENV_VAR = "IQRA_EVENT_LOG" # Set to a file path to record every game event there
+# File header; the last byte is the format version. Version 2 logs landings under the fixed pointer, so version 1
+# logs, whose landings followed an older rule, can't be replayed
+EVENT_LOG_MAGIC = b"IQRALOG\x02"
+# Seconds since the log was opened, kind, player slot, letter (index into ARABIC_LETTERS), score, value, text
+EVENT_TEXT_SIZE = 24 # Bytes of UTF-8 kept from a player name, making records 40 bytes
+EVENT_RECORD = struct.Struct(f"<dBBBBI{EVENT_TEXT_SIZE}s")
+NO_LETTER = 255
+
+EVENT_SESSION_START = 0 # A new run of the game started appending to the log
+EVENT_GAME_START = 1 # One per player: player slot and name; value is the start angle seed
+EVENT_SPIN = 2 # value is the spin seed
+EVENT_LANDED = 3 # letter the wheel stopped on
+EVENT_LETTER_CHOSEN = 4 # letter picked after landing on the star
+EVENT_VERDICT = 5 # value is 1 for correct and 0 for wrong; score is the player's score afterwards
+EVENT_KIND_NAMES = {
+    EVENT_SESSION_START: "session_start", EVENT_GAME_START: "game_start", EVENT_SPIN: "spin",
+    EVENT_LANDED: "landed", EVENT_LETTER_CHOSEN: "letter_chosen", EVENT_VERDICT: "verdict",
+}
+
+def encode_record_text(text):
+    """UTF-8, cut to the record's text field without splitting a character."""
+    return text.encode("utf-8")[:EVENT_TEXT_SIZE].decode("utf-8", "ignore").encode("utf-8")
+
+class EventLog:
+    """Appends fixed-size game event records to a file from a background thread.
+
+    record() only packs the event and queues it, so the frame loop never waits on the disk.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.start = time.perf_counter()
+        self.records_written = 0
+        self.log_file = open(path, "ab")
+        if self.log_file.tell() == 0:
+            self.log_file.write(EVENT_LOG_MAGIC)
+        else:
+            with open(path, "rb") as existing_file:
+                if existing_file.read(len(EVENT_LOG_MAGIC)) != EVENT_LOG_MAGIC:
+                    self.log_file.close()
+                    raise ValueError("not an event log of this version; appending would mix formats")
+        self.writer_thread = threading.Thread(target=self.write_records, name="event-log", daemon=True)
+        self.writer_thread.start()
+        self.record(EVENT_SESSION_START)
+
+    def record(self, kind, player=0, letter=None, score=0, value=0, text=""):
+        letter_code = NO_LETTER if letter is None else ARABIC_LETTERS.index(letter)
+        self.queue.put(EVENT_RECORD.pack(time.perf_counter() - self.start, kind, player, letter_code, score,
+                                         value, encode_record_text(text)))
+
+    def write_records(self):
+        closing = False
+        while not closing:
+            batch = [self.queue.get()] # Sleeps until there is something to write
+            while not self.queue.empty():
+                batch.append(self.queue.get())
+            if batch[-1] is None: # close() was called
+                closing = True
+                batch.pop()
+            self.log_file.write(b"".join(batch))
+            self.log_file.flush()
+            self.records_written += len(batch)
+        self.log_file.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.writer_thread.join()
+
+def read_event_log(path):
+    """Yields (time, kind, player, letter, score, value, text) for every record in a log file."""
+    with open(path, "rb") as log_file:
+        magic = log_file.read(len(EVENT_LOG_MAGIC))
+        if magic != EVENT_LOG_MAGIC:
+            if magic[:-1] == EVENT_LOG_MAGIC[:-1]:
+                raise ValueError(f"'{path}' was recorded by a different version of the game and can't be replayed")
+            raise ValueError(f"'{path}' is not an IQRA event log")
+        while True:
+            record = log_file.read(EVENT_RECORD.size)
+            if len(record) < EVENT_RECORD.size:
+                return # A record cut short by a crash is dropped
+            timestamp, kind, player, letter_code, score, value, text = EVENT_RECORD.unpack(record)
+            letter = None if letter_code == NO_LETTER else ARABIC_LETTERS[letter_code]
+            yield timestamp, kind, player, letter, score, value, text.rstrip(b"\0").decode("utf-8")
+# --- End Game Event Log ---
+
+# --- Spectator Broadcast ---
+BROADCAST_ENV_VAR = "IQRA_BROADCAST" # Set to HOST[:PORT], e.g. 255.255.255.255 for the whole LAN, to feed spectator screens
+BROADCAST_RATE_ENV_VAR = "IQRA_BROADCAST_RATE" # Snapshots per second
+BROADCAST_PORT = 47820
+BROADCAST_RATE = 10 # Spectators extrapolate the wheel between snapshots, so a low rate still looks smooth
+BROADCAST_KEYFRAME_INTERVAL = 1.0 # Seconds between full snapshots, so late joiners and lost packets recover quickly
+# Magic, format version, flags, sequence number, sequence number of the keyframe a delta is based on, field mask
+SNAPSHOT_HEADER = struct.Struct("<2sBBHHH")
+SNAPSHOT_MAGIC = b"IQ"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEYFRAME = 0x01 # Flag: the packet carries every field
+SNAPSHOT_FLOAT = struct.Struct("<f")
+# A snapshot is a tuple in this order; bit i of the field mask says whether field i is in the packet
+SNAPSHOT_FIELDS = ("playing", "angle", "speed", "letter", "player", "scores", "names")
+CHOOSING_LETTER = 254 # Letter code while a player picks a letter after landing on the star
+
+def broadcast_address(text):
+    """Parses HOST[:PORT] into a socket address, raising ValueError if the port is not a number."""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host, int(port) if port else BROADCAST_PORT
+
+def pack_snapshot_field(name, value):
+    if name in ("angle", "speed"):
+        return SNAPSHOT_FLOAT.pack(value)
+    if name == "scores":
+        return bytes((len(value),) + value)
+    if name == "names":
+        parts = [bytes((len(value),))]
+        for player_name in value:
+            encoded = encode_record_text(player_name)
+            parts += [bytes((len(encoded),)), encoded]
+        return b"".join(parts)
+    return bytes((value,))
+
+def encode_snapshot(sequence, keyframe_sequence, snapshot, keyframe=None):
+    """Packs a keyframe with every field, or, given the keyframe it is based on, only the fields that differ."""
+    mask = 0
+    body = []
+    for bit, (name, value) in enumerate(zip(SNAPSHOT_FIELDS, snapshot)):
+        if keyframe is None or keyframe[bit] != value:
+            mask |= 1 << bit
+            body.append(pack_snapshot_field(name, value))
+    flags = SNAPSHOT_KEYFRAME if keyframe is None else 0
+    return SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, sequence, keyframe_sequence, mask) + b"".join(body)
+
+def decode_snapshot(packet):
+    """Returns (flags, sequence, keyframe sequence, {field: value}) with only the fields the packet carries.
+
+    Raises ValueError for anything that is not a well-formed snapshot packet.
+    """
+    try:
+        magic, version, flags, sequence, keyframe_sequence, mask = SNAPSHOT_HEADER.unpack_from(packet)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("not an IQRA snapshot")
+        fields = {}
+        offset = SNAPSHOT_HEADER.size
+        for bit, name in enumerate(SNAPSHOT_FIELDS):
+            if not mask & (1 << bit):
+                continue
+            if name in ("angle", "speed"):
+                fields[name] = SNAPSHOT_FLOAT.unpack_from(packet, offset)[0]
+                offset += SNAPSHOT_FLOAT.size
+            elif name == "scores":
+                count = packet[offset]
+                fields[name] = tuple(packet[offset + 1:offset + 1 + count])
+                offset += 1 + count
+            elif name == "names":
+                names = []
+                count = packet[offset]
+                offset += 1
+                for _ in range(count):
+                    length = packet[offset]
+                    names.append(packet[offset + 1:offset + 1 + length].decode("utf-8"))
+                    offset += 1 + length
+                fields[name] = tuple(names)
+            else:
+                fields[name] = packet[offset]
+                offset += 1
+        if offset > len(packet):
+            raise ValueError("truncated snapshot")
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed snapshot: {e}") from e
+    return flags, sequence, keyframe_sequence, fields
+
+class SpectatorHost:
+    """Streams game snapshots to spectator screens over UDP from a background thread.
+
+    The frame loop only hands over its latest snapshot. The thread sends a keyframe every
+    BROADCAST_KEYFRAME_INTERVAL and, at the configured rate in between, only the fields that differ from that
+    keyframe, and only when something changed. A lost packet therefore never corrupts what a spectator shows,
+    and an idle game costs one small packet a second. A spin starting is sent at once, without waiting for the
+    next tick, since spectators cannot extrapolate a spin they have not heard of.
+    """
+    def __init__(self, address, rate=BROADCAST_RATE):
+        if rate <= 0:
+            raise ValueError(f"broadcast rate must be positive, not {rate}")
+        self.address = address
+        self.interval = 1 / rate
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.latest = None
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.send_errors = 0
+        self.stopping = threading.Event()
+        self.wake = threading.Event()
+        self.sender_thread = threading.Thread(target=self.send_snapshots, name="spectator-host", daemon=True)
+        self.sender_thread.start()
+
+    def publish(self, snapshot):
+        speed_index = SNAPSHOT_FIELDS.index("speed")
+        starting_spin = self.latest is not None and snapshot[speed_index] > 0 and not self.latest[speed_index]
+        self.latest = snapshot # One reference swap, so the sender always sees a whole snapshot
+        if starting_spin:
+            self.wake.set()
+
+    def send_snapshots(self):
+        sequence = 0
+        keyframe = None
+        keyframe_sequence = 0
+        keyframe_time = 0.0
+        sent = None
+        while not self.stopping.is_set():
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            if self.stopping.is_set():
+                break
+            snapshot = self.latest
+            now = time.perf_counter()
+            if snapshot is None:
+                continue
+            if keyframe is None or now - keyframe_time >= BROADCAST_KEYFRAME_INTERVAL:
+                keyframe, keyframe_sequence, keyframe_time = snapshot, sequence, now
+                packet = encode_snapshot(sequence, sequence, snapshot)
+            elif snapshot != sent:
+                packet = encode_snapshot(sequence, keyframe_sequence, snapshot, keyframe)
+            else:
+                continue
+            try:
+                self.socket.sendto(packet, self.address)
+            except OSError as e:
+                if not self.send_errors: # A missing network is reported once, not ten times a second
+                    print(f"Error sending spectator snapshot to {self.address}: {e}")
+                self.send_errors += 1
+            else:
+                self.packets_sent += 1
+                self.bytes_sent += len(packet)
+            sent = snapshot
+            sequence = (sequence + 1) & 0xFFFF
+
+    def close(self):
+        self.stopping.set()
+        self.wake.set()
+        self.sender_thread.join()
+        self.socket.close()
+
+    def summary(self):
+        return f"{self.packets_sent} packets, {self.bytes_sent} bytes sent to {self.address[0]}:{self.address[1]}"
+# --- End Spectator Broadcast ---
 
 # Game States
 STATE_HOME_SCREEN = "home_screen"
 STATE_NAME_INPUT_CLASSIC = "name_input_classic" # For classic game's player name input
 STATE_CLASSIC_WHEEL_GAME = "classic_wheel_game"
-STATE_DAILY_QUIZ_PLACEHOLDER = "daily_quiz_placeholder"
-
+STATE_DAILY_QUIZ = "daily_quiz"
+STATE_TOURNAMENT_SETUP = "tournament_setup"
+STATE_TOURNAMENT_STANDINGS = "tournament_standings"
+
+LABEL_PADDING = 16 # Space kept between a label and the edge of its button or panel
+MIN_LABEL_FONT_SIZE = 20
+
+@lru_cache(maxsize=256)
+def font_to_fit(text, width, size):
+    """The largest font up to size that fits text in width; MIN_LABEL_FONT_SIZE if none does."""
+    while size > MIN_LABEL_FONT_SIZE and ASSETS.font(size).size(text)[0] > width:
+        size -= 2
+    return ASSETS.font(size)
+
+def blit_within(surface, image, center, bounds):
+    """Blits image centred on center, cut off at the edges of bounds."""
+    image_rect = image.get_rect(center=center)
+    visible = image_rect.clip(bounds)
+    surface.blit(image, visible, visible.move(-image_rect.x, -image_rect.y))
+
+def label_width(text, size=BUTTON_FONT_SIZE):
+    """Width of a button wide enough for text at full size."""
+    return ASSETS.font(size).size(text)[0] + 2 * LABEL_PADDING
 
 class TextInput:
     def __init__(self, x, y, width, height, placeholder="Enter name"):
         self.rect = pygame.Rect(x, y, width, height)
-        self.text = ""
+        self._text = ""
         self.placeholder = placeholder
         self.active = False
-        self.font = FONT_TEXT_INPUT # Use loaded global font
+        self.rendered_text = None # Shaped and rasterized text, rebuilt only when the text changes
+
+    @property
+    def font(self):
+        return ASSETS.font(TEXT_INPUT_FONT_SIZE)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        if text != self._text:
+            RENDER_TRACKER.mark(self.redraw_rect()) # Where the old text was drawn
+            self._text = text
+            self.rendered_text = None
+            RENDER_TRACKER.mark(self.redraw_rect()) # Where the new text will be drawn
+
+    def render_text(self):
+        """Returns the text surface, shaping Arabic/RTL input once per edit rather than once per frame."""
+        if self.rendered_text is None:
+            if len(self.text) > 0:
+                self.rendered_text = self.font.render(shape_text(self.text), True, NAVY)
+            else:
+                self.rendered_text = GLYPH_CACHE.render(self.placeholder, self.font, LIGHT_GRAY)
+        return self.rendered_text
+
+    def redraw_rect(self):
+        """The box plus the area its centered text covers, which can spill past the box."""
+        return self.rect.union(self.render_text().get_rect(center=self.rect.center))
+
+    def set_active(self, active):
+        if active != self.active:
+            self.active = active
+            RENDER_TRACKER.mark(self.rect)
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
-            self.active = self.rect.collidepoint(event.pos)
+            self.set_active(self.rect.collidepoint(event.pos))
         elif event.type == pygame.KEYDOWN and self.active:
             if event.key == pygame.K_RETURN:
-                self.active = False
+                self.set_active(False)
             elif event.key == pygame.K_BACKSPACE:
                 self.text = self.text[:-1]
             else:
@@ -139,279 +1950,447 @@ class TextInput:
         pygame.draw.rect(surface, WHITE, self.rect)
         pygame.draw.rect(surface, NAVY if self.active else GOLD, self.rect, 2)
 
-        if len(self.text) > 0:
-            text = self.font.render(self.text, True, NAVY)
-        else:
-            text = self.font.render(self.placeholder, True, LIGHT_GRAY)
-
+        text = self.render_text()
         text_rect = text.get_rect(center=self.rect.center)
         surface.blit(text, text_rect)
 
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
         self.rect = pygame.Rect(x, y, width, height)
+        if text and label_width(text) > width:
+            self.rect.inflate_ip(label_width(text) - width, 0) # Grows about its centre to fit the label
         self.text = text
         self.color = color
         self.hover_color = hover_color
         self.is_hovered = False
-        self.font = FONT_BUTTON # Use loaded global font
+
+    @property
+    def font(self):
+        # Labels set after construction, like quiz answers, shrink to fit instead
+        return font_to_fit(self.text, self.rect.width - 2 * LABEL_PADDING, BUTTON_FONT_SIZE)
 
     def draw(self, surface):
+        if outside_clip(surface, self.rect):
+            return
         color = self.hover_color if self.is_hovered else self.color
         pygame.draw.rect(surface, color, self.rect, border_radius=10)
         pygame.draw.rect(surface, NAVY, self.rect, 2, border_radius=10)
 
-        text_surface = self.font.render(self.text, True, NAVY)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        surface.blit(text_surface, text_rect)
+        text_surface = GLYPH_CACHE.render(self.text, self.font, NAVY)
+        blit_within(surface, text_surface, self.rect.center, self.rect.inflate(-2 * LABEL_PADDING, 0))
+
+    def set_hovered(self, is_hovered):
+        if is_hovered != self.is_hovered:
+            self.is_hovered = is_hovered
+            RENDER_TRACKER.mark(self.rect)
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
-            self.is_hovered = self.rect.collidepoint(event.pos)
+            self.set_hovered(self.rect.collidepoint(event.pos))
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if self.is_hovered:
                 return True
         return False
 
-class Game:
-    def __init__(self):
-        self.current_game_state = STATE_HOME_SCREEN  # Start with the home screen
-        # self.classic_game_phase is no longer needed, game flow is managed by self.current_game_state
+def recite_instruction(letter):
+    return f"Recite an Ayat starting with {letter}"
 
-        # Variables for Classic Wheel Game (many will be initialized/reset when classic game starts)
-        self.players = [
-            {"name": "", "score": 0},
-            {"name": "", "score": 0}
-        ]
-        self.current_player = 0
-        self.angle = 0
-        self.spin_speed = 0
-        self.is_spinning = False
-        self.selected_letter = None
-        self.is_choosing_letter = False
-        self.clickable_letters_rects = []
+def choose_instruction(player_name):
+    return f"{player_name}, pick a letter!"
+
+def referee_hint(letter, matches, example):
+    surah, ayah, _ = example
+    return f"Referee: {len(matches)} ayat begin with {letter} (e.g. {surah}:{ayah})"
+
+# --- Scenes ---
+class Scene:
+    """One screen of the game: its widgets, hit index, caches, input handling and drawing.
+
+    Game builds a scene the first time it is entered and keeps it, so each screen's widgets are made once, and
+    only for the screens actually visited. enter() runs every time the scene is pushed, resume() when the scene
+    above it is popped, and leave() when it is popped itself, to let go of anything costly to hold while hidden.
+    """
+    state = None # The STATE_* name the scene is registered under in SCENE_TYPES
+
+    def __init__(self, game):
+        self.game = game
+        self.hit_index = HitIndex()
+
+    def index(self, *targets):
+        """Indexes the scene's clickable elements once, after its layout is fixed."""
+        self.hit_index = HitIndex([(target.rect, target) for target in targets])
+
+    def active_hit_index(self):
+        return self.hit_index
+
+    def panels(self):
+        """Bordered rects on screen, which must be redrawn whole (see Game.mark_particles)."""
+        return self.active_hit_index().rects
+
+    def enter(self):
+        pass
+
+    def resume(self):
+        pass
 
-        # UI Elements - some are general, some specific to classic game
-        # Home Screen Buttons
-        button_width = 300
+    def leave(self):
+        pass
+
+    def is_animating(self):
+        return False
+
+    def update(self, dt):
+        pass
+
+    def handle_event(self, event, clicked):
+        """Handles one event; clicked is what a button press hit in active_hit_index(), or None."""
+        pass
+
+    def draw(self, surface):
+        pass
+
+def back_button():
+    button = Button(20, 20, 150, 40, "Back to Menu", LIGHT_GRAY, GOLD)
+    button.rect.left = 20 # Position top-left, however wide the label made it
+    return button
+
+class HomeScene(Scene):
+    state = STATE_HOME_SCREEN
+
+    def __init__(self, game):
+        super().__init__(game)
+        labels = ("Classic Quranic Wheel", "Tournament", "Daily Islamic Quiz", "Quit")
+        button_width = max(300, *(label_width(label) for label in labels)) # One width for the whole column
         button_height = 60
         button_spacing = 20
-        home_buttons_start_y = SCREEN_HEIGHT // 2 - (button_height * 3 + button_spacing * 2) // 2 # Centered vertically
+        buttons_start_y = 310 # Below the title
 
-        self.home_play_classic_button = Button(
+        self.play_classic_button = Button(
             SCREEN_WIDTH // 2 - button_width // 2,
-            home_buttons_start_y,
+            buttons_start_y,
             button_width, button_height, "Classic Quranic Wheel", LIGHT_GRAY, GOLD
         )
-        self.home_daily_quiz_button = Button(
+        self.tournament_button = Button(
             SCREEN_WIDTH // 2 - button_width // 2,
-            home_buttons_start_y + button_height + button_spacing,
+            buttons_start_y + button_height + button_spacing,
+            button_width, button_height, "Tournament", LIGHT_GRAY, GOLD
+        )
+        self.daily_quiz_button = Button(
+            SCREEN_WIDTH // 2 - button_width // 2,
+            buttons_start_y + (button_height + button_spacing) * 2,
             button_width, button_height, "Daily Islamic Quiz", LIGHT_GRAY, GOLD
         )
-        self.home_quit_button = Button(
+        self.quit_button = Button(
             SCREEN_WIDTH // 2 - button_width // 2,
-            home_buttons_start_y + (button_height + button_spacing) * 2,
+            buttons_start_y + (button_height + button_spacing) * 3,
             button_width, button_height, "Quit", LIGHT_GRAY, RED
         )
+        self.index(self.play_classic_button, self.tournament_button, self.daily_quiz_button, self.quit_button)
+
+    def handle_event(self, event, clicked):
+        if clicked is self.play_classic_button:
+            self.game.push_scene(STATE_NAME_INPUT_CLASSIC)
+        elif clicked is self.tournament_button:
+            self.game.open_tournament()
+        elif clicked is self.daily_quiz_button:
+            self.game.push_scene(STATE_DAILY_QUIZ)
+        elif clicked is self.quit_button:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    @profiled("draw_home_screen")
+    def draw(self, surface):
+        logo = self.game.logo
+        if logo:
+            logo_rect = logo.get_rect(midtop=(SCREEN_WIDTH // 2, 100)) # Position logo higher
+            surface.blit(logo, logo_rect)
 
-        # Classic Game Buttons & Inputs
-        self.spin_button = Button(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 100,
-                                  200, 50, "SPIN", LIGHT_GRAY, GOLD)
-        self.correct_button = Button(SCREEN_WIDTH//2 + 120, SCREEN_HEIGHT - 100,
-                                     200, 50, "✓ Correct", GREEN, LIGHT_GRAY)
-        self.wrong_button = Button(SCREEN_WIDTH//2 - 320, SCREEN_HEIGHT - 100,
-                                   200, 50, "✗ Wrong", RED, LIGHT_GRAY)
+        game_title_text = GLYPH_CACHE.render("IQRA Challenge", ASSETS.font(TITLE_FONT_SIZE), NAVY)
+        title_rect = game_title_text.get_rect(center=(SCREEN_WIDTH // 2, 250)) # Position below logo
+        surface.blit(game_title_text, title_rect)
+
+        self.play_classic_button.draw(surface)
+        self.tournament_button.draw(surface)
+        self.daily_quiz_button.draw(surface)
+        self.quit_button.draw(surface)
+
+class ClassicNameInputScene(Scene):
+    state = STATE_NAME_INPUT_CLASSIC
+
+    def __init__(self, game):
+        super().__init__(game)
         self.name_inputs = [
             TextInput(SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 50, 300, 50, "Player 1"),
             TextInput(SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 + 50, 300, 50, "Player 2")
         ]
-        self.start_classic_game_button = Button(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 150, # Renamed for clarity
-                                                200, 50, "Start Game", GOLD, LIGHT_GRAY)
-        self.back_to_menu_button = Button(
-            20, 20, 150, 40, "Back to Menu", LIGHT_GRAY, GOLD # Position top-left
-        )
+        self.start_button = Button(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 150,
+                                   200, 50, "Start Game", GOLD, LIGHT_GRAY)
+        self.back_button = back_button()
+        self.index(*self.name_inputs, self.start_button, self.back_button)
+
+    def enter(self):
+        for name_input in self.name_inputs:
+            name_input.text = ""
+            name_input.active = False
+
+    def handle_event(self, event, clicked):
+        for name_input in self.name_inputs:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                name_input.set_active(clicked is name_input)
+            else:
+                name_input.handle_event(event)
+        if clicked is self.start_button:
+            names = [name_input.text or f"Player {i + 1}" for i, name_input in enumerate(self.name_inputs)]
+            self.game.pop_scene() # The game takes this screen's place, so Back from it goes home
+            self.game.start_match(names)
+        elif clicked is self.back_button:
+            self.game.pop_scene()
+
+    @profiled("draw_classic_name_input")
+    def draw(self, surface):
+        logo = self.game.logo
+        if logo:
+            logo_rect = logo.get_rect(midtop=(SCREEN_WIDTH // 2, 50))
+            surface.blit(logo, logo_rect)
 
-        self.logo = load_image(LOGO_FILE_NAME, scale_to=(150,150))
+        title = GLYPH_CACHE.render("Enter Player Names", ASSETS.font(TITLE_FONT_SIZE), NAVY)
+        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 200))
+        surface.blit(title, title_rect)
 
-        self.spin_sound = load_sound(SPIN_SOUND_FILE_NAME)
-        if not self.spin_sound:
-            # This message is now more general as load_sound prints specifics
-            print("Spin sound effect not loaded. Game will continue without spin sound.")
-            print(f"Please ensure '{SPIN_SOUND_FILE_NAME}' is in the script directory if you want spin sounds.")
+        for input_field in self.name_inputs:
+            input_field.draw(surface)
 
+        self.start_button.draw(surface)
+        self.back_button.draw(surface)
 
-    def draw_wheel(self, surface):
-        center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-        radius = 200
+class ClassicGameScene(Scene):
+    """The wheel, the players' score panels and the turn controls. Tournament matches are played here too."""
+    state = STATE_CLASSIC_WHEEL_GAME
 
-        pygame.draw.circle(surface, NAVY, center, radius, 3)
+    def __init__(self, game):
+        super().__init__(game)
+        self.spin_button = Button(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 100,
+                                  200, 50, "SPIN", LIGHT_GRAY, GOLD)
+        self.correct_button = Button(SCREEN_WIDTH//2 + 120, SCREEN_HEIGHT - 100,
+                                     200, 50, "✓ Correct", GREEN, LIGHT_GRAY)
+        self.wrong_button = Button(SCREEN_WIDTH//2 - 320, SCREEN_HEIGHT - 100,
+                                   200, 50, "✗ Wrong", RED, LIGHT_GRAY)
+        self.back_button = back_button()
+        self.index(self.spin_button, self.correct_button, self.wrong_button, self.back_button)
+        self.wheel_sprite = WheelSprite()
+        self.reset_wheel()
 
-        for i, letter in enumerate(ARABIC_LETTERS):
-            angle = math.radians(i * (360 / len(ARABIC_LETTERS)) + self.angle)
-            x = center[0] + int(radius * 0.8 * math.cos(angle))
-            y = center[1] + int(radius * 0.8 * math.sin(angle))
+    def reset_wheel(self):
+        self.angle = start_angle_for_seed(self.game.start_seed)
+        self.spin_speed = 0
+        self.is_spinning = False
+        self.selected_letter = None
+        self.is_choosing_letter = False
+        self.clickable_letters_rects = []
+        self.letter_hit_index = None # Built with the letter grid in setup_letter_choices
+        self.referee_hint_text = None
+        self.reset_spin_physics()
 
-            text_color = NAVY
-            if letter == CHOOSE_LETTER_SYMBOL:
-                text_color = YELLOW # Star color
+    def enter(self):
+        self.reset_wheel()
 
-            reshaped_text = arabic_reshaper.reshape(letter)
-            bidi_text = get_display(reshaped_text)
+    def leave(self):
+        # The cached frames hold up to WHEEL_CACHE_MAX_BYTES; the next match draws them again
+        self.wheel_sprite.clear()
 
-            # Use a slightly larger font for the star to make it stand out
-            current_font = FONT_GAME_SMALL
-            if letter == CHOOSE_LETTER_SYMBOL:
-                current_font = FONT_INSTRUCTION # Re-use instruction font size for star, or define a new one
-
-            text = current_font.render(bidi_text, True, text_color)
-            text_rect = text.get_rect(center=(x, y))
-            surface.blit(text, text_rect)
-
-        arrow_length = 30
-        arrow_angle = math.radians(self.angle)
-        arrow_end_x = center[0] + int(arrow_length * math.cos(arrow_angle))
-        arrow_end_y = center[1] - int(arrow_length * math.sin(arrow_angle))
-
-        pygame.draw.polygon(surface, GOLD, [
-            (center[0], center[1]),
-            (arrow_end_x - 10, arrow_end_y),
-            (arrow_end_x + 10, arrow_end_y)
-        ])
-
-    def draw_classic_name_input(self, surface): # Renamed
-        if self.logo: # Check if logo was loaded successfully
-            logo_rect = self.logo.get_rect(midtop=(SCREEN_WIDTH // 2, 50))
-            surface.blit(self.logo, logo_rect)
-
-        # title_font = pygame.font.Font(font_path, 64) # No longer needed
-        title = FONT_TITLE.render("Enter Player Names", True, NAVY) # Use global font
-        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 200))
-        surface.blit(title, title_rect)
+    def active_hit_index(self):
+        if self.is_choosing_letter:
+            return self.letter_hit_index
+        return self.hit_index
 
-        for input_field in self.name_inputs:
-            input_field.draw(surface)
+    def panels(self):
+        return super().panels() + [self.player_box_rect(i) for i in range(len(self.game.players))]
 
-        self.start_classic_game_button.draw(surface) # Ensure this uses the renamed button variable
-        self.back_to_menu_button.draw(surface)
+    def is_animating(self):
+        return self.is_spinning
 
-    def draw_classic_game_play(self, surface): # Renamed
-        if self.logo: # Check if logo was loaded successfully
-            logo_rect = self.logo.get_rect(midtop=(SCREEN_WIDTH // 2, 20))
-            surface.blit(self.logo, logo_rect)
+    def wheel_rect(self):
+        wheel = pygame.Rect(0, 0, WHEEL_RADIUS * 2 + 8, WHEEL_RADIUS * 2 + 8).move(
+            SCREEN_WIDTH // 2 - WHEEL_RADIUS - 4, SCREEN_HEIGHT // 2 - WHEEL_RADIUS - 4)
+        # Takes in the whole pointer: gfxdraw rasterizes a polygon cut by the clip slightly differently
+        xs, ys = zip(*wheel_pointer_polygon((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+        pointer = pygame.Rect(math.floor(min(xs)), math.floor(min(ys)), 0, 0)
+        pointer.size = (math.ceil(max(xs)) - pointer.x + 2, math.ceil(max(ys)) - pointer.y + 2)
+        return wheel.union(pointer)
 
-        self.draw_wheel(surface)
+    def player_box_rect(self, index):
+        return pygame.Rect(50 if index == 0 else SCREEN_WIDTH - 300, 100, 250, 150)
 
-        for i, player in enumerate(self.players):
-            box_rect = pygame.Rect(50 if i == 0 else SCREEN_WIDTH - 300, 100,
-                                  250, 150)
+    def controls_rect(self):
+        """Bottom band holding the instruction line and the spin/correct/wrong buttons."""
+        return pygame.Rect(0, SCREEN_HEIGHT - 180, SCREEN_WIDTH, 180)
+
+    @profiled("draw_wheel")
+    def draw_wheel(self, surface, moving=None):
+        center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.wheel_sprite.draw(surface, center, self.render_angle, self.is_spinning if moving is None else moving)
+
+        # The pointer stays put while the wheel turns under it; the letter it points at is the one that is played
+        pointer = wheel_pointer_polygon(center)
+        gfxdraw.filled_polygon(surface, pointer, GOLD)
+        gfxdraw.aapolygon(surface, pointer, NAVY)
+
+    def draw_player_panels(self, surface):
+        game = self.game
+        for i, player in enumerate(game.players):
+            box_rect = self.player_box_rect(i)
+            if outside_clip(surface, box_rect):
+                continue
             pygame.draw.rect(surface, LIGHT_GRAY, box_rect, border_radius=10)
             pygame.draw.rect(surface, NAVY, box_rect, 2, border_radius=10)
 
-            name_text = FONT_GAME_MAIN.render(player["name"], True, # Use global font
-                                        GOLD if i == self.current_player else NAVY)
-            name_rect = name_text.get_rect(center=(box_rect.centerx, box_rect.centery - 30))
-            surface.blit(name_text, name_rect)
+            # Names may be Arabic; shaped once and then served from the cache every frame
+            name_bounds = box_rect.inflate(-2 * LABEL_PADDING, 0)
+            name_font = font_to_fit(shape_text(player["name"]), name_bounds.width, GAME_MAIN_FONT_SIZE)
+            name_text = GLYPH_CACHE.render_shaped(player["name"], name_font, GOLD if i == game.current_player else NAVY)
+            blit_within(surface, name_text, (box_rect.centerx, box_rect.centery - 30), name_bounds)
 
-            score_text = FONT_GAME_MAIN.render(f"{player['score']}/5", True, NAVY) # Use global font
+            score_text = GLYPH_CACHE.render(f"{player['score']}/{WINNING_SCORE}", ASSETS.font(GAME_MAIN_FONT_SIZE), NAVY)
             score_rect = score_text.get_rect(center=(box_rect.centerx, box_rect.centery + 30))
             surface.blit(score_text, score_rect)
 
+    @profiled("draw_classic_game_play")
+    def draw(self, surface):
+        game = self.game
+        logo = game.logo
+        if logo:
+            logo_rect = logo.get_rect(midtop=(SCREEN_WIDTH // 2, 20))
+            surface.blit(logo, logo_rect)
+
+        self.draw_wheel(surface)
+        self.draw_player_panels(surface)
+
         self.spin_button.draw(surface)
         if self.selected_letter and not self.is_spinning:
             self.correct_button.draw(surface)
             self.wrong_button.draw(surface)
 
         if self.selected_letter and not self.is_spinning and not self.is_choosing_letter:
-            # instruction_font = pygame.font.Font(font_path, 36) # No longer needed
-            instruction_text_content = f"Recite an Ayat starting with {self.selected_letter}"
-            instruction_text = FONT_INSTRUCTION.render(instruction_text_content, True, NAVY) # Use global font
+            instruction_text = GLYPH_CACHE.render(
+                recite_instruction(self.selected_letter), ASSETS.font(INSTRUCTION_FONT_SIZE), NAVY)
             instruction_rect = instruction_text.get_rect(
                 center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150))
             surface.blit(instruction_text, instruction_rect)
-        elif self.is_choosing_letter: # This block will now handle the instruction when choosing
-            # Instruction for choosing a letter (already handled below, but good to have distinct logic)
-            # The main instruction for choosing is now drawn after the letter grid.
-            pass # Covered by the block below
+
+            if self.referee_hint_text:
+                hint_text = GLYPH_CACHE.render(self.referee_hint_text, ASSETS.font(GAME_SMALL_FONT_SIZE), NAVY)
+                surface.blit(hint_text, hint_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30)))
 
         if self.is_choosing_letter:
             # Display letter choices
             for item in self.clickable_letters_rects:
                 pygame.draw.rect(surface, LIGHT_GRAY, item["rect"], border_radius=5)
                 pygame.draw.rect(surface, NAVY, item["rect"], 2, border_radius=5)
-                letter_text = FONT_GAME_SMALL.render(item["reshaped"], True, NAVY)
+                letter_text = GLYPH_CACHE.render(item["reshaped"], ASSETS.font(GAME_SMALL_FONT_SIZE), NAVY)
                 text_rect = letter_text.get_rect(center=item["rect"].center)
                 surface.blit(letter_text, text_rect)
 
             # Instruction for choosing a letter
-            choose_instruction_text = FONT_INSTRUCTION.render(
-                f"{self.players[self.current_player]['name']}, pick a letter!", True, NAVY)
+            choose_instruction_text = GLYPH_CACHE.render_shaped(
+                choose_instruction(game.players[game.current_player]["name"]),
+                ASSETS.font(INSTRUCTION_FONT_SIZE), NAVY)
             choose_rect = choose_instruction_text.get_rect(
                 center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30)) # Positioned at bottom
             surface.blit(choose_instruction_text, choose_rect)
 
-        self.back_to_menu_button.draw(surface)
-
-    def draw_home_screen(self, surface):
-        # Optional: Draw logo or title
-        if self.logo:
-            logo_rect = self.logo.get_rect(midtop=(SCREEN_WIDTH // 2, 100)) # Position logo higher
-            surface.blit(self.logo, logo_rect)
-
-        game_title_text = FONT_TITLE.render("IQRA Challenge", True, NAVY) # Example Title
-        title_rect = game_title_text.get_rect(center=(SCREEN_WIDTH // 2, 250)) # Position below logo
-        surface.blit(game_title_text, title_rect)
-
-        self.home_play_classic_button.draw(surface)
-        self.home_daily_quiz_button.draw(surface)
-        self.home_quit_button.draw(surface)
+        self.back_button.draw(surface)
 
+    def update(self, dt):
+        if self.is_spinning:
+            self.physics_accumulator += min(dt, MAX_PHYSICS_STEPS_PER_UPDATE * PHYSICS_DT)
+            while self.is_spinning and self.physics_accumulator >= PHYSICS_DT:
+                self.physics_accumulator -= PHYSICS_DT
+                self.step_spin()
 
-    def draw(self, surface):
-        surface.fill(WHITE)
-        if self.current_game_state == STATE_HOME_SCREEN:
-            self.draw_home_screen(surface)
-        elif self.current_game_state == STATE_NAME_INPUT_CLASSIC:
-            # This was previously self.draw_name_input(surface)
-            # We'll rename/refactor draw_name_input to be specific for classic game's name input phase
-            self.draw_classic_name_input(surface)
-        elif self.current_game_state == STATE_CLASSIC_WHEEL_GAME:
-            # This was previously self.draw_game(surface)
-            self.draw_classic_game_play(surface)
-        elif self.current_game_state == STATE_DAILY_QUIZ_PLACEHOLDER:
-            # Simple placeholder drawing for now
-            placeholder_text = FONT_TITLE.render("Daily Quiz Coming Soon!", True, NAVY)
-            text_rect = placeholder_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-            surface.blit(placeholder_text, text_rect)
-            self.back_to_menu_button.draw(surface) # Add back button here too
-
-
-    def update(self):
-        if self.current_game_state == STATE_CLASSIC_WHEEL_GAME or self.current_game_state == STATE_NAME_INPUT_CLASSIC:
             if self.is_spinning:
-                self.angle += self.spin_speed
-                self.spin_speed *= 0.99
-
-                if self.spin_speed < 0.1:
-                    self.is_spinning = False
-                    landed_on = self.get_selected_letter()
-                    if landed_on == CHOOSE_LETTER_SYMBOL:
-                        self.selected_letter = CHOOSE_LETTER_STATE_VALUE
-                        self.is_choosing_letter = True
-                        self.setup_letter_choices()
-                    else:
-                        self.selected_letter = landed_on
-                        self.is_choosing_letter = False
-        # Add other state updates here if needed in the future
-        # elif self.current_game_state == STATE_DAILY_QUIZ_PLACEHOLDER:
-            # pass # No updates for placeholder quiz state yet
+                # Draw between the last two physics states so motion stays smooth at any frame rate
+                alpha = self.physics_accumulator / PHYSICS_DT
+                self.render_angle = self.previous_angle + (self.angle - self.previous_angle) * alpha
+            else:
+                self.render_angle = self.angle
+            RENDER_TRACKER.mark(self.wheel_rect())
+
+    def step_spin(self):
+        """Advances the spin by one fixed physics step and lands the wheel on the last one."""
+        self.previous_angle = self.angle
+        self.spin_step += 1
+        # Evaluated in closed form rather than accumulated, so the landing matches the prediction exactly
+        self.angle = self.spin_start_angle + spin_distance(self.spin_initial_speed, self.spin_step)
+        self.spin_speed = spin_speed_after(self.spin_initial_speed, self.spin_step)
+        SPIN_TICKER.step(self.previous_angle, self.angle)
+
+        if self.spin_step >= self.spin_total_steps:
+            self.is_spinning = False
+            self.physics_accumulator = 0.0
+            landed_on = self.get_selected_letter()
+            self.game.log_event(EVENT_LANDED, letter=landed_on)
+            if landed_on == CHOOSE_LETTER_SYMBOL:
+                self.selected_letter = CHOOSE_LETTER_STATE_VALUE
+                self.is_choosing_letter = True
+                self.setup_letter_choices()
+                RENDER_TRACKER.mark_all() # The letter grid covers the wheel
+            else:
+                self.selected_letter = landed_on
+                self.is_choosing_letter = False
+                self.referee_hint_text = self.predicted_hint
+                RENDER_TRACKER.mark(self.controls_rect())
+
+    def reset_spin_physics(self):
+        self.render_angle = self.angle
+        self.previous_angle = self.angle
+        self.physics_accumulator = 0.0
+        self.spin_start_angle = self.angle
+        self.spin_initial_speed = 0
+        self.spin_step = 0
+        self.spin_total_steps = 0
+        self.predicted_angle = self.angle
+        self.predicted_letter = None
+        self.predicted_hint = None
 
     def spin(self):
         if not self.is_spinning and not self.is_choosing_letter: # Can't spin if choosing letter
+            game = self.game
             self.is_spinning = True
-            self.spin_speed = random.uniform(10, 20)
+            seed = random.getrandbits(32) if game.next_spin_seed is None else game.next_spin_seed
+            game.next_spin_seed = None
+            self.spin_speed = spin_speed_for_seed(seed)
+            game.log_event(EVENT_SPIN, value=seed)
             self.selected_letter = None # Clear previous selection when starting a new spin
-            if self.spin_sound:
-                self.spin_sound.play()
+
+            # The whole spin is decided here, so its outcome is known before the wheel stops
+            self.reset_spin_physics()
+            self.spin_initial_speed = self.spin_speed
+            self.spin_total_steps = spin_step_count(self.spin_speed)
+            self.predicted_angle = self.angle + spin_distance(self.spin_speed, self.spin_total_steps)
+            self.predicted_letter = letter_at_angle(self.predicted_angle)
+            self.preload_spin_result()
+
+            RENDER_TRACKER.mark(self.controls_rect())
+
+    def preload_spin_result(self):
+        """Renders the text the finished spin will show while the wheel is still turning."""
+        if self.predicted_letter == CHOOSE_LETTER_SYMBOL:
+            for letter in ARABIC_LETTERS:
+                if letter != CHOOSE_LETTER_SYMBOL:
+                    GLYPH_CACHE.render_shaped(letter, ASSETS.font(GAME_SMALL_FONT_SIZE), NAVY)
+            GLYPH_CACHE.render_shaped(choose_instruction(self.game.players[self.game.current_player]["name"]),
+                               ASSETS.font(INSTRUCTION_FONT_SIZE), NAVY)
+        else:
+            GLYPH_CACHE.render(recite_instruction(self.predicted_letter), ASSETS.font(INSTRUCTION_FONT_SIZE), NAVY)
+            self.predicted_hint = self.make_referee_hint(self.predicted_letter)
+            if self.predicted_hint:
+                GLYPH_CACHE.render(self.predicted_hint, ASSETS.font(GAME_SMALL_FONT_SIZE), NAVY)
+
+    def make_referee_hint(self, letter):
+        """Looks up the ayat starting with letter and picks one as an example for the referee."""
+        matches = QURAN_INDEX.lookup(letter)
+        if not matches:
+            return None
+        return referee_hint(letter, matches, matches[REFEREE_RNG.randrange(len(matches))])
 
     def setup_letter_choices(self):
         self.clickable_letters_rects = []
@@ -453,106 +2432,695 @@ class Game:
             self.clickable_letters_rects.append({
                 "letter": letter,
                 "rect": rect,
-                "reshaped": get_display(arabic_reshaper.reshape(letter))
+                "reshaped": shape_text(letter)
             })
+        # The back button stays usable on top of the grid, so it shares the index
+        self.letter_hit_index = HitIndex([(item["rect"], item) for item in self.clickable_letters_rects])
+        self.letter_hit_index.add(self.back_button.rect, self.back_button)
+        self.game.set_hovered_button(None)
 
     def get_selected_letter(self):
-        normalized_angle = self.angle % 360
-        letter_index = int(normalized_angle / (360 / len(ARABIC_LETTERS)))
-        return ARABIC_LETTERS[letter_index % len(ARABIC_LETTERS)]
+        return letter_at_angle(self.angle)
+
+    def wheel_snapshot(self):
+        """The wheel's part of Game.spectator_snapshot: angle, speed and letter code."""
+        if self.selected_letter == CHOOSE_LETTER_STATE_VALUE:
+            letter = CHOOSING_LETTER
+        elif self.selected_letter in ARABIC_LETTERS:
+            letter = ARABIC_LETTERS.index(self.selected_letter)
+        else:
+            letter = NO_LETTER
+        # The physics angle and speed of the same step, from which spectators extrapolate the rest of the spin
+        return self.angle % 360, self.spin_speed if self.is_spinning else 0.0, letter
+
+    def log_verdict(self, correct):
+        game = self.game
+        letter = self.selected_letter if self.selected_letter in ARABIC_LETTERS else None
+        game.log_event(EVENT_VERDICT, letter=letter, score=game.players[game.current_player]["score"],
+                       value=int(correct))
 
     def handle_correct(self):
-        if self.players[self.current_player]["score"] < 5:
-            self.players[self.current_player]["score"] += 1
-        self.current_player = (self.current_player + 1) % len(self.players)
-        self.selected_letter = None
-        self.is_choosing_letter = False # Ensure reset
-        self.clickable_letters_rects = [] # Clear any choice UI state
+        game = self.game
+        scorer = game.players[game.current_player]
+        if scorer["score"] < WINNING_SCORE:
+            scorer["score"] += 1
+            if scorer["score"] == WINNING_SCORE:
+                self.celebrate_win()
+            else:
+                self.celebrate_correct(game.current_player)
+        self.log_verdict(True)
+        if game.tournament_match and scorer["score"] == WINNING_SCORE:
+            game.finish_tournament_match()
+            return
+        self.end_turn()
 
     def handle_wrong(self):
-        self.current_player = (self.current_player + 1) % len(self.players)
+        self.log_verdict(False)
+        self.end_turn()
+
+    def end_turn(self):
+        game = self.game
+        game.current_player = (game.current_player + 1) % len(game.players)
         self.selected_letter = None
         self.is_choosing_letter = False # Ensure reset
         self.clickable_letters_rects = [] # Clear any choice UI state
+        # Queue the score panels and controls for redraw
+        for i in range(len(game.players)):
+            RENDER_TRACKER.mark(self.player_box_rect(i))
+        RENDER_TRACKER.mark(self.controls_rect())
+
+    def celebrate_correct(self, player_index):
+        """A burst of particles rising from the scoring player's panel."""
+        self.game.particles.burst(self.player_box_rect(player_index).midtop, CORRECT_BURST_COUNT,
+                                  CORRECT_BURST_SPEED, CORRECT_BURST_LIFETIME, angles=(200, 340))
+
+    def celebrate_win(self):
+        """Fireworks across the whole screen when a player reaches the winning score."""
+        for x, y in WIN_BURST_ORIGINS:
+            self.game.particles.burst((x * SCREEN_WIDTH, y * SCREEN_HEIGHT), WIN_BURST_COUNT, WIN_BURST_SPEED,
+                                      WIN_BURST_LIFETIME)
+
+    def handle_event(self, event, clicked):
+        game = self.game
+        if clicked is self.back_button: # Check this first
+            if game.tournament_match:
+                game.return_to_scene(STATE_TOURNAMENT_STANDINGS) # The abandoned match stays first in line
+            else:
+                game.return_to_scene(STATE_HOME_SCREEN)
+        elif self.is_choosing_letter:
+            if clicked is not None and event.button == 1: # Left click on a letter
+                self.selected_letter = clicked["letter"] # Set the chosen letter
+                game.log_event(EVENT_LETTER_CHOSEN, letter=self.selected_letter)
+                self.referee_hint_text = self.make_referee_hint(self.selected_letter)
+                self.is_choosing_letter = False # Exit choosing mode
+                self.clickable_letters_rects = [] # Clear choices
+                self.letter_hit_index = None
+                RENDER_TRACKER.mark_all() # Uncover the wheel again
+        elif clicked is self.spin_button and not self.is_spinning:
+            self.spin()
+        elif self.selected_letter and not self.is_spinning and self.selected_letter != CHOOSE_LETTER_STATE_VALUE:
+            if clicked is self.correct_button:
+                self.handle_correct()
+            elif clicked is self.wrong_button:
+                self.handle_wrong()
+
+class DailyQuizScene(Scene):
+    state = STATE_DAILY_QUIZ
+
+    def __init__(self, game):
+        super().__init__(game)
+        # Answers are laid out as a 2x2 grid
+        self.choice_buttons = [
+            Button(SCREEN_WIDTH//2 - 510 + (i % 2) * 520, 360 + (i // 2) * 90, 500, 70, "", LIGHT_GRAY, GOLD)
+            for i in range(QUIZ_CHOICE_COUNT)
+        ]
+        self.next_button = Button(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 110, 200, 50, "Next", GOLD, LIGHT_GRAY)
+        self.back_button = back_button()
+        self.index(*self.choice_buttons, self.next_button, self.back_button)
+        self.question_bank = QuestionBank()
+        self.quiz = None
+        self.question_lines = []
+
+    def enter(self):
+        self.question_bank.open() # Leaves the bank empty if it is missing
+        self.quiz = DailyQuiz(self.question_bank, datetime.date.today())
+        self.load_question()
+
+    def leave(self):
+        # The bank file and its memory-mapped index stay open only while the quiz is showing
+        self.question_bank.close()
+        self.quiz = None
+        self.question_lines = []
+
+    def load_question(self):
+        """Lays out the current question: wrapped, shaped text lines and one button per choice."""
+        quiz = self.quiz
+        self.question_lines = []
+        if quiz.finished or not quiz.question:
+            self.next_button.text = "Next"
+        else:
+            self.question_lines = wrap_text(quiz.question["question"], ASSETS.font(GAME_MAIN_FONT_SIZE), 1000)
+            for button, choice in zip(self.choice_buttons, quiz.question["choices"]):
+                button.text = shape_text(choice)
+                button.color, button.hover_color = LIGHT_GRAY, GOLD
+            self.next_button.text = "Finish" if quiz.position == len(quiz.indices) - 1 else "Next"
+        RENDER_TRACKER.mark_all()
+
+    def answer_question(self, choice):
+        quiz = self.quiz
+        quiz.answer(choice)
+        for i, button in enumerate(self.choice_buttons):
+            # Feedback colors stay put while hovered
+            if i == quiz.question["answer"]:
+                button.color = button.hover_color = GREEN
+            elif i == choice:
+                button.color = button.hover_color = RED
+        RENDER_TRACKER.mark_all()
+
+    def handle_event(self, event, clicked):
+        quiz = self.quiz
+        if clicked is self.back_button:
+            self.game.pop_scene()
+        elif quiz and not quiz.finished:
+            choice_buttons = self.choice_buttons[:len(quiz.question["choices"])]
+            if quiz.chosen is None:
+                if clicked in choice_buttons:
+                    self.answer_question(choice_buttons.index(clicked))
+            elif clicked is self.next_button:
+                quiz.next_question()
+                self.load_question()
+
+    @profiled("draw_daily_quiz")
+    def draw(self, surface):
+        title = GLYPH_CACHE.render("Daily Islamic Quiz", ASSETS.font(TITLE_FONT_SIZE), NAVY)
+        surface.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 60)))
+        self.back_button.draw(surface)
+
+        quiz = self.quiz
+        small_font = ASSETS.font(GAME_SMALL_FONT_SIZE)
+        if not quiz or not quiz.indices:
+            message = GLYPH_CACHE.render("No quiz questions available.", ASSETS.font(GAME_MAIN_FONT_SIZE), NAVY)
+            surface.blit(message, message.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+            return
+
+        date_text = quiz.date.strftime("%A %d %B %Y")
+        if quiz.finished:
+            progress = GLYPH_CACHE.render(date_text, small_font, NAVY)
+            surface.blit(progress, progress.get_rect(center=(SCREEN_WIDTH // 2, 120)))
+            score = GLYPH_CACHE.render(f"You scored {quiz.score} / {len(quiz.indices)}",
+                                       ASSETS.font(TITLE_FONT_SIZE), GOLD)
+            surface.blit(score, score.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40)))
+            come_back = GLYPH_CACHE.render("Come back tomorrow for new questions!",
+                                           ASSETS.font(GAME_MAIN_FONT_SIZE), NAVY)
+            surface.blit(come_back, come_back.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)))
+            return
+
+        progress = GLYPH_CACHE.render(f"{date_text}  -  Question {quiz.position + 1} of {len(quiz.indices)}",
+                                      small_font, NAVY)
+        surface.blit(progress, progress.get_rect(center=(SCREEN_WIDTH // 2, 120)))
+
+        question_font = ASSETS.font(GAME_MAIN_FONT_SIZE)
+        for i, line in enumerate(self.question_lines):
+            line_text = GLYPH_CACHE.render(line, question_font, NAVY)
+            line_y = 190 + i * question_font.get_linesize()
+            surface.blit(line_text, line_text.get_rect(center=(SCREEN_WIDTH // 2, line_y)))
+
+        for button in self.choice_buttons[:len(quiz.question["choices"])]:
+            button.draw(surface)
+
+        if quiz.chosen is not None:
+            if quiz.chosen == quiz.question["answer"]:
+                feedback = GLYPH_CACHE.render("Correct!", ASSETS.font(INSTRUCTION_FONT_SIZE), GREEN)
+            else:
+                correct_choice = shape_text(quiz.question["choices"][quiz.question["answer"]])
+                feedback = GLYPH_CACHE.render(f"The answer was: {correct_choice}",
+                                              ASSETS.font(INSTRUCTION_FONT_SIZE), RED)
+            surface.blit(feedback, feedback.get_rect(center=(SCREEN_WIDTH // 2, 570)))
+            self.next_button.draw(surface)
+
+class TournamentSetupScene(Scene):
+    state = STATE_TOURNAMENT_SETUP
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.name_input = TextInput(SCREEN_WIDTH//2 - 200, 170, 400, 50, "Contestant name")
+        self.format_button = Button(SCREEN_WIDTH//2 - 200, 240, 400, 50,
+                                    f"Format: {TOURNAMENT_ROUND_ROBIN}", LIGHT_GRAY, GOLD)
+        self.start_button = Button(SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT - 90, 300, 50,
+                                   "Start Tournament", GOLD, LIGHT_GRAY)
+        self.back_button = back_button()
+        self.index(self.name_input, self.format_button, self.start_button, self.back_button)
+        self.names = []
+        self.tournament_format = TOURNAMENT_ROUND_ROBIN
+
+    def enter(self):
+        """Starts a new list of contestants, pre-filled from the roster file."""
+        self.names = load_tournament_roster()
+        self.name_input.text = ""
+        self.name_input.set_active(True)
+
+    def names_rect(self):
+        return pygame.Rect(0, 300, SCREEN_WIDTH, 270)
+
+    def add_contestant(self):
+        name = self.name_input.text.strip()
+        if name:
+            self.names.append(name)
+            self.name_input.text = ""
+            RENDER_TRACKER.mark(self.names_rect())
+            RENDER_TRACKER.mark(self.start_button.rect)
+
+    def remove_last_contestant(self):
+        if self.names:
+            self.names.pop()
+            RENDER_TRACKER.mark(self.names_rect())
+            RENDER_TRACKER.mark(self.start_button.rect)
+
+    def toggle_format(self):
+        if self.tournament_format == TOURNAMENT_ROUND_ROBIN:
+            self.tournament_format = TOURNAMENT_KNOCKOUT
+        else:
+            self.tournament_format = TOURNAMENT_ROUND_ROBIN
+        self.format_button.text = f"Format: {self.tournament_format}"
+        RENDER_TRACKER.mark(self.format_button.rect)
 
-    def reset_classic_game_vars(self):
-        """Resets variables specific to the classic wheel game."""
-        self.players = [{"name": "", "score": 0}, {"name": "", "score": 0}]
-        self.current_player = 0
-        self.angle = 0
-        self.spin_speed = 0
-        self.is_spinning = False
-        self.selected_letter = None
-        self.is_choosing_letter = False
-        self.clickable_letters_rects = []
-        # self.classic_game_phase = STATE_NAME_INPUT_CLASSIC # This line is removed
-        # Reset text in name input fields
-        for T_input in self.name_inputs: # Corrected variable name from input_field to T_input
-            T_input.text = ""
-            T_input.active = False
+    def handle_event(self, event, clicked):
+        name_input = self.name_input
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            name_input.set_active(clicked is name_input)
+        elif event.type == pygame.KEYDOWN and name_input.active and event.key == pygame.K_RETURN:
+            self.add_contestant()
+        elif event.type == pygame.KEYDOWN and name_input.active and event.key == pygame.K_BACKSPACE \
+                and not name_input.text:
+            self.remove_last_contestant()
+        else:
+            name_input.handle_event(event)
+        if clicked is self.format_button:
+            self.toggle_format()
+        elif clicked is self.start_button and len(self.names) >= 2:
+            self.game.start_tournament(self.names, self.tournament_format)
+        elif clicked is self.back_button:
+            self.game.pop_scene()
+
+    @profiled("draw_tournament_setup")
+    def draw(self, surface):
+        title = GLYPH_CACHE.render("Tournament Setup", ASSETS.font(TITLE_FONT_SIZE), NAVY)
+        surface.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 90)))
+        self.name_input.draw(surface)
+        self.format_button.draw(surface)
+
+        small_font = ASSETS.font(GAME_SMALL_FONT_SIZE)
+        names = self.names
+        count_text = GLYPH_CACHE.render(
+            f"{len(names)} contestants  -  Enter adds a name, Backspace on an empty field removes the last",
+            small_font, NAVY)
+        surface.blit(count_text, count_text.get_rect(center=(SCREEN_WIDTH // 2, 320)))
+        # The newest names, four columns of six; the full list is on the standings once play starts
+        shown = names[-24:]
+        first_number = len(names) - len(shown) + 1
+        for i, name in enumerate(shown):
+            x, y = SCREEN_WIDTH // 2 - 520 + (i // 6) * 260, 350 + (i % 6) * 34
+            # Number and name are rendered apart so bidi reordering of Arabic names cannot swap them
+            surface.blit(GLYPH_CACHE.render(f"{first_number + i}.", small_font, NAVY), (x, y))
+            surface.blit(GLYPH_CACHE.render_shaped(name, small_font, NAVY), (x + 45, y))
+
+        if len(names) >= 2:
+            self.start_button.draw(surface)
+        self.back_button.draw(surface)
+
+class TournamentStandingsScene(Scene):
+    state = STATE_TOURNAMENT_STANDINGS
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.next_match_button = Button(SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT - 80, 300, 50,
+                                        "Play Next Match", GOLD, LIGHT_GRAY)
+        self.back_button = back_button()
+        self.index(self.next_match_button, self.back_button)
+        self.tournament = None # The tournament the scroll position belongs to
+        self.scroll = 0
+        self.rows = [None] * STANDINGS_VISIBLE_ROWS # What each row slot shows, to redraw only changes
+        self.status = None # (round, next match, champion) as last drawn
+
+    def enter(self):
+        if self.tournament is not self.game.tournament:
+            self.tournament = self.game.tournament
+            self.scroll = 0
+        self.resume()
+
+    def resume(self):
+        self.game.tournament_match = None
+        self.refresh()
+
+    def refresh(self):
+        """Recomputes the visible rows from the leaderboard and queues only the rows whose content changed."""
+        tournament = self.tournament
+        leaderboard = tournament.leaderboard
+        playing_next = tournament.next_match or ()
+        rows = [
+            (rank, tournament.names[player], leaderboard.scores[player], leaderboard.letters[player],
+             player in playing_next)
+            for rank, player in leaderboard.rows(self.scroll, STANDINGS_VISIBLE_ROWS)
+        ]
+        rows += [None] * (STANDINGS_VISIBLE_ROWS - len(rows))
+        for slot, (old_row, new_row) in enumerate(zip(self.rows, rows)):
+            if old_row != new_row:
+                RENDER_TRACKER.mark(self.row_rect(slot).inflate(0, 10)) # Arabic descenders reach past the row
+        self.rows = rows
+
+        status = (tournament.round, tournament.next_match, tournament.champion)
+        if status != self.status:
+            RENDER_TRACKER.mark(pygame.Rect(0, 100, SCREEN_WIDTH, 40)) # Round number
+            RENDER_TRACKER.mark(pygame.Rect(0, SCREEN_HEIGHT - 140, SCREEN_WIDTH, 140)) # Next match and its button
+            self.status = status
+
+    def scroll_by(self, rows):
+        max_scroll = max(0, len(self.tournament.names) - STANDINGS_VISIBLE_ROWS)
+        scroll = min(max(self.scroll + rows, 0), max_scroll)
+        if scroll != self.scroll:
+            self.scroll = scroll
+            self.refresh()
+            RENDER_TRACKER.mark(pygame.Rect(0, STANDINGS_TOP + STANDINGS_VISIBLE_ROWS * STANDINGS_ROW_HEIGHT,
+                                            SCREEN_WIDTH, 36)) # The "rows x-y of n" line
+
+    def handle_event(self, event, clicked):
+        if clicked is self.back_button:
+            self.game.pop_scene()
+        elif clicked is self.next_match_button and not self.tournament.finished:
+            self.game.start_tournament_match()
+        elif event.type == pygame.MOUSEWHEEL:
+            self.scroll_by(-event.y * 3)
+        elif event.type == pygame.KEYDOWN and event.key in STANDINGS_SCROLL_KEYS:
+            self.scroll_by(STANDINGS_SCROLL_KEYS[event.key])
+
+    def row_rect(self, slot):
+        return pygame.Rect((SCREEN_WIDTH - STANDINGS_WIDTH) // 2, STANDINGS_TOP + slot * STANDINGS_ROW_HEIGHT,
+                           STANDINGS_WIDTH, STANDINGS_ROW_HEIGHT)
+
+    def draw_row(self, surface, slot, row):
+        rank, name, wins, letters, playing_next = row
+        row_rect = self.row_rect(slot)
+        if outside_clip(surface, row_rect.inflate(0, 10)): # Inflated as when marked, for the descenders
+            return
+        if playing_next:
+            pygame.draw.rect(surface, GOLD, row_rect, border_radius=5)
+        elif slot % 2 == 0:
+            pygame.draw.rect(surface, LIGHT_GRAY, row_rect, border_radius=5)
+        small_font = ASSETS.font(GAME_SMALL_FONT_SIZE)
+        for text, x in ((str(rank), 20), (name, 120), (str(wins), 560), (str(letters), 670)):
+            cell = GLYPH_CACHE.render_shaped(text, small_font, NAVY)
+            surface.blit(cell, cell.get_rect(midleft=(row_rect.left + x, row_rect.centery)))
+
+    @profiled("draw_tournament_standings")
+    def draw(self, surface):
+        tournament = self.tournament
+        title = GLYPH_CACHE.render("Tournament Standings", ASSETS.font(TITLE_FONT_SIZE), NAVY)
+        surface.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 70)))
+        small_font = ASSETS.font(GAME_SMALL_FONT_SIZE)
+        subtitle = GLYPH_CACHE.render(
+            f"{tournament.format}  -  Round {tournament.round}  -  {len(tournament.names)} contestants",
+            small_font, NAVY)
+        surface.blit(subtitle, subtitle.get_rect(center=(SCREEN_WIDTH // 2, 120)))
+
+        left = (SCREEN_WIDTH - STANDINGS_WIDTH) // 2
+        for label, x in (("Rank", left + 20), ("Contestant", left + 120), ("Wins", left + 560), ("Letters", left + 670)):
+            header = GLYPH_CACHE.render(label, small_font, GOLD)
+            surface.blit(header, (x, STANDINGS_TOP - 36))
+        for slot, row in enumerate(self.rows):
+            if row:
+                self.draw_row(surface, slot, row)
+
+        if len(tournament.names) > STANDINGS_VISIBLE_ROWS:
+            last_row = min(self.scroll + STANDINGS_VISIBLE_ROWS, len(tournament.names))
+            scroll_text = GLYPH_CACHE.render(
+                f"{self.scroll + 1}-{last_row} of {len(tournament.names)}  (scroll for more)", small_font, NAVY)
+            surface.blit(scroll_text, scroll_text.get_rect(
+                center=(SCREEN_WIDTH // 2, STANDINGS_TOP + STANDINGS_VISIBLE_ROWS * STANDINGS_ROW_HEIGHT + 18)))
+
+        if tournament.finished:
+            status = f"Champion: {tournament.names[tournament.champion]}"
+        else:
+            player_a, player_b = tournament.next_match
+            status = f"Next match: {tournament.names[player_a]} vs {tournament.names[player_b]}"
+        status_text = GLYPH_CACHE.render_shaped(status, ASSETS.font(INSTRUCTION_FONT_SIZE), NAVY)
+        surface.blit(status_text, status_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 115)))
+
+        if not tournament.finished:
+            self.next_match_button.draw(surface)
+        self.back_button.draw(surface)
+
+# New modes register their scene here; Game builds each one the first time it is entered
+SCENE_TYPES = {scene_type.state: scene_type for scene_type in (
+    HomeScene, ClassicNameInputScene, ClassicGameScene, DailyQuizScene, TournamentSetupScene, TournamentStandingsScene,
+)}
+# --- End Scenes ---
 
+class Game:
+    """Runs the stack of scenes and holds what outlives any one screen: the match, the tournament and the log.
+
+    The scene on top of the stack gets every event, update and draw. Home is always at the bottom; each mode is
+    pushed on it and popped to go back, and a tournament match is pushed on the standings it returns to.
+    """
+    def __init__(self, event_log=None):
+        self.event_log = event_log # EventLog recording this session, if any
+        self.next_spin_seed = None # Set by replays to reproduce a logged spin
+        self.start_seed = 0 # Seeds the wheel's start angle, drawn for each match
+        self.next_start_seed = None # Set by replays to start a match where the logged one started
+        self.particles = ParticlePool()
+
+        # The match played on the wheel screen, named from the name input screen or the tournament
+        self.players = [
+            {"name": "", "score": 0},
+            {"name": "", "score": 0}
+        ]
+        self.current_player = 0
 
+        self.tournament = None
+        self.tournament_match = None # (player, player) indices into tournament.names while a match is on
+
+        self.hovered_button = None
+        self.scenes = {} # STATE_* -> Scene, for every scene entered so far
+        self.scene_stack = []
+        self.push_scene(STATE_HOME_SCREEN) # Start with the home screen
+
+    # Media is loaded by ASSETS on first use (or by the warm-up thread), not when the game is built
+    @property
+    def logo(self):
+        return ASSETS.image(LOGO_FILE_NAME, LOGO_SIZE)
+
+    @property
+    def scene(self):
+        return self.scene_stack[-1]
+
+    @property
+    def current_game_state(self):
+        return self.scene.state
+
+    def build_scene(self, state):
+        return SCENE_TYPES[state](self)
+
+    def push_scene(self, state):
+        """Shows the scene for state on top of the current one, building it on first use, and returns it."""
+        scene = self.scenes.get(state)
+        if scene is None:
+            scene = self.scenes[state] = self.build_scene(state)
+        self.scene_stack.append(scene)
+        scene.enter()
+        self.set_hovered_button(None) # The next pointer move finds the hover target on the new screen
+        RENDER_TRACKER.mark_all() # A new screen shares nothing with the previous one
+        return scene
+
+    def pop_scene(self):
+        """Leaves the top scene and shows the one under it again."""
+        self.scene_stack.pop().leave()
+        self.scene.resume()
+        self.set_hovered_button(None)
+        RENDER_TRACKER.mark_all()
+
+    def return_to_scene(self, state):
+        while self.scene.state != state:
+            self.pop_scene()
+
+    def set_hovered_button(self, target):
+        """Moves the hover highlight to target if it is a button; other targets (inputs, letters) have none."""
+        button = target if isinstance(target, Button) else None
+        if button is not self.hovered_button:
+            if self.hovered_button:
+                self.hovered_button.set_hovered(False)
+            if button:
+                button.set_hovered(True)
+            self.hovered_button = button
+
+    def is_animating(self):
+        """True while something on screen moves without input, so the main loop must keep its frame rate."""
+        return self.scene.is_animating() or self.particles.live > 0
+
+    @profiled("draw")
+    def draw(self, surface):
+        """Redraws only the regions marked dirty since the last frame and returns them for display.update."""
+        rects = RENDER_TRACKER.collect(surface.get_rect())
+        for rect in rects:
+            surface.set_clip(rect) # Everything below is clipped, so blits outside the region cost nothing
+            surface.fill(WHITE)
+            self.draw_scene(surface)
+        surface.set_clip(None)
+        return rects
+
+    def draw_scene(self, surface):
+        self.scene.draw(surface)
+        if self.particles.live: # Celebrations play over whichever screen is showing
+            with PROFILER.phase("draw_particles"):
+                self.particles.draw(surface)
+
+    @profiled("update")
+    def update(self, dt=PHYSICS_DT):
+        """Advances the game by dt seconds of real time; the default is exactly one physics step."""
+        self.scene.update(dt)
+        if self.particles.live:
+            self.mark_particles() # Erase them where they were
+            self.particles.update(min(dt, MAX_PHYSICS_STEPS_PER_UPDATE * PHYSICS_DT))
+            self.mark_particles()
+
+    def mark_particles(self):
+        """Marks the area the particles cover, widened to take in whole every panel it touches.
+
+        pygame draws a bordered rect slightly differently when a clip edge cuts through its border, so redrawing
+        only part of a panel would leave a seam in it.
+        """
+        area = self.particles.bounds
+        panels = self.scene.panels()
+        RENDER_TRACKER.mark(area.unionall([panels[i] for i in area.collidelistall(panels)]))
+
+    @profiled("handle_event")
     def handle_event(self, event):
-        if self.current_game_state == STATE_HOME_SCREEN:
-            if self.home_play_classic_button.handle_event(event):
-                self.current_game_state = STATE_NAME_INPUT_CLASSIC
-                self.reset_classic_game_vars() # Reset classic game before starting
-            elif self.home_daily_quiz_button.handle_event(event):
-                self.current_game_state = STATE_DAILY_QUIZ_PLACEHOLDER
-            elif self.home_quit_button.handle_event(event):
-                pygame.event.post(pygame.event.Event(pygame.QUIT))
-
-        elif self.current_game_state == STATE_NAME_INPUT_CLASSIC:
-            for T_input in self.name_inputs: # Corrected variable name
-                T_input.handle_event(event)
-            if self.start_classic_game_button.handle_event(event):
-                self.players[0]["name"] = self.name_inputs[0].text or "Player 1"
-                self.players[1]["name"] = self.name_inputs[1].text or "Player 2"
-                self.current_game_state = STATE_CLASSIC_WHEEL_GAME # Transition to playing the classic game
-            elif self.back_to_menu_button.handle_event(event):
-                self.current_game_state = STATE_HOME_SCREEN
-
-        elif self.current_game_state == STATE_CLASSIC_WHEEL_GAME:
-            if self.back_to_menu_button.handle_event(event): # Check this first
-                self.current_game_state = STATE_HOME_SCREEN
-            elif self.is_choosing_letter:
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: # Left click
-                    for item in self.clickable_letters_rects:
-                        if item["rect"].collidepoint(event.pos):
-                            self.selected_letter = item["letter"] # Set the chosen letter
-                            self.is_choosing_letter = False # Exit choosing mode
-                            self.clickable_letters_rects = [] # Clear choices
-                            break
-            elif self.spin_button.handle_event(event) and not self.is_spinning:
-                self.spin()
-            elif self.selected_letter and not self.is_spinning and self.selected_letter != CHOOSE_LETTER_STATE_VALUE:
-                if self.correct_button.handle_event(event):
-                    self.handle_correct()
-                elif self.wrong_button.handle_event(event):
-                    self.handle_wrong()
-
-        # Placeholder for quiz event handling
-        elif self.current_game_state == STATE_DAILY_QUIZ_PLACEHOLDER:
-            if self.back_to_menu_button.handle_event(event):
-                self.current_game_state = STATE_HOME_SCREEN
-            # Add other quiz-specific event handling here in the future
+        # One grid lookup per pointer event; the scene compares the result by identity
+        scene = self.scene
+        if event.type == pygame.MOUSEMOTION:
+            self.set_hovered_button(scene.active_hit_index().hit(event.pos))
+            return
+        clicked = None
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button not in WHEEL_BUTTONS:
+            clicked = scene.active_hit_index().hit(event.pos)
+        scene.handle_event(event, clicked)
+
+    def start_match(self, names):
+        """Starts a fresh game between the named players on the wheel screen, pushed on the current one."""
+        self.players = [{"name": name, "score": 0} for name in names]
+        self.current_player = 0
+        self.start_seed = random.getrandbits(32) if self.next_start_seed is None else self.next_start_seed
+        self.next_start_seed = None
+        self.log_game_start()
+        return self.push_scene(STATE_CLASSIC_WHEEL_GAME)
+
+    def open_tournament(self):
+        """Resumes a running tournament, or sets up a new one."""
+        if self.tournament and not self.tournament.finished:
+            self.push_scene(STATE_TOURNAMENT_STANDINGS)
+        else:
+            self.tournament = None
+            self.push_scene(STATE_TOURNAMENT_SETUP)
+
+    def start_tournament(self, names, tournament_format):
+        self.tournament = Tournament(names, tournament_format)
+        self.return_to_scene(STATE_HOME_SCREEN) # The standings replace the setup screen
+        self.push_scene(STATE_TOURNAMENT_STANDINGS)
+
+    def start_tournament_match(self):
+        player_a, player_b = self.tournament.next_match
+        self.tournament_match = (player_a, player_b)
+        self.start_match([self.tournament.names[player_a], self.tournament.names[player_b]])
+
+    def finish_tournament_match(self):
+        winner_slot = self.current_player
+        loser_slot = 1 - winner_slot
+        self.tournament.record_result(self.tournament_match[winner_slot], self.tournament_match[loser_slot],
+                                      self.players[winner_slot]["score"], self.players[loser_slot]["score"])
+        self.return_to_scene(STATE_TOURNAMENT_STANDINGS)
+
+    def log_event(self, kind, player=None, **fields):
+        if self.event_log:
+            self.event_log.record(kind, player=self.current_player if player is None else player, **fields)
+
+    def log_game_start(self):
+        for i, player in enumerate(self.players):
+            self.log_event(EVENT_GAME_START, player=i, value=self.start_seed, text=player["name"])
+
+    def spectator_snapshot(self):
+        """What spectator screens mirror, as a tuple in SNAPSHOT_FIELDS order."""
+        wheel = self.scenes.get(STATE_CLASSIC_WHEEL_GAME)
+        angle, speed, letter = wheel.wheel_snapshot() if wheel else (0.0, 0.0, NO_LETTER)
+        return (int(self.scene is wheel), angle, speed, letter, self.current_player,
+                tuple(player["score"] for player in self.players), tuple(player["name"] for player in self.players))
 
 def main():
-    clock = pygame.time.Clock()
-    game = Game()
+    pygame.mixer.pre_init(AUDIO_SAMPLE_RATE, -16, AUDIO_CHANNELS, AUDIO_BUFFER_SIZE)
+    pygame.init()
+    SPIN_TICKER.start()
+    pygame.display.set_caption(WINDOW_CAPTION)
+    viewport = Viewport(window_size_from_env(), fullscreen=os.environ.get(FULLSCREEN_ENV_VAR) == "1",
+                        smooth=os.environ.get(SCALE_FILTER_ENV_VAR, "smooth") != "fast")
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENT_TYPES)
+
+    scheduler = FrameScheduler()
+    event_log = None
+    event_log_path = os.environ.get(EVENT_LOG_ENV_VAR)
+    if event_log_path:
+        try:
+            event_log = EventLog(event_log_path)
+        except (OSError, ValueError) as e:
+            print(f"Error opening event log '{event_log_path}': {e}")
+    spectator_host = None
+    broadcast = os.environ.get(BROADCAST_ENV_VAR)
+    if broadcast:
+        try:
+            spectator_host = SpectatorHost(broadcast_address(broadcast),
+                                           float(os.environ.get(BROADCAST_RATE_ENV_VAR, BROADCAST_RATE)))
+        except (OSError, ValueError) as e:
+            print(f"Error starting spectator broadcast to '{broadcast}': {e}")
+    game = Game(event_log)
+    first_frame_shown = False
 
     running = True
     while running:
-        for event in pygame.event.get():
+        events = scheduler.poll(game.is_animating() or RENDER_TRACKER.has_pending())
+        PROFILER.begin_frame()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                RENDER_TRACKER.mark_all() # The window contents were lost, push everything again
+                viewport.full_present = True
+            elif event.type == pygame.VIDEORESIZE:
+                viewport.handle_resize(event.size)
+                continue
+            elif event.type == pygame.KEYDOWN and event.key in (PROFILE_HOTKEY, FULLSCREEN_HOTKEY, SCALE_FILTER_HOTKEY):
+                if event.key == PROFILE_HOTKEY:
+                    PROFILER.toggle()
+                elif event.key == FULLSCREEN_HOTKEY:
+                    viewport.toggle_fullscreen()
+                else:
+                    viewport.toggle_filter()
+                continue
+            elif event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+                event = viewport.map_event(event)
             game.handle_event(event)
 
-        game.update()
-        game.draw(screen)
-        pygame.display.flip()
-        clock.tick(60)
-
+        frame_start = time.perf_counter()
+        game.update(scheduler.frame_dt)
+        if spectator_host:
+            spectator_host.publish(game.spectator_snapshot())
+        PROFILER.mark_overlay()
+        dirty_rects = game.draw(viewport.canvas)
+        if PROFILER.enabled and PROFILER.frames:
+            dirty_rects.append(PROFILER.draw_overlay(viewport.canvas))
+        with PROFILER.phase("scale"):
+            window_rects = viewport.present(dirty_rects)
+        with PROFILER.phase("display_update"):
+            if window_rects:
+                pygame.display.update(window_rects)
+        RENDER_TRACKER.record_frame(dirty_rects, time.perf_counter() - frame_start)
+        PROFILER.end_frame()
+
+        if not first_frame_shown:
+            first_frame_shown = True
+            print(f"Time to first frame: {(time.perf_counter() - PROCESS_START) * 1000:.1f} ms")
+            # Everything the home screen did not need loads while the player looks at it
+            ASSETS.warm_async(WARM_FONT_SIZES, WARM_IMAGES)
+
+    print(f"Render stats: {RENDER_TRACKER.summary()}")
+    print(f"Scheduler stats: {scheduler.summary()}")
+    print(ASSETS.report())
+    if event_log:
+        event_log.close()
+        print(f"Event log: {event_log.records_written} records written to {event_log.path}")
+    if spectator_host:
+        spectator_host.close()
+        print(f"Spectator broadcast: {spectator_host.summary()}")
+    if PROFILER.frames:
+        profile_path = os.environ.get(PROFILE_OUTPUT_ENV_VAR, DEFAULT_PROFILE_OUTPUT)
+        PROFILER.dump(profile_path)
+        print(f"Frame profile written to {profile_path}")
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+"""Headless benchmarks for the IQRA game's draw/update/event hot paths.
+
+Runs scripted event streams against Game on SDL's dummy video and audio drivers, so it needs no display,
+sound card or network. Per-function latency percentiles and frames per second are printed and written to
+a JSON file that can be compared between builds:
+
+    python benchmark.py --output bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+import IQRA
+
+TIMED_METHODS = ("handle_event", "update", "draw", "draw_scene")
+# Scene methods, timed under the names they had when they were Game methods so results stay comparable
+TIMED_SCENE_METHODS = {
+    IQRA.STATE_HOME_SCREEN: {"draw": "draw_home_screen"},
+    IQRA.STATE_NAME_INPUT_CLASSIC: {"draw": "draw_classic_name_input"},
+    IQRA.STATE_CLASSIC_WHEEL_GAME: {"draw": "draw_classic_game_play", "draw_wheel": "draw_wheel"},
+    IQRA.STATE_TOURNAMENT_STANDINGS: {"draw": "draw_tournament_standings"},
+}
+WHEEL_RENDER = "wheel_render" # Every draw of the wheel mesh, timed on the scene's WheelSprite
+PERCENTILES = (50, 90, 99)
+# A spin should draw the wheel mesh only when it comes to rest
+SPIN_SCENARIOS = ("repeated_spins", "full_redraw_spin")
+MIN_WHEEL_HIT_RATE = 0.9
+
+
+class Recorder:
+    """Collects per-call latencies for the Game methods it wraps."""
+    def __init__(self):
+        self.samples = {name: [] for name in TIMED_METHODS}
+        for methods in TIMED_SCENE_METHODS.values():
+            self.samples.update((name, []) for name in methods.values())
+        self.samples[WHEEL_RENDER] = []
+        self.frame_times = []
+
+    def instrument(self, game):
+        # Instance attributes shadow the class methods, so internal self.draw_wheel() calls are timed too
+        for name in TIMED_METHODS:
+            setattr(game, name, self.timed(name, getattr(game, name)))
+        for scene in game.scenes.values():
+            self.instrument_scene(scene)
+        # Scenes are built on first entry, so the rest are instrumented as they are built
+        build_scene = game.build_scene
+        def build_instrumented_scene(state):
+            scene = build_scene(state)
+            self.instrument_scene(scene)
+            return scene
+        game.build_scene = build_instrumented_scene
+
+    def instrument_scene(self, scene):
+        for method, name in TIMED_SCENE_METHODS.get(scene.state, {}).items():
+            setattr(scene, method, self.timed(name, getattr(scene, method)))
+        sprite = getattr(scene, "wheel_sprite", None)
+        if sprite is not None:
+            sprite.render = self.timed(WHEEL_RENDER, sprite.render)
+
+    def timed(self, name, method):
+        samples = self.samples[name]
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            samples.append(time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def report(self):
+        functions = {}
+        for name, samples in self.samples.items():
+            if samples:
+                functions[name] = summarize(samples)
+        total_frame_time = sum(self.frame_times)
+        return {
+            "frames": len(self.frame_times),
+            "fps": len(self.frame_times) / total_frame_time if total_frame_time else None,
+            "frame": summarize(self.frame_times) if self.frame_times else None,
+            "functions": functions,
+        }
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    summary = {"count": len(ordered), "mean_ms": sum(ordered) / len(ordered) * 1000, "max_ms": ordered[-1] * 1000}
+    for percentile in PERCENTILES:
+        index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+        summary[f"p{percentile}_ms"] = ordered[index] * 1000
+    return summary
+
+
+class Session:
+    """Drives one Game instance frame by frame with scripted input."""
+    def __init__(self, screen, recorder):
+        self.screen = screen
+        self.recorder = recorder
+        self.game = IQRA.Game()
+        recorder.instrument(self.game)
+
+    def frame(self, events=()):
+        start = time.perf_counter()
+        for event in events:
+            self.game.handle_event(event)
+        self.game.update(IQRA.PHYSICS_DT)
+        self.game.draw(self.screen)
+        self.recorder.frame_times.append(time.perf_counter() - start)
+
+    def click(self, rect):
+        pos = rect.center
+        self.frame([
+            pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+        ])
+
+    def type_text(self, text):
+        for character in text:
+            self.frame([pygame.event.Event(pygame.KEYDOWN, key=0, unicode=character, mod=0)])
+
+    def start_classic_game(self, names):
+        self.frame()
+        self.click(self.game.scene.play_classic_button.rect)
+        for text_input, name in zip(self.game.scene.name_inputs, names):
+            self.click(text_input.rect)
+            self.type_text(name)
+        self.click(self.game.scene.start_button.rect)
+
+    def spin_to_rest(self):
+        scene = self.game.scene
+        self.click(scene.spin_button.rect)
+        while scene.is_spinning:
+            self.frame()
+        self.frame()
+
+    def seed_spin_landing_on(self, letter, rng):
+        """Seeds the global RNG so the next spin lands on the given letter."""
+        while True:
+            seed = rng.getrandbits(32)
+            speed = IQRA.spin_speed_for_seed(random.Random(seed).getrandbits(32)) # The seed spin() will draw
+            final_angle = self.game.scene.angle + IQRA.spin_distance(speed, IQRA.spin_step_count(speed))
+            if IQRA.letter_at_angle(final_angle) == letter:
+                random.seed(seed)
+                return
+
+    def settle_turn(self, correct):
+        scene = self.game.scene
+        if scene.is_choosing_letter:
+            choice = random.choice(scene.clickable_letters_rects)
+            self.click(choice["rect"])
+        self.click(scene.correct_button.rect if correct else scene.wrong_button.rect)
+
+
+def scenario_classic_game(session, options, rng):
+    """A full two-player classic game played until someone reaches 5 points."""
+    session.start_classic_game(["Aisha", "يوسف"])
+    game = session.game
+    while max(player["score"] for player in game.players) < 5:
+        session.spin_to_rest()
+        session.settle_turn(correct=rng.random() < 0.6)
+
+
+def scenario_repeated_spins(session, options, rng):
+    """Back-to-back spins with no scoring, dominated by the spin animation."""
+    session.start_classic_game(["Player 1", "Player 2"])
+    for _ in range(options.spins):
+        session.spin_to_rest()
+        session.settle_turn(correct=False)
+
+
+def scenario_star_choice(session, options, rng):
+    """Spins forced onto the star, each followed by picking a letter from the choice grid."""
+    session.start_classic_game(["Player 1", "Player 2"])
+    for _ in range(options.star_flows):
+        session.seed_spin_landing_on(IQRA.CHOOSE_LETTER_SYMBOL, rng)
+        session.spin_to_rest()
+        session.settle_turn(correct=True)
+
+
+def scenario_full_redraw_spin(session, options, rng):
+    """Spins with every frame forced to a full redraw, the worst case for the render path."""
+    session.start_classic_game(["Player 1", "Player 2"])
+    scene = session.game.scene
+    for _ in range(options.spins):
+        session.click(scene.spin_button.rect)
+        while scene.is_spinning:
+            IQRA.RENDER_TRACKER.mark_all()
+            session.frame()
+        session.settle_turn(correct=False)
+
+
+def scenario_tournament(session, options, rng):
+    """A large round robin: results go straight into the leaderboard while the standings are scrolled."""
+    game = session.game
+    game.start_tournament([f"Contestant {i + 1}" for i in range(options.contestants)], IQRA.TOURNAMENT_ROUND_ROBIN)
+    session.frame()
+    for _ in range(options.results):
+        player_a, player_b = game.tournament.next_match
+        winner, loser = (player_a, player_b) if rng.random() < 0.5 else (player_b, player_a)
+        game.tournament.record_result(winner, loser, IQRA.WINNING_SCORE, rng.randrange(IQRA.WINNING_SCORE))
+        game.scene.refresh()
+        session.frame([pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=rng.choice((-1, 1)), flipped=False)])
+
+
+def scenario_celebrations(session, options, rng):
+    """Win fireworks on the game screen, thousands of particles animating at once."""
+    session.start_classic_game(["Player 1", "Player 2"])
+    game = session.game
+    for _ in range(options.celebrations):
+        game.scene.celebrate_win()
+        while game.particles.live:
+            session.frame()
+
+
+SCENARIOS = {
+    "classic_game": scenario_classic_game,
+    "repeated_spins": scenario_repeated_spins,
+    "star_choice": scenario_star_choice,
+    "full_redraw_spin": scenario_full_redraw_spin,
+    "tournament": scenario_tournament,
+    "celebrations": scenario_celebrations,
+}
+
+
+def run(options):
+    pygame.init()
+    screen = pygame.display.set_mode((IQRA.SCREEN_WIDTH, IQRA.SCREEN_HEIGHT))
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "seed": options.seed,
+        "scenarios": {},
+    }
+    for name in options.scenarios:
+        random.seed(options.seed)
+        recorder = Recorder()
+        session = Session(screen, recorder)
+        wall_start = time.perf_counter()
+        SCENARIOS[name](session, options, random.Random(options.seed))
+        report = recorder.report()
+        report["wall_time_s"] = time.perf_counter() - wall_start
+        wheel_scene = session.game.scenes.get(IQRA.STATE_CLASSIC_WHEEL_GAME)
+        if wheel_scene is not None:
+            sprite = wheel_scene.wheel_sprite
+            report["wheel"] = {"hits": sprite.hits, "misses": sprite.misses, "rotations": sprite.rotations,
+                               "hit_rate": sprite.hit_rate()}
+        results["scenarios"][name] = report
+        print_report(name, report)
+
+    pygame.quit()
+    return results
+
+
+def print_report(name, report):
+    print(f"\n{name}: {report['frames']} frames, {report['fps']:.0f} fps, {report['wall_time_s']:.2f} s wall")
+    print(f"  {'function':<26}{'calls':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    for function, stats in report["functions"].items():
+        print(f"  {function:<26}{stats['count']:>8}{stats['mean_ms']:>9.3f}{stats['p50_ms']:>9.3f}"
+              f"{stats['p90_ms']:>9.3f}{stats['p99_ms']:>9.3f}{stats['max_ms']:>9.3f}")
+    wheel = report.get("wheel")
+    if wheel:
+        print(f"  wheel: {wheel['hits']} cached, {wheel['rotations']} rotated, {wheel['misses']} drawn from the mesh "
+              f"({wheel['hit_rate']:.1%} without a mesh draw)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark IQRA's render and input paths headlessly.")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file to write results to")
+    parser.add_argument("--seed", type=int, default=1234, help="seed for spins and scripted choices")
+    parser.add_argument("--spins", type=int, default=20, help="spins in the repeated-spin scenarios")
+    parser.add_argument("--star-flows", type=int, default=10, help="star letter-choice flows to run")
+    parser.add_argument("--contestants", type=int, default=200, help="players in the tournament scenario")
+    parser.add_argument("--results", type=int, default=500, help="match results recorded in the tournament scenario")
+    parser.add_argument("--celebrations", type=int, default=5, help="win celebrations in the celebrations scenario")
+    parser.add_argument("--min-wheel-hit-rate", type=float, default=MIN_WHEEL_HIT_RATE,
+                        help="fail if fewer wheel draws than this in a spin scenario avoid drawing the mesh")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    options = parser.parse_args(argv)
+
+    results = run(options)
+    with open(options.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2, ensure_ascii=False)
+    print(f"\nResults written to {options.output}")
+
+    status = 0
+    for name in SPIN_SCENARIOS:
+        wheel = results["scenarios"].get(name, {}).get("wheel")
+        if wheel and wheel["hit_rate"] < options.min_wheel_hit_rate:
+            print(f"{name}: wheel hit rate {wheel['hit_rate']:.1%} is below {options.min_wheel_hit_rate:.0%}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Builds the memory-mapped ayah index the game uses to look up ayat by their first letter.
+
+The source is a local UTF-8 text file with one ayah per line in the form "surah|ayah|text" (the format of
+the Tanzil Quran text downloads); blank lines and lines starting with "#" are ignored:
+
+    python build_quran_index.py quran-simple.txt
+"""
+import argparse
+import os
+import sys
+import time
+
+import IQRA
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the binary ayah index used for referee lookups.")
+    parser.add_argument("source", help='UTF-8 text file with one "surah|ayah|text" line per ayah')
+    parser.add_argument("--output", default=os.path.join(IQRA.script_dir, IQRA.QURAN_INDEX_FILE_NAME),
+                        help="index file to write (default: next to IQRA.py, where the game looks for it)")
+    options = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    record_count, bucket_count = IQRA.build_quran_index(options.source, options.output)
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {record_count} ayat under {bucket_count} first letters into {options.output} "
+          f"({os.path.getsize(options.output)} bytes, {elapsed:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
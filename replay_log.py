@@ -0,0 +1,141 @@
+"""Replays an IQRA event log headlessly, faster than real time.
+
+Every logged game is played again through Game.handle_event and Game.update with the logged spin seeds,
+star choices and verdicts, and each landing and score is checked against the log. Use it to audit a
+disputed result, or with --render and --repeat to turn a real session into a load test:
+
+    IQRA_EVENT_LOG=session.iqralog python IQRA.py
+    python replay_log.py session.iqralog
+"""
+import argparse
+import os
+import sys
+import time
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+import IQRA
+
+
+class Replayer:
+    """Drives a Game from log records and collects every outcome that differs from the log."""
+    def __init__(self, screen=None):
+        self.screen = screen # Every frame is drawn when set, to load the render path as well
+        self.game = IQRA.Game()
+        self.names = {}
+        self.counts = {name: 0 for name in IQRA.EVENT_KIND_NAMES.values()}
+        self.mismatches = []
+        self.frames = 0
+        self.session_time = 0.0 # Real time covered by the log
+        self.last_timestamp = 0.0
+
+    def frame(self, events=()):
+        for event in events:
+            self.game.handle_event(event)
+        self.game.update(IQRA.PHYSICS_DT)
+        if self.screen:
+            self.game.draw(self.screen)
+        self.frames += 1
+
+    def click(self, rect):
+        pos = rect.center
+        self.frame([
+            pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+        ])
+
+    def check(self, timestamp, what, logged, replayed):
+        if logged != replayed:
+            self.mismatches.append(f"{timestamp:10.2f} s  {what}: log has {logged!r}, replay gives {replayed!r}")
+
+    def start_game(self, names):
+        game = self.game
+        if game.current_game_state != IQRA.STATE_HOME_SCREEN:
+            self.click(game.scene.back_button.rect)
+        self.click(game.scene.play_classic_button.rect)
+        for text_input, name in zip(game.scene.name_inputs, names):
+            self.click(text_input.rect)
+            self.frame([pygame.event.Event(pygame.KEYDOWN, key=0, unicode=character, mod=0) for character in name])
+        self.click(game.scene.start_button.rect)
+
+    def apply(self, record):
+        timestamp, kind, player, letter, score, value, text = record
+        game = self.game
+        scene = game.scene # The wheel screen while a game is on
+        self.counts[IQRA.EVENT_KIND_NAMES[kind]] += 1
+
+        if kind == IQRA.EVENT_SESSION_START:
+            # Each run of the game appends its own session with the clock restarted
+            self.session_time += self.last_timestamp
+            self.game = IQRA.Game()
+            self.names = {}
+        elif kind == IQRA.EVENT_GAME_START:
+            self.names[player] = text
+            if len(self.names) == len(game.players):
+                game.next_start_seed = value
+                self.start_game([self.names[i] for i in range(len(self.names))])
+                self.names = {}
+        elif kind == IQRA.EVENT_SPIN:
+            self.check(timestamp, "player spinning", player, game.current_player)
+            game.next_spin_seed = value
+            self.click(scene.spin_button.rect)
+            while scene.is_spinning:
+                self.frame()
+        elif kind == IQRA.EVENT_LANDED:
+            self.check(timestamp, "landing", letter, scene.get_selected_letter())
+        elif kind == IQRA.EVENT_LETTER_CHOSEN:
+            for item in scene.clickable_letters_rects:
+                if item["letter"] == letter:
+                    self.click(item["rect"])
+                    break
+            self.check(timestamp, "chosen letter", letter, scene.selected_letter)
+        elif kind == IQRA.EVENT_VERDICT:
+            self.check(timestamp, "player judged", player, game.current_player)
+            self.click(scene.correct_button.rect if value else scene.wrong_button.rect)
+            self.check(timestamp, f"score of {game.players[player]['name']}", score, game.players[player]["score"])
+        self.last_timestamp = timestamp
+
+    def finish(self):
+        self.session_time += self.last_timestamp
+        self.last_timestamp = 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay an IQRA event log headlessly and check its outcomes.")
+    parser.add_argument("log", help="event log written with IQRA_EVENT_LOG set")
+    parser.add_argument("--render", action="store_true", help="draw every frame, to load the render path too")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+    options = parser.parse_args(argv)
+
+    pygame.init()
+    screen = pygame.display.set_mode((IQRA.SCREEN_WIDTH, IQRA.SCREEN_HEIGHT))
+    try:
+        records = list(IQRA.read_event_log(options.log))
+    except (OSError, ValueError) as e:
+        print(f"Error reading event log: {e}")
+        return 2
+
+    replayer = Replayer(screen if options.render else None)
+    wall_start = time.perf_counter()
+    for _ in range(options.repeat):
+        for record in records:
+            replayer.apply(record)
+        replayer.finish()
+    wall_time = time.perf_counter() - wall_start
+    pygame.quit()
+
+    counts = ", ".join(f"{count} {name}" for name, count in replayer.counts.items() if count)
+    print(f"Replayed {len(records)} records x {options.repeat} from {options.log}: {counts}")
+    speedup = f" ({replayer.session_time / wall_time:,.0f}x real time)" if wall_time else ""
+    print(f"{replayer.session_time:.1f} s of play replayed in {wall_time:.2f} s{speedup}, {replayer.frames} frames")
+    for mismatch in replayer.mismatches:
+        print(mismatch)
+    print(f"{len(replayer.mismatches)} mismatches")
+    return 1 if replayer.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Monte Carlo fairness and throughput simulator for the letter wheel.
+
+Spins are simulated with NumPy using the game's own physics constants and closed-form spin model
+(IQRA.spin_step_count / IQRA.spin_distance / IQRA.letter_at_angle), so millions of spins take seconds and
+the results match real play:
+
+    python simulate_wheel.py --spins 5000000
+    python simulate_wheel.py --spins 1000000 --start random   # first spin of every game only
+    python simulate_wheel.py --spins 1000000 --start zero     # ... as it was when every game started at angle 0
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+import IQRA
+
+CHUNK_SIZE = 1_000_000 # Spins simulated per vectorized batch, bounds peak memory
+DURATION_BIN_SECONDS = 0.5
+
+
+def simulate_chunk(rng, count):
+    """Returns (distance in degrees, duration in physics steps) for count random spins."""
+    speeds = rng.uniform(IQRA.SPIN_SPEED_MIN, IQRA.SPIN_SPEED_MAX, count)
+    steps = np.floor(np.log(IQRA.SPIN_STOP_SPEED / speeds) / math.log(IQRA.SPIN_FRICTION)) + 1
+    steps = np.maximum(steps, 1)
+    # Same boundary nudges as IQRA.spin_step_count, applied to the whole batch at once
+    steps += speeds * IQRA.SPIN_FRICTION ** steps >= IQRA.SPIN_STOP_SPEED
+    steps -= (steps > 1) & (speeds * IQRA.SPIN_FRICTION ** (steps - 1) < IQRA.SPIN_STOP_SPEED)
+    distances = speeds * (1 - IQRA.SPIN_FRICTION ** steps) / (1 - IQRA.SPIN_FRICTION)
+    return distances, steps.astype(np.int64)
+
+
+def letter_indices(angles):
+    """Vectorized IQRA.letter_at_angle: the segment under the fixed pointer."""
+    edges = np.floor((angles - IQRA.POINTER_ANGLE + IQRA.SEGMENT_ANGLE / 2) / IQRA.SEGMENT_ANGLE).astype(np.int64)
+    return -edges % len(IQRA.ARABIC_LETTERS)
+
+
+def chi_square(counts):
+    """Chi-square statistic against a uniform wheel, with a Wilson-Hilferty approximation of the p-value."""
+    expected = counts.sum() / len(counts)
+    statistic = float(((counts - expected) ** 2 / expected).sum())
+    dof = len(counts) - 1
+    z = ((statistic / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    p_value = 0.5 * math.erfc(z / math.sqrt(2))
+    return statistic, dof, p_value
+
+
+def run(spins, seed, start):
+    rng = np.random.default_rng(seed)
+    letter_counts = np.zeros(len(IQRA.ARABIC_LETTERS), dtype=np.int64)
+    max_steps = IQRA.spin_step_count(IQRA.SPIN_SPEED_MAX) + 1
+    step_counts = np.zeros(max_steps + 1, dtype=np.int64)
+    angle = 0.0 # The wheel angle carried between spins, as Game.angle is within one game
+
+    wall_start = time.perf_counter()
+    remaining = spins
+    while remaining:
+        count = min(CHUNK_SIZE, remaining)
+        distances, steps = simulate_chunk(rng, count)
+        if start == "chained":
+            # Each spin starts where the previous one landed; fold into [0, 360) to keep the sums precise
+            final_angles = angle + np.cumsum(np.mod(distances, 360))
+            angle = float(np.mod(final_angles[-1], 360))
+        elif start == "random":
+            # A new game's start angle, as IQRA.start_angle_for_seed draws it
+            final_angles = rng.uniform(0, 360, count) + distances
+        else:
+            final_angles = distances
+        letter_counts += np.bincount(letter_indices(final_angles), minlength=len(letter_counts))
+        step_counts += np.bincount(steps, minlength=len(step_counts))[:len(step_counts)]
+        remaining -= count
+    wall_time = time.perf_counter() - wall_start
+
+    statistic, dof, p_value = chi_square(letter_counts)
+    durations = np.nonzero(step_counts)[0]
+    total = step_counts.sum()
+    cumulative = np.cumsum(step_counts)
+    def duration_percentile(p):
+        return float(np.searchsorted(cumulative, p / 100 * total) / IQRA.PHYSICS_HZ)
+
+    bin_steps = int(DURATION_BIN_SECONDS * IQRA.PHYSICS_HZ)
+    duration_histogram = {}
+    for first_step in range(0, len(step_counts), bin_steps):
+        in_bin = int(step_counts[first_step:first_step + bin_steps].sum())
+        if in_bin:
+            duration_histogram[f"{first_step / IQRA.PHYSICS_HZ:.1f}s"] = in_bin
+
+    return {
+        "spins": spins,
+        "seed": seed,
+        "start": start,
+        "wall_time_s": wall_time,
+        "spins_per_second": spins / wall_time if wall_time else None,
+        "letters": {letter: int(count) for letter, count in zip(IQRA.ARABIC_LETTERS, letter_counts)},
+        "chi_square": {"statistic": statistic, "dof": dof, "p_value": p_value},
+        "duration_s": {
+            "min": float(durations[0] / IQRA.PHYSICS_HZ),
+            "mean": float((np.arange(len(step_counts)) * step_counts).sum() / total / IQRA.PHYSICS_HZ),
+            "p50": duration_percentile(50),
+            "p95": duration_percentile(95),
+            "max": float(durations[-1] / IQRA.PHYSICS_HZ),
+            "histogram": duration_histogram,
+        },
+    }
+
+
+def validate(samples, seed):
+    """Checks the vectorized model against the game's scalar physics on a sample of spins."""
+    rng = np.random.default_rng(seed)
+    distances, steps = simulate_chunk(rng, samples)
+    speeds_rng = np.random.default_rng(seed)
+    speeds = speeds_rng.uniform(IQRA.SPIN_SPEED_MIN, IQRA.SPIN_SPEED_MAX, samples)
+    mismatches = 0
+    for speed, distance, step_count in zip(speeds, distances, steps):
+        expected_steps = IQRA.spin_step_count(float(speed))
+        expected_letter = IQRA.letter_at_angle(IQRA.spin_distance(float(speed), expected_steps))
+        if expected_steps != step_count or expected_letter != IQRA.letter_at_angle(float(distance)):
+            mismatches += 1
+    return mismatches
+
+
+def print_report(results):
+    print(f"{results['spins']:,} spins ({results['start']} start, seed {results['seed']}) in "
+          f"{results['wall_time_s']:.2f} s ({results['spins_per_second']:,.0f} spins/s)")
+    expected = results["spins"] / len(results["letters"])
+    print(f"\n{'letter':>8}{'count':>14}{'share':>9}{'vs fair':>9}")
+    for letter, count in results["letters"].items():
+        print(f"{letter:>8}{count:>14,}{count / results['spins']:>9.3%}{count / expected - 1:>+9.2%}")
+    chi = results["chi_square"]
+    print(f"\nchi-square {chi['statistic']:.2f} with {chi['dof']} dof, p = {chi['p_value']:.4g}")
+    duration = results["duration_s"]
+    print(f"spin duration: min {duration['min']:.2f} s, mean {duration['mean']:.2f} s, "
+          f"p50 {duration['p50']:.2f} s, p95 {duration['p95']:.2f} s, max {duration['max']:.2f} s")
+    peak = max(duration["histogram"].values())
+    for label, count in duration["histogram"].items():
+        print(f"  {label:>6} {'#' * max(1, round(40 * count / peak))} {count:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate wheel spins to check outcome fairness.")
+    parser.add_argument("--spins", type=int, default=1_000_000, help="number of spins to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (default: random)")
+    parser.add_argument("--start", choices=("chained", "random", "zero"), default="chained",
+                        help="chain spins like one long game, start every spin from a random angle like a new game, "
+                             "or from angle 0 like a new game did before start angles were randomized")
+    parser.add_argument("--validate", type=int, default=10_000, metavar="N",
+                        help="cross-check N spins against the game's scalar physics first (0 to skip)")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    options = parser.parse_args(argv)
+    seed = options.seed if options.seed is not None else random.getrandbits(32)
+
+    if options.validate:
+        mismatches = validate(options.validate, seed)
+        print(f"Validated {options.validate:,} spins against the game physics: {mismatches} mismatches")
+        if mismatches:
+            return 1
+
+    results = run(options.spins, seed, options.start)
+    print_report(results)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""Spectator screen for IQRA: mirrors the wheel and scores of a game started with IQRA_BROADCAST set.
+
+Run the game on the referee's laptop with broadcasting on, and this on the projector or TV machine:
+
+    IQRA_BROADCAST=255.255.255.255 python IQRA.py
+    python spectator.py
+
+Snapshots arrive only a few times a second. Between them the wheel is extrapolated with the game's own spin
+physics, so it still turns smoothly at the display's frame rate. --headless receives without opening a window
+and prints what arrives, which with IQRA_BROADCAST=127.0.0.1 tests the whole link on one machine.
+"""
+import argparse
+import math
+import os
+import socket
+import sys
+import time
+
+import pygame
+import IQRA
+
+SPECTATOR_FPS = 60
+SPECTATOR_CAPTION = "IQRA - Spectator"
+CORRECTION_TIME = 0.15 # Seconds over which a snapshot's correction to the extrapolated angle fades in
+SNAP_ANGLE = 45 # Corrections larger than this (a new game, a spin whose start was lost) jump straight there
+MAX_PACKET_SIZE = 2048
+
+
+def sequence_is_newer(sequence, last):
+    """Compares 16-bit sequence numbers, allowing for wrap-around."""
+    return sequence != last and (sequence - last) & 0xFFFF < 0x8000
+
+
+class SpectatorClient:
+    """Receives snapshots on a UDP port and keeps the mirrored game state.
+
+    Deltas are applied on top of the keyframe they name, so a lost or reordered packet costs at most the wait for
+    the next keyframe. The wheel angle between snapshots comes from angle_at(), not from the network.
+    """
+    def __init__(self, address):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(address)
+        self.socket.setblocking(False)
+        self.keyframe = None
+        self.keyframe_sequence = None
+        self.last_sequence = None
+        self.state = None # Field name -> value, once the first keyframe has arrived
+        self.motion_angle = 0.0
+        self.motion_speed = 0.0
+        self.motion_time = 0.0
+        self.motion_steps = 0
+        self.correction = 0.0
+        self.packets = 0
+        self.bytes = 0
+        self.stale = 0 # Arrived after a newer packet
+        self.orphaned = 0 # Deltas whose keyframe was lost
+        self.malformed = 0
+
+    def receive(self, now):
+        """Applies every packet waiting on the socket; returns True if anything but the wheel motion changed."""
+        changed = False
+        while True:
+            try:
+                packet, _ = self.socket.recvfrom(MAX_PACKET_SIZE)
+            except BlockingIOError:
+                return changed
+            except OSError as e:
+                print(f"Error receiving snapshot: {e}")
+                return changed
+            changed |= self.apply(packet, now)
+
+    def apply(self, packet, now):
+        self.packets += 1
+        self.bytes += len(packet)
+        try:
+            flags, sequence, keyframe_sequence, fields = IQRA.decode_snapshot(packet)
+        except ValueError:
+            self.malformed += 1
+            return False
+
+        if flags & IQRA.SNAPSHOT_KEYFRAME:
+            # Always taken, so a restarted game, whose numbering starts over, is picked up at its first keyframe
+            self.keyframe, self.keyframe_sequence = fields, sequence
+        elif self.last_sequence is not None and not sequence_is_newer(sequence, self.last_sequence):
+            self.stale += 1
+            return False
+        elif keyframe_sequence != self.keyframe_sequence:
+            self.orphaned += 1
+            return False
+        self.last_sequence = sequence
+
+        state = dict(self.keyframe)
+        state.update(fields)
+        self.set_motion(state["angle"], state["speed"], now)
+        changed = self.state is None or any(state[name] != self.state[name] for name in state
+                                            if name not in ("angle", "speed"))
+        self.state = state
+        return changed
+
+    def set_motion(self, angle, speed, now):
+        """Re-anchors the extrapolation on a snapshot, easing out the jump from where the wheel was shown."""
+        error = 0.0
+        if self.state is not None:
+            error = (self.angle_at(now) - angle + 180) % 360 - 180
+        self.correction = error if abs(error) < SNAP_ANGLE else 0.0
+        self.motion_angle, self.motion_speed, self.motion_time = angle, speed, now
+        # The host's spin ends after exactly this many more physics steps, so the extrapolation stops where it does
+        self.motion_steps = IQRA.spin_step_count(speed) if speed > 0 else 0
+
+    def angle_at(self, now):
+        elapsed = now - self.motion_time
+        steps = min(elapsed * IQRA.PHYSICS_HZ, self.motion_steps)
+        return (self.motion_angle + IQRA.spin_distance(self.motion_speed, steps)
+                + self.correction * math.exp(-elapsed / CORRECTION_TIME))
+
+    def is_spinning(self, now):
+        return (now - self.motion_time) * IQRA.PHYSICS_HZ < self.motion_steps
+
+    def summary(self, seconds):
+        rate = f", {self.bytes / seconds:.0f} bytes/s" if seconds else ""
+        return (f"{self.packets} packets, {self.bytes} bytes{rate}; {self.stale} stale, {self.orphaned} without "
+                f"their keyframe, {self.malformed} malformed")
+
+    def close(self):
+        self.socket.close()
+
+
+class SpectatorView:
+    """Draws the mirrored state with the game's own wheel, score panels and celebrations."""
+    def __init__(self):
+        self.game = IQRA.Game() # Only its drawing code and particles are used
+        self.scene = self.game.push_scene(IQRA.STATE_CLASSIC_WHEEL_GAME)
+        self.state = None
+        self.shown_angle = None
+        self.moving = False
+
+    def show(self, state):
+        game = self.game
+        if self.state is not None and self.state["names"] == state["names"]:
+            for i, (before, after) in enumerate(zip(self.state["scores"], state["scores"])):
+                if after > before:
+                    if after == IQRA.WINNING_SCORE:
+                        self.scene.celebrate_win()
+                    else:
+                        self.scene.celebrate_correct(i)
+        game.players = [{"name": name, "score": score} for name, score in zip(state["names"], state["scores"])]
+        game.current_player = state["player"]
+        self.state = state
+        IQRA.RENDER_TRACKER.mark_all()
+
+    def update(self, angle, moving, dt):
+        if angle != self.shown_angle or moving != self.moving: # The resting frame is drawn exactly, not rotated
+            self.shown_angle = angle
+            self.moving = moving
+            self.scene.render_angle = angle
+            IQRA.RENDER_TRACKER.mark(self.scene.wheel_rect())
+        self.game.update(dt) # Not spinning, so this only moves the particles
+
+    def draw(self, surface):
+        rects = IQRA.RENDER_TRACKER.collect(surface.get_rect())
+        for rect in rects:
+            surface.set_clip(rect)
+            surface.fill(IQRA.WHITE)
+            self.draw_scene(surface)
+        surface.set_clip(None)
+        return rects
+
+    def draw_scene(self, surface):
+        game = self.game
+        if game.logo:
+            surface.blit(game.logo, game.logo.get_rect(midtop=(IQRA.SCREEN_WIDTH // 2, 20)))
+        if self.state is None or not self.state["playing"]:
+            waiting = "Waiting for the game to start" if self.state is None else "Waiting for the next game"
+            message = IQRA.GLYPH_CACHE.render(waiting, IQRA.ASSETS.font(IQRA.GAME_MAIN_FONT_SIZE), IQRA.NAVY)
+            surface.blit(message, message.get_rect(center=(IQRA.SCREEN_WIDTH // 2, IQRA.SCREEN_HEIGHT // 2)))
+        else:
+            self.scene.draw_wheel(surface, self.moving)
+            self.scene.draw_player_panels(surface)
+            letter = self.state["letter"]
+            if letter == IQRA.CHOOSING_LETTER:
+                text = IQRA.GLYPH_CACHE.render_shaped(IQRA.choose_instruction(game.players[game.current_player]["name"]),
+                                                      IQRA.ASSETS.font(IQRA.INSTRUCTION_FONT_SIZE), IQRA.NAVY)
+                surface.blit(text, text.get_rect(center=(IQRA.SCREEN_WIDTH // 2, IQRA.SCREEN_HEIGHT - 30)))
+            elif letter != IQRA.NO_LETTER:
+                text = IQRA.GLYPH_CACHE.render(IQRA.recite_instruction(IQRA.ARABIC_LETTERS[letter]),
+                                               IQRA.ASSETS.font(IQRA.INSTRUCTION_FONT_SIZE), IQRA.NAVY)
+                surface.blit(text, text.get_rect(center=(IQRA.SCREEN_WIDTH // 2, IQRA.SCREEN_HEIGHT - 150)))
+        if game.particles.live:
+            game.particles.draw(surface)
+
+
+def run_headless(client, duration):
+    start = time.perf_counter()
+    next_report = start + 1
+    while duration is None or time.perf_counter() - start < duration:
+        now = time.perf_counter()
+        client.receive(now)
+        if now >= next_report and client.state:
+            state = client.state
+            scores = ", ".join(f"{name} {score}" for name, score in zip(state["names"], state["scores"]))
+            spinning = " spinning" if client.is_spinning(now) else ""
+            print(f"{now - start:7.1f} s  angle {client.angle_at(now) % 360:6.1f}{spinning}  {scores}")
+            next_report += 1
+        time.sleep(1 / SPECTATOR_FPS)
+    return time.perf_counter() - start
+
+
+def run_window(client, duration):
+    pygame.init()
+    pygame.display.set_caption(SPECTATOR_CAPTION)
+    viewport = IQRA.Viewport(IQRA.window_size_from_env(), fullscreen=os.environ.get(IQRA.FULLSCREEN_ENV_VAR) == "1",
+                             smooth=os.environ.get(IQRA.SCALE_FILTER_ENV_VAR, "smooth") != "fast")
+    view = SpectatorView()
+    clock = pygame.time.Clock()
+    start = time.perf_counter()
+    running = True
+    while running and (duration is None or time.perf_counter() - start < duration):
+        dt = clock.tick(SPECTATOR_FPS) / 1000
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.VIDEORESIZE:
+                viewport.handle_resize(event.size)
+            elif event.type == pygame.VIDEOEXPOSE:
+                IQRA.RENDER_TRACKER.mark_all()
+                viewport.full_present = True
+            elif event.type == pygame.KEYDOWN and event.key == IQRA.FULLSCREEN_HOTKEY:
+                viewport.toggle_fullscreen()
+
+        now = time.perf_counter()
+        if client.receive(now):
+            view.show(client.state)
+        if client.state:
+            view.update(client.angle_at(now), client.is_spinning(now), dt)
+        window_rects = viewport.present(view.draw(viewport.canvas))
+        if window_rects:
+            pygame.display.update(window_rects)
+    pygame.quit()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mirror a broadcasting IQRA game on a second screen.")
+    parser.add_argument("--listen", default=f"0.0.0.0:{IQRA.BROADCAST_PORT}", help="HOST[:PORT] to receive on")
+    parser.add_argument("--headless", action="store_true", help="print received state instead of opening a window")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    options = parser.parse_args(argv)
+
+    try:
+        client = SpectatorClient(IQRA.broadcast_address(options.listen))
+    except (OSError, ValueError) as e:
+        print(f"Error listening on '{options.listen}': {e}")
+        return 2
+    try:
+        seconds = run_headless(client, options.duration) if options.headless else run_window(client, options.duration)
+    except KeyboardInterrupt:
+        seconds = None
+    finally:
+        client.close()
+    print(f"Received {client.summary(seconds)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
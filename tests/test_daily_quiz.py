@@ -0,0 +1,150 @@
+"""Checks the quiz question bank, its byte-offset index and how both cope with damaged files.
+
+    python -m unittest discover tests
+"""
+import contextlib
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import IQRA
+
+
+def question_line(text, choices=("a", "b", "c", "d"), answer=0):
+    return json.dumps({"question": text, "choices": list(choices), "answer": answer}, ensure_ascii=False)
+
+
+VALID = [question_line(f"Q{i}", answer=i % 4) for i in range(8)]
+VALID.append(question_line("ما هي أول سورة؟", ("الفاتحة", "البقرة"), 0))
+MALFORMED = [
+    '{"question": "cut',
+    question_line("five choices", "abcde"),
+    question_line("answer out of range", answer=4),
+    question_line("answer is a bool", answer=True),
+    question_line("one choice", ("a",)),
+    '["not", "an", "object"]',
+    '{"choices": ["a", "b"], "answer": 0}',
+]
+
+
+class QuestionBankTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, IQRA.QUIZ_BANK_FILE_NAME)
+        self.index_path = self.path + IQRA.QUIZ_INDEX_SUFFIX
+        # Malformed lines and blank lines between the valid ones, and no newline after the last line
+        lines = []
+        for i, line in enumerate(VALID):
+            lines.append(line)
+            if i < len(MALFORMED):
+                lines.append(MALFORMED[i])
+            if i % 3 == 0:
+                lines.append("")
+        with open(self.path, "w", encoding="utf-8") as bank_file:
+            bank_file.write("\n".join(lines))
+        self.banks = []
+
+    def tearDown(self):
+        for bank in self.banks:
+            bank.close()
+        self.directory.cleanup()
+
+    def open_bank(self):
+        bank = IQRA.QuestionBank(self.path)
+        self.banks.append(bank)
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            self.assertTrue(bank.open())
+        return bank, printed.getvalue()
+
+    def questions(self, bank):
+        return [bank.question(i)["question"] for i in range(bank.count)]
+
+    def keep_bank_stat(self):
+        """Returns a function restoring the bank's modification time, so in-place edits go unnoticed by the index."""
+        stat = os.stat(self.path)
+        return lambda: os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def test_only_valid_questions_are_indexed(self):
+        bank, printed = self.open_bank()
+        self.assertIn(f"Skipped {len(MALFORMED)} malformed questions", printed)
+        self.assertEqual(self.questions(bank), [json.loads(line)["question"] for line in VALID])
+        self.assertEqual(bank.question(bank.count - 1)["choices"], ["الفاتحة", "البقرة"])
+
+    def test_saved_index_is_reused(self):
+        first, _ = self.open_bank()
+        self.assertIsNone(first.index_data)
+        self.assertEqual(os.path.getsize(self.index_path),
+                         IQRA.QUIZ_INDEX_HEADER.size + len(VALID) * IQRA.QUIZ_INDEX_OFFSET.size)
+        second, printed = self.open_bank()
+        self.assertIsNotNone(second.index_data) # Mapped from the file, not rebuilt
+        self.assertEqual(printed, "")
+        self.assertEqual(self.questions(second), self.questions(first))
+
+    def test_a_changed_bank_rebuilds_the_index(self):
+        self.open_bank()
+        with open(self.path, "a", encoding="utf-8") as bank_file:
+            bank_file.write("\n" + question_line("added"))
+        bank, _ = self.open_bank()
+        self.assertIsNone(bank.index_data)
+        self.assertEqual(self.questions(bank)[-1], "added")
+
+    def test_damaged_index_files_are_rebuilt(self):
+        expected = self.questions(self.open_bank()[0])
+        with open(self.index_path, "rb") as index_file:
+            index = index_file.read()
+        damaged = [index[:length] for length in range(len(index))] + [b"NOTQUIZ1" + index[8:]]
+        for data in damaged:
+            with open(self.index_path, "wb") as index_file:
+                index_file.write(data)
+            bank, _ = self.open_bank()
+            self.assertIsNone(bank.index_data, len(data))
+            self.assertEqual(self.questions(bank), expected)
+
+    def test_a_line_edited_in_place_is_skipped_by_the_day(self):
+        self.open_bank()
+        restore_stat = self.keep_bank_stat()
+        with open(self.path, "rb") as bank_file:
+            data = bytearray(bank_file.read())
+        data[data.index(b'"Q0"') - 2] = ord("#") # Same size, so the index still looks current
+        with open(self.path, "wb") as bank_file:
+            bank_file.write(data)
+        restore_stat()
+
+        bank, _ = self.open_bank()
+        self.assertIsNotNone(bank.index_data)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(bank.question(0))
+            quiz = IQRA.DailyQuiz(bank, datetime.date(2026, 10, 17))
+            quiz.indices = [0, 1, 2]
+            quiz.question = quiz.load_question()
+        self.assertEqual(quiz.indices, [1, 2])
+        self.assertEqual(quiz.question["question"], "Q1")
+
+    def test_a_missing_bank_is_reported(self):
+        os.remove(self.path)
+        bank = IQRA.QuestionBank(self.path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertFalse(bank.open())
+
+
+class DailyQuestionsTest(unittest.TestCase):
+    def test_a_day_always_gets_the_same_distinct_questions(self):
+        for day in range(738000, 738050):
+            indices = IQRA.daily_question_indices(day, 1000)
+            self.assertEqual(indices, IQRA.daily_question_indices(day, 1000))
+            self.assertEqual(len(set(indices)), IQRA.QUIZ_QUESTIONS_PER_DAY)
+            self.assertTrue(all(0 <= i < 1000 for i in indices))
+        self.assertEqual(sorted(IQRA.daily_question_indices(5, 3)), [0, 1, 2])
+        self.assertEqual(IQRA.daily_question_indices(5, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Checks that the dirty rectangles handed to the renderer cover every marked region without overlapping.
+
+    python -m unittest discover tests
+"""
+import os
+import random
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+
+import IQRA
+
+SCREEN = pygame.Rect(0, 0, IQRA.SCREEN_WIDTH, IQRA.SCREEN_HEIGHT)
+
+
+class DirtyRectTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tracker = IQRA.DirtyRectTracker()
+        self.tracker.collect(SCREEN) # The first frame is always a full redraw
+
+    def collect(self, marks):
+        for rect in marks:
+            self.tracker.mark(rect)
+        return self.tracker.collect(SCREEN)
+
+    def test_merged_rects_cover_every_mark_without_overlapping(self):
+        rng = random.Random(3)
+        for _ in range(3000):
+            marks = [pygame.Rect(rng.randrange(-100, SCREEN.width), rng.randrange(-100, SCREEN.height),
+                                 rng.randint(0, 300), rng.randint(0, 300))
+                     for _ in range(rng.randint(1, IQRA.DIRTY_RECT_MERGE_LIMIT))]
+            merged = self.collect(marks)
+            for i, rect in enumerate(merged):
+                self.assertTrue(SCREEN.contains(rect))
+                for other in merged[i + 1:]:
+                    self.assertFalse(rect.colliderect(other), (marks, merged))
+            visible = [mark.clip(SCREEN) for mark in marks]
+            visible = [mark for mark in visible if mark.width and mark.height]
+            for mark in visible:
+                self.assertTrue(any(rect.contains(mark) for rect in merged), (marks, merged))
+            # Each merged rect is just the bounding box of the marks it took in
+            for rect in merged:
+                inside = [mark for mark in visible if rect.contains(mark)]
+                self.assertEqual(rect, inside[0].unionall(inside[1:]))
+
+    def test_a_union_that_grows_into_an_earlier_rect_absorbs_it(self):
+        merged = self.collect([(0, 0, 10, 10), (20, 0, 10, 10), (5, 5, 20, 2)])
+        self.assertEqual(merged, [pygame.Rect(0, 0, 30, 10)])
+
+    def test_many_regions_become_one(self):
+        marks = [(i * 40, 0, 20, 20) for i in range(IQRA.DIRTY_RECT_MERGE_LIMIT + 1)]
+        merged = self.collect(marks)
+        self.assertEqual(merged, [pygame.Rect(0, 0, IQRA.DIRTY_RECT_MERGE_LIMIT * 40 + 20, 20)])
+
+    def test_offscreen_marks_are_dropped_and_collect_resets(self):
+        self.assertEqual(self.collect([(-50, -50, 40, 40), (SCREEN.width, 0, 10, 10), (5, 5, 0, 10)]), [])
+        self.assertFalse(self.tracker.has_pending())
+        self.tracker.mark_all()
+        self.assertEqual(self.collect([(5, 5, 10, 10)]), [SCREEN])
+        self.assertEqual(self.tracker.collect(SCREEN), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Checks that the binary event log reads back what was recorded and survives a crash mid-write.
+
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import IQRA
+
+
+def kinds(records):
+    return [record[1] for record in records]
+
+
+class EventLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "game.iqralog")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, *events):
+        log = IQRA.EventLog(self.path)
+        for kind, fields in events:
+            log.record(kind, **fields)
+        log.close()
+        return log
+
+    def test_records_round_trip(self):
+        long_name = "عبد الرحمن بن عبد العزيز"
+        log = self.write(
+            (IQRA.EVENT_GAME_START, dict(player=1, value=2 ** 32 - 1, text=long_name)),
+            (IQRA.EVENT_SPIN, dict(value=1234)),
+            (IQRA.EVENT_LANDED, dict(letter=IQRA.CHOOSE_LETTER_SYMBOL)),
+            (IQRA.EVENT_VERDICT, dict(player=1, score=5, value=1)),
+        )
+        records = list(IQRA.read_event_log(self.path))
+        self.assertEqual(log.records_written, len(records))
+        self.assertEqual(kinds(records), [IQRA.EVENT_SESSION_START, IQRA.EVENT_GAME_START, IQRA.EVENT_SPIN,
+                                          IQRA.EVENT_LANDED, IQRA.EVENT_VERDICT])
+        _, _, player, letter, _, value, text = records[1]
+        self.assertEqual((player, letter, value), (1, None, 2 ** 32 - 1))
+        self.assertTrue(long_name.startswith(text))
+        self.assertLessEqual(len(text.encode("utf-8")), IQRA.EVENT_TEXT_SIZE)
+        self.assertEqual(records[3][3], IQRA.CHOOSE_LETTER_SYMBOL)
+        self.assertEqual(records[4][2:6], (1, None, 5, 1))
+        times = [record[0] for record in records]
+        self.assertEqual(times, sorted(times))
+
+    def test_sessions_append_after_one_header(self):
+        self.write((IQRA.EVENT_SPIN, dict(value=1)))
+        self.write((IQRA.EVENT_SPIN, dict(value=2)))
+        records = list(IQRA.read_event_log(self.path))
+        self.assertEqual(kinds(records), [IQRA.EVENT_SESSION_START, IQRA.EVENT_SPIN] * 2)
+        self.assertEqual(os.path.getsize(self.path), len(IQRA.EVENT_LOG_MAGIC) + 4 * IQRA.EVENT_RECORD.size)
+
+    def test_a_record_cut_short_is_dropped(self):
+        self.write(*[(IQRA.EVENT_SPIN, dict(value=i)) for i in range(3)])
+        with open(self.path, "rb") as log_file:
+            data = log_file.read()
+        for cut in range(1, IQRA.EVENT_RECORD.size):
+            with open(self.path, "wb") as log_file:
+                log_file.write(data[:-cut])
+            records = list(IQRA.read_event_log(self.path))
+            self.assertEqual([record[5] for record in records[1:]], [0, 1])
+
+    def test_foreign_and_older_files_are_refused(self):
+        for header in (b"not a log", IQRA.EVENT_LOG_MAGIC[:-1] + b"\x01"):
+            with open(self.path, "wb") as log_file:
+                log_file.write(header + bytes(IQRA.EVENT_RECORD.size))
+            with self.assertRaises(ValueError):
+                list(IQRA.read_event_log(self.path))
+            with self.assertRaises(ValueError):
+                IQRA.EventLog(self.path) # Appending would mix two formats in one file
+            self.assertEqual(os.path.getsize(self.path), len(header) + IQRA.EVENT_RECORD.size)
+
+    def test_logged_seeds_reproduce_the_landing(self):
+        log = IQRA.EventLog(self.path)
+        game = IQRA.Game(event_log=log)
+        game.start_match(["A", "B"])
+        scene = game.scene
+        for _ in range(3):
+            scene.spin()
+            while scene.is_spinning:
+                scene.step_spin()
+            scene.is_choosing_letter = False # Skip the letter grid after a star; only landings matter here
+        log.close()
+
+        records = list(IQRA.read_event_log(self.path))
+        start_seed = next(record[5] for record in records if record[1] == IQRA.EVENT_GAME_START)
+        angle = IQRA.start_angle_for_seed(start_seed)
+        spins = [record[5] for record in records if record[1] == IQRA.EVENT_SPIN]
+        landed = [record[3] for record in records if record[1] == IQRA.EVENT_LANDED]
+        self.assertEqual(len(spins), 3)
+        for seed, letter in zip(spins, landed):
+            speed = IQRA.spin_speed_for_seed(seed)
+            angle += IQRA.spin_distance(speed, IQRA.spin_step_count(speed))
+            self.assertEqual(IQRA.letter_at_angle(angle), letter)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Checks the memory-mapped ayah index against its source text and against damaged files.
+
+    python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import IQRA
+
+SOURCE = """# surah|ayah|text
+2|1|الٓمٓ
+1|2|ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَٰلَمِينَ
+1|1|بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ
+
+2|2|ذَٰلِكَ ٱلْكِتَٰبُ لَا رَيْبَ ۛ فِيهِ ۛ هُدًى لِّلْمُتَّقِينَ
+2|3|ٱلَّذِينَ يُؤْمِنُونَ بِٱلْغَيْبِ
+112|1|قُلْ هُوَ ٱللَّهُ أَحَدٌ
+113|1|قُلْ أَعُوذُ بِرَبِّ ٱلْفَلَقِ
+2|255|ٱللَّهُ لَآ إِلَٰهَ إِلَّا هُوَ
+"""
+
+
+def expected_matches(letter):
+    """The ayat of SOURCE starting with letter, found by scanning every line."""
+    matches = []
+    for line in SOURCE.splitlines():
+        if line and not line.startswith("#"):
+            surah, ayah, text = line.split("|", 2)
+            if IQRA.ayah_first_letter(text) == letter:
+                matches.append((int(surah), int(ayah), text))
+    return sorted(matches)
+
+
+class QuranIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        source_path = os.path.join(self.directory.name, "quran.txt")
+        with open(source_path, "w", encoding="utf-8") as source_file:
+            source_file.write(SOURCE)
+        self.path = os.path.join(self.directory.name, IQRA.QURAN_INDEX_FILE_NAME)
+        self.built = IQRA.build_quran_index(source_path, self.path)
+        with open(self.path, "rb") as index_file:
+            self.data = index_file.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_index(self, data=None):
+        """Opens the index, after replacing the file with data if given; returns it and what it printed."""
+        if data is not None:
+            with open(self.path, "wb") as index_file:
+                index_file.write(data)
+        index = IQRA.QuranIndex(self.path)
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            index.open()
+        return index, printed.getvalue()
+
+    def test_lookups_match_a_scan_of_the_source(self):
+        index, printed = self.open_index()
+        self.assertEqual(printed, "")
+        self.assertEqual(self.built, (8, 4))
+        for letter in IQRA.ARABIC_LETTERS:
+            self.assertEqual(list(index.lookup(letter)), expected_matches(letter), letter)
+        self.assertEqual(list(index.lookup("أ")), list(index.lookup("ا"))) # Variants fold to the base letter
+        matches = index.lookup("ق")
+        self.assertEqual(matches[-1], matches[len(matches) - 1])
+        with self.assertRaises(IndexError):
+            matches[len(matches)]
+
+    def test_a_missing_file_disables_lookup(self):
+        os.remove(self.path)
+        index, printed = self.open_index()
+        self.assertIn("not found", printed)
+        self.assertEqual(len(index.lookup("ب")), 0)
+
+    def test_truncated_files_are_rejected_when_opened(self):
+        for length in range(len(self.data)):
+            index, printed = self.open_index(self.data[:length])
+            self.assertIn("Ayah lookup is disabled", printed, length)
+            self.assertEqual(len(index.lookup("ا")), 0)
+
+    def test_corrupt_tables_are_rejected_when_opened(self):
+        header = IQRA.QURAN_INDEX_HEADER
+        first_record = header.size + 4 * IQRA.QURAN_INDEX_BUCKET.size
+        corruptions = {
+            "magic": (0, b"NOTAYAH1"),
+            "record count": (8, struct.pack("<I", 10 ** 6)),
+            "bucket past the records": (header.size + 4, struct.pack("<II", 7, 5)),
+            "text past the end": (first_record + 4, struct.pack("<II", 0, 10 ** 6)),
+            "overlapping tables": (20, struct.pack("<I", header.size)),
+        }
+        for name, (offset, patch) in corruptions.items():
+            data = bytearray(self.data)
+            data[offset:offset + len(patch)] = patch
+            index, printed = self.open_index(bytes(data))
+            self.assertIn("Ayah lookup is disabled", printed, name)
+            self.assertEqual(len(index.lookup("ب")), 0, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
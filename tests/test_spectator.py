@@ -0,0 +1,103 @@
+"""Checks the spectator snapshot codec and how the client applies keyframes and deltas.
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import IQRA
+import spectator
+
+# Angles and speeds that float32 holds exactly, so round trips compare equal
+SNAPSHOT = (1, 123.5, 7.25, 3, 1, (2, 4), ("Aisha", "يوسف"))
+
+
+def snapshot_fields(snapshot):
+    return dict(zip(IQRA.SNAPSHOT_FIELDS, snapshot))
+
+
+class SnapshotCodecTest(unittest.TestCase):
+    def test_keyframe_round_trip(self):
+        flags, sequence, keyframe_sequence, fields = IQRA.decode_snapshot(IQRA.encode_snapshot(9, 9, SNAPSHOT))
+        self.assertTrue(flags & IQRA.SNAPSHOT_KEYFRAME)
+        self.assertEqual((sequence, keyframe_sequence), (9, 9))
+        self.assertEqual(fields, snapshot_fields(SNAPSHOT))
+
+    def test_delta_carries_only_changed_fields(self):
+        changed = (1, 200.0, 0.0, IQRA.CHOOSING_LETTER, 1, (3, 4), ("Aisha", "يوسف"))
+        packet = IQRA.encode_snapshot(12, 9, changed, keyframe=SNAPSHOT)
+        flags, sequence, keyframe_sequence, fields = IQRA.decode_snapshot(packet)
+        self.assertFalse(flags & IQRA.SNAPSHOT_KEYFRAME)
+        self.assertEqual((sequence, keyframe_sequence), (12, 9))
+        self.assertEqual(set(fields), {"angle", "speed", "letter", "scores"})
+        state = snapshot_fields(SNAPSHOT)
+        state.update(fields)
+        self.assertEqual(state, snapshot_fields(changed))
+        self.assertLess(len(packet), len(IQRA.encode_snapshot(12, 12, changed)))
+
+    def test_unchanged_delta_is_just_the_header(self):
+        packet = IQRA.encode_snapshot(10, 9, SNAPSHOT, keyframe=SNAPSHOT)
+        self.assertEqual(len(packet), IQRA.SNAPSHOT_HEADER.size)
+        self.assertEqual(IQRA.decode_snapshot(packet)[3], {})
+
+    def test_long_names_are_cut_on_a_character_boundary(self):
+        name = "عبد الرحمن بن عبد العزيز"
+        snapshot = SNAPSHOT[:-1] + ((name, "B"),)
+        names = IQRA.decode_snapshot(IQRA.encode_snapshot(1, 1, snapshot))[3]["names"]
+        self.assertLessEqual(len(names[0].encode("utf-8")), IQRA.EVENT_TEXT_SIZE)
+        self.assertTrue(name.startswith(names[0]))
+
+    def test_truncated_and_foreign_packets_are_rejected(self):
+        packet = IQRA.encode_snapshot(9, 9, SNAPSHOT)
+        for length in range(len(packet)):
+            with self.assertRaises(ValueError):
+                IQRA.decode_snapshot(packet[:length])
+        with self.assertRaises(ValueError):
+            IQRA.decode_snapshot(b"XX" + packet[2:])
+
+
+class SpectatorClientTest(unittest.TestCase):
+    def setUp(self):
+        self.client = spectator.SpectatorClient(("127.0.0.1", 0))
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_deltas_apply_on_their_keyframe_only(self):
+        client = self.client
+        changed = SNAPSHOT[:5] + ((3, 4),) + SNAPSHOT[6:]
+        self.assertFalse(client.apply(IQRA.encode_snapshot(2, 1, changed, keyframe=SNAPSHOT), 0.0)) # No keyframe yet
+        self.assertEqual(client.orphaned, 1)
+        self.assertTrue(client.apply(IQRA.encode_snapshot(1, 1, SNAPSHOT), 0.0))
+        self.assertEqual(client.state, snapshot_fields(SNAPSHOT))
+        self.assertTrue(client.apply(IQRA.encode_snapshot(2, 1, changed, keyframe=SNAPSHOT), 0.0))
+        self.assertEqual(client.state["scores"], (3, 4))
+        # A delta older than the last packet is dropped
+        self.assertFalse(client.apply(IQRA.encode_snapshot(1, 1, SNAPSHOT, keyframe=SNAPSHOT), 0.0))
+        self.assertEqual(client.stale, 1)
+        self.assertFalse(client.apply(b"garbage", 0.0))
+        self.assertEqual(client.malformed, 1)
+
+    def test_sequence_numbers_wrap(self):
+        self.assertTrue(spectator.sequence_is_newer(0, 0xFFFF))
+        self.assertTrue(spectator.sequence_is_newer(5, 0xFFF0))
+        self.assertFalse(spectator.sequence_is_newer(0xFFF0, 5))
+        self.assertFalse(spectator.sequence_is_newer(7, 7))
+
+    def test_extrapolated_spin_lands_where_the_game_does(self):
+        client = self.client
+        speed = IQRA.spin_speed_for_seed(1234)
+        spinning = (1, 10.0, speed, IQRA.NO_LETTER, 0, (0, 0), ("A", "B"))
+        client.apply(IQRA.encode_snapshot(1, 1, spinning), 0.0)
+        steps = IQRA.spin_step_count(speed)
+        landed = client.angle_at(steps / IQRA.PHYSICS_HZ + 1)
+        self.assertAlmostEqual(landed, 10.0 + IQRA.spin_distance(speed, steps), places=3)
+        self.assertFalse(client.is_spinning(steps / IQRA.PHYSICS_HZ + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""Checks the tournament leaderboard and brackets against brute-force versions.
+
+    python -m unittest discover tests
+"""
+import os
+import random
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import IQRA
+
+
+class BruteForceStandings:
+    """The leaderboard's ordering rules applied by sorting every player after every change."""
+    def __init__(self, player_count):
+        self.scores = [0] * player_count
+        self.letters = [0] * player_count
+        self.reached = list(range(player_count)) # When each player reached their current score
+        self.clock = player_count
+
+    def add_points(self, player, points=1, letters=0):
+        self.letters[player] += letters
+        if points:
+            self.scores[player] += points
+            self.reached[player] = self.clock
+            self.clock += 1
+
+    def rank(self, player):
+        return 1 + sum(score > self.scores[player] for score in self.scores)
+
+    def rows(self):
+        order = sorted(range(len(self.scores)),
+                       key=lambda player: (-self.scores[player], -self.letters[player], self.reached[player]))
+        return [(self.rank(player), player) for player in order]
+
+
+class ScoreTreeTest(unittest.TestCase):
+    def test_counts_and_order_statistics_match_a_sorted_list(self):
+        rng = random.Random(1)
+        tree = IQRA.ScoreTree(4) # Small, so scores past the capacity exercise grow()
+        scores = []
+        for _ in range(500):
+            if scores and rng.random() < 0.3:
+                score = scores.pop(rng.randrange(len(scores)))
+                tree.add(score, -1)
+            else:
+                score = rng.randrange(40)
+                scores.append(score)
+                tree.add(score, 1)
+            ordered = sorted(scores)
+            for probe in range(45):
+                self.assertEqual(tree.count_at_most(probe), sum(score <= probe for score in scores))
+            for k, score in enumerate(ordered):
+                self.assertEqual(tree.kth_score(k), score)
+
+
+class LeaderboardTest(unittest.TestCase):
+    def check(self, leaderboard, expected, rng):
+        rows = expected.rows()
+        for player in range(len(expected.scores)):
+            self.assertEqual(leaderboard.rank(player), expected.rank(player))
+        self.assertEqual(list(leaderboard.rows(0, len(rows))), rows)
+        for _ in range(5):
+            start = rng.randrange(len(rows))
+            count = rng.randrange(1, 12)
+            self.assertEqual(list(leaderboard.rows(start, count)), rows[start:start + count])
+
+    def test_ranks_and_rows_match_a_brute_force_sort(self):
+        rng = random.Random(2)
+        for player_count in (1, 2, 7, 50):
+            leaderboard = IQRA.Leaderboard(player_count)
+            expected = BruteForceStandings(player_count)
+            self.check(leaderboard, expected, rng)
+            for _ in range(300):
+                player = rng.randrange(player_count)
+                points = rng.choice((0, 1, 1, 3))
+                letters = rng.choice((0, 0, 2, 5))
+                leaderboard.add_points(player, points, letters)
+                expected.add_points(player, points, letters)
+                self.check(leaderboard, expected, rng)
+
+    def test_ties_share_the_better_rank(self):
+        leaderboard = IQRA.Leaderboard(4)
+        for player in (2, 0, 3):
+            leaderboard.add_points(player)
+        leaderboard.add_points(3)
+        self.assertEqual(list(leaderboard.rows(0, 4)), [(1, 3), (2, 2), (2, 0), (4, 1)])
+
+    def test_ties_are_broken_by_letters_recited(self):
+        leaderboard = IQRA.Leaderboard(4)
+        for player in (2, 0, 3):
+            leaderboard.add_points(player, letters=3)
+        leaderboard.add_points(0, 0, 2) # A lost match still counts its letters
+        self.assertEqual(list(leaderboard.rows(0, 4)), [(1, 0), (1, 2), (1, 3), (4, 1)])
+
+
+class TournamentTest(unittest.TestCase):
+    def play(self, tournament, rng):
+        matches = []
+        while not tournament.finished:
+            round_number = tournament.round
+            player_a, player_b = tournament.next_match
+            winner, loser = (player_a, player_b) if rng.random() < 0.5 else (player_b, player_a)
+            matches.append((round_number, winner, loser))
+            tournament.record_result(winner, loser, IQRA.WINNING_SCORE, rng.randrange(IQRA.WINNING_SCORE))
+        return matches
+
+    def test_knockout_byes_go_to_the_top_seeds(self):
+        rng = random.Random(3)
+        for player_count in range(2, 40):
+            tournament = IQRA.Tournament([f"P{i}" for i in range(player_count)], IQRA.TOURNAMENT_KNOCKOUT)
+            bracket_size = 1 << (player_count - 1).bit_length()
+            bye_count = bracket_size - player_count
+            first_round = list(tournament.pending)
+            self.assertEqual(len(first_round), player_count - bracket_size // 2)
+            seeded_in_first_round = {player for match in first_round for player in match}
+            self.assertEqual(seeded_in_first_round, set(range(bye_count, player_count)))
+
+            matches = self.play(tournament, rng)
+            self.assertEqual(len(matches), player_count - 1)
+            losers = [loser for _, _, loser in matches]
+            self.assertEqual(len(set(losers)), player_count - 1) # Everyone but the champion loses exactly once
+            self.assertNotIn(tournament.champion, losers)
+            # After the first round the bracket is a power of two, so each round halves it with no more byes
+            later_rounds = {}
+            for round_number, winner, loser in matches:
+                if round_number > 1:
+                    later_rounds.setdefault(round_number, set()).update((winner, loser))
+            for round_number, players in later_rounds.items():
+                self.assertEqual(len(players), bracket_size >> (round_number - 1))
+
+    def test_round_robin_pairs_everyone_once(self):
+        rng = random.Random(4)
+        for player_count in range(2, 12):
+            tournament = IQRA.Tournament([f"P{i}" for i in range(player_count)], IQRA.TOURNAMENT_ROUND_ROBIN)
+            matches = self.play(tournament, rng)
+            pairs = [frozenset((winner, loser)) for _, winner, loser in matches]
+            self.assertEqual(len(pairs), len(set(pairs)))
+            self.assertEqual(len(pairs), player_count * (player_count - 1) // 2)
+            wins = [0] * player_count
+            for _, winner, _ in matches:
+                wins[winner] += 1
+            self.assertEqual(wins[tournament.champion], max(wins))
+
+    def test_tied_round_robin_goes_to_the_most_letters(self):
+        # Everyone beats one player and loses to the other, so all three finish on one win
+        tournament = IQRA.Tournament(["A", "B", "C"], IQRA.TOURNAMENT_ROUND_ROBIN)
+        beats = {0: 1, 1: 2, 2: 0}
+        letters = {0: 3, 1: 1, 2: 4} # Letters each player recites in the match they lose
+        while not tournament.finished:
+            player_a, player_b = tournament.next_match
+            winner, loser = (player_a, player_b) if beats[player_a] == player_b else (player_b, player_a)
+            tournament.record_result(winner, loser, IQRA.WINNING_SCORE, letters[loser])
+        self.assertEqual(tournament.leaderboard.scores, [1, 1, 1])
+        self.assertEqual(tournament.champion, 2)
+        self.assertEqual([player for _, player in tournament.leaderboard.rows(0, 3)], [2, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
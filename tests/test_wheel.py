@@ -0,0 +1,124 @@
+"""Checks that the letter the game announces is the one drawn under the pointer, and where a spin lands.
+
+    python -m unittest discover tests
+"""
+import math
+import os
+import random
+import unittest
+
+# Must be set before pygame initialises its subsystems
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+from pygame import gfxdraw
+
+import IQRA
+
+CENTER = (IQRA.WHEEL_RADIUS + 10, IQRA.WHEEL_RADIUS + 10)
+# Just under the pointer's tip, inside the segment it points at
+PROBE_RADIUS = IQRA.WHEEL_RADIUS - IQRA.WHEEL_POINTER_INSET - 2
+PROBE = (round(CENTER[0] + PROBE_RADIUS * math.cos(math.radians(IQRA.POINTER_ANGLE))),
+         round(CENTER[1] + PROBE_RADIUS * math.sin(math.radians(IQRA.POINTER_ANGLE))))
+
+
+def segment_under_pointer(sprite, angle):
+    """Fills each drawn segment with its index as the red channel and reads the one under the pointer."""
+    surface = pygame.Surface((CENTER[0] * 2, CENTER[1] * 2))
+    surface.fill((255, 255, 255))
+    segments = sprite.mesh_points(angle, CENTER)[0]
+    for index, segment in enumerate(segments):
+        gfxdraw.filled_polygon(surface, segment, (index, 0, 0))
+    return surface.get_at(PROBE)[0]
+
+
+def near_an_edge(angle, margin=0.5):
+    offset = (angle - IQRA.POINTER_ANGLE + IQRA.SEGMENT_ANGLE / 2) % IQRA.SEGMENT_ANGLE
+    return offset < margin or offset > IQRA.SEGMENT_ANGLE - margin
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.plays = 0
+
+    def play(self, sound):
+        self.plays += 1
+
+
+class WheelPointerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        pygame.display.set_mode((IQRA.SCREEN_WIDTH, IQRA.SCREEN_HEIGHT))
+        cls.game = IQRA.Game()
+        cls.game.start_match(["A", "B"])
+        cls.scene = cls.game.scene
+
+    def test_selected_letter_is_drawn_under_the_pointer(self):
+        rng = random.Random(5)
+        checked = 0
+        for angle in [0.0, 100.0] + [rng.uniform(-720, 1440) for _ in range(400)]:
+            if near_an_edge(angle):
+                continue # Antialiasing along the edge could go either way
+            self.scene.angle = angle
+            drawn = segment_under_pointer(self.scene.wheel_sprite, angle)
+            self.assertEqual(drawn, IQRA.ARABIC_LETTERS.index(self.scene.get_selected_letter()), angle)
+            checked += 1
+        self.assertGreater(checked, 300)
+
+    def test_ticks_fall_on_the_drawn_edges(self):
+        scene = self.scene
+        channel = RecordingChannel()
+        ticker = IQRA.SPIN_TICKER
+        saved = ticker.channel, ticker.ticks_played
+        ticker.channel = channel
+        try:
+            scene.reset_wheel()
+            self.game.next_spin_seed = 99
+            scene.spin()
+            while scene.is_spinning:
+                plays = channel.plays
+                scene.step_spin()
+                if near_an_edge(scene.previous_angle) or near_an_edge(scene.angle):
+                    continue
+                crossed = (segment_under_pointer(scene.wheel_sprite, scene.previous_angle)
+                           != segment_under_pointer(scene.wheel_sprite, scene.angle))
+                self.assertEqual(channel.plays > plays, crossed, scene.angle)
+        finally:
+            ticker.channel, ticker.ticks_played = saved
+            scene.reset_wheel()
+
+
+class SpinPhysicsTest(unittest.TestCase):
+    def test_closed_form_matches_stepping_the_speed(self):
+        rng = random.Random(6)
+        for _ in range(300):
+            initial_speed = IQRA.spin_speed_for_seed(rng.getrandbits(32))
+            speed, angle, steps = initial_speed, 0.0, 0
+            while speed >= IQRA.SPIN_STOP_SPEED: # The loop the wheel ran before the closed form
+                angle += speed
+                speed *= IQRA.SPIN_FRICTION
+                steps += 1
+            self.assertEqual(IQRA.spin_step_count(initial_speed), steps)
+            self.assertAlmostEqual(IQRA.spin_distance(initial_speed, steps), angle, places=6)
+
+    def test_predicted_landing_is_where_the_wheel_stops(self):
+        rng = random.Random(7)
+        game = IQRA.Game()
+        game.start_match(["A", "B"])
+        scene = game.scene
+        for _ in range(40):
+            game.next_spin_seed = rng.getrandbits(32)
+            scene.spin()
+            predicted_angle, predicted_letter = scene.predicted_angle, scene.predicted_letter
+            while scene.is_spinning:
+                # Uneven frames, with the odd stall longer than the physics catches up on
+                scene.update(rng.choice((IQRA.PHYSICS_DT, 0.004, 0.021, 0.05, 0.4)))
+            self.assertEqual(scene.angle, predicted_angle)
+            self.assertEqual(scene.get_selected_letter(), predicted_letter)
+            scene.is_choosing_letter = False # Skip the letter grid after a star
+
+
+if __name__ == "__main__":
+    unittest.main()